@@ -0,0 +1,11 @@
+INSERT INTO commands
+    ("command_name", "module_name", "method_name", "command_type", "command_tier", "description")
+VALUES
+    ("stats", "superadmin_commands", "stats", "prefix", 3, "Show command latency, throughput and event loop lag")
+;
+
+INSERT INTO settings
+    ("key", "value")
+VALUES
+    ("message_stats", "```\n{}\n```")
+;
@@ -0,0 +1,40 @@
+-- shuffle database
+CREATE TABLE "event_pokemon" (
+	"event_id" INTEGER NOT NULL,
+	"position" INTEGER NOT NULL,
+	"pokemon" TEXT NOT NULL,
+	PRIMARY KEY ("event_id", "position")
+);
+CREATE INDEX "idx_event_pokemon_pokemon" ON "event_pokemon" ("pokemon");
+
+CREATE TABLE "event_stage_ids" (
+	"event_id" INTEGER NOT NULL,
+	"position" INTEGER NOT NULL,
+	"stage_id" INTEGER NOT NULL,
+	PRIMARY KEY ("event_id", "position")
+);
+CREATE INDEX "idx_event_stage_ids_stage_id" ON "event_stage_ids" ("stage_id");
+
+INSERT INTO event_pokemon (event_id, position, pokemon)
+WITH RECURSIVE split(event_id, position, item, rest) AS (
+    SELECT id, -1, '', pokemon || '/'
+    FROM events
+    UNION ALL
+    SELECT event_id, position + 1, substr(rest, 1, instr(rest, '/') - 1), substr(rest, instr(rest, '/') + 1)
+    FROM split
+    WHERE rest != ''
+)
+SELECT event_id, position, item FROM split WHERE position >= 0
+;
+
+INSERT INTO event_stage_ids (event_id, position, stage_id)
+WITH RECURSIVE split(event_id, position, item, rest) AS (
+    SELECT id, -1, '', stage_ids || '/'
+    FROM events
+    UNION ALL
+    SELECT event_id, position + 1, substr(rest, 1, instr(rest, '/') - 1), substr(rest, instr(rest, '/') + 1)
+    FROM split
+    WHERE rest != ''
+)
+SELECT event_id, position, CAST(item AS INTEGER) FROM split WHERE position >= 0
+;
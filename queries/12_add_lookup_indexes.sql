@@ -0,0 +1,5 @@
+-- shuffle database
+-- aliases are removed regardless of case
+CREATE INDEX "idx_aliases_alias_nocase" ON "aliases" ("alias" COLLATE NOCASE);
+-- duplicate events (same pokemon and start date) are skipped when loading the game data
+CREATE INDEX "idx_events_pokemon_date_start" ON "events" ("pokemon", "date_start");
@@ -0,0 +1,12 @@
+INSERT INTO commands
+    ("command_name", "module_name", "method_name", "command_type", "command_tier", "description")
+VALUES
+    ("reloadtables", "superadmin_commands", "reload_tables", "prefix", 3, "Rebuild the shuffle database from the shuffle_tables files")
+;
+
+INSERT INTO settings
+    ("key", "value")
+VALUES
+    ("message_reload_tables_success", "Shuffle tables reloaded ({} rows)"),
+    ("message_reload_tables_failure", "Shuffle tables not reloaded:\n{}")
+;
@@ -0,0 +1,3 @@
+-- failed deliveries are recorded too, and given up on after reminder_max_attempts
+ALTER TABLE "reminder_deliveries" ADD COLUMN "delivered" INTEGER NOT NULL DEFAULT 1;
+ALTER TABLE "reminder_deliveries" ADD COLUMN "attempts" INTEGER NOT NULL DEFAULT 1;
@@ -0,0 +1,11 @@
+INSERT INTO commands
+    ("command_name", "module_name", "method_name", "command_type", "command_tier", "description")
+VALUES
+    ("reloaddata", "admin_commands", "reload_data", "prefix", 2, "Reload the game data after the shuffle database has been updated")
+;
+
+INSERT INTO settings
+    ("key", "value")
+VALUES
+    ("message_reload_data_success", "Game data reloaded")
+;
@@ -0,0 +1,11 @@
+INSERT INTO commands
+    ("command_name", "module_name", "method_name", "command_type", "command_tier", "description")
+VALUES
+    ("cachestats", "admin_commands", "cache_stats", "prefix", 2, "Show hit/miss counters of the result caches")
+;
+
+INSERT INTO settings
+    ("key", "value")
+VALUES
+    ("message_cache_stats", "Cache stats:\n{}")
+;
@@ -0,0 +1,12 @@
+CREATE TABLE "reminder_runs" (
+	"day" TEXT NOT NULL PRIMARY KEY,
+	"week" INTEGER NOT NULL,
+	"week_changed" INTEGER NOT NULL,
+	"completed" INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE "reminder_deliveries" (
+	"day" TEXT NOT NULL,
+	"user_id" INTEGER NOT NULL,
+	PRIMARY KEY ("day", "user_id")
+);
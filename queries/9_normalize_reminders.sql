@@ -0,0 +1,44 @@
+-- shuffle database
+CREATE TABLE "reminder_weeks" (
+	"id" INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT,
+	"user_id" INTEGER NOT NULL,
+	"week" INTEGER NOT NULL,
+	UNIQUE ("user_id", "week")
+);
+CREATE INDEX "idx_reminder_weeks_week" ON "reminder_weeks" ("week");
+
+CREATE TABLE "reminder_pokemon" (
+	"id" INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT,
+	"user_id" INTEGER NOT NULL,
+	"pokemon" TEXT NOT NULL,
+	UNIQUE ("user_id", "pokemon")
+);
+CREATE INDEX "idx_reminder_pokemon_pokemon" ON "reminder_pokemon" ("pokemon");
+
+INSERT OR IGNORE INTO reminder_weeks (user_id, week)
+WITH RECURSIVE split(id, user_id, n, item, rest) AS (
+    SELECT id, user_id, 0, '', weeks || ', '
+    FROM reminders
+    WHERE weeks IS NOT NULL
+    UNION ALL
+    SELECT id, user_id, n + 1, substr(rest, 1, instr(rest, ', ') - 1), substr(rest, instr(rest, ', ') + 2)
+    FROM split
+    WHERE rest != ''
+)
+SELECT user_id, CAST(item AS INTEGER) FROM split WHERE item != '' ORDER BY id, n
+;
+
+INSERT OR IGNORE INTO reminder_pokemon (user_id, pokemon)
+WITH RECURSIVE split(id, user_id, n, item, rest) AS (
+    SELECT id, user_id, 0, '', pokemon || ', '
+    FROM reminders
+    WHERE pokemon IS NOT NULL
+    UNION ALL
+    SELECT id, user_id, n + 1, substr(rest, 1, instr(rest, ', ') - 1), substr(rest, instr(rest, ', ') + 2)
+    FROM split
+    WHERE rest != ''
+)
+SELECT user_id, item FROM split WHERE item != '' ORDER BY id, n
+;
+
+DROP TABLE "reminders";
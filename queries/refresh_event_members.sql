@@ -0,0 +1,28 @@
+-- shuffle database
+-- rebuild the tables listing the pokemon and stages of each event,
+-- from the slash-separated lists of the events table
+DELETE FROM event_pokemon;
+INSERT INTO event_pokemon (event_id, position, pokemon)
+WITH RECURSIVE split(event_id, position, item, rest) AS (
+    SELECT id, -1, '', pokemon || '/'
+    FROM events
+    UNION ALL
+    SELECT event_id, position + 1, substr(rest, 1, instr(rest, '/') - 1), substr(rest, instr(rest, '/') + 1)
+    FROM split
+    WHERE rest != ''
+)
+SELECT event_id, position, item FROM split WHERE position >= 0
+;
+
+DELETE FROM event_stage_ids;
+INSERT INTO event_stage_ids (event_id, position, stage_id)
+WITH RECURSIVE split(event_id, position, item, rest) AS (
+    SELECT id, -1, '', stage_ids || '/'
+    FROM events
+    UNION ALL
+    SELECT event_id, position + 1, substr(rest, 1, instr(rest, '/') - 1), substr(rest, instr(rest, '/') + 1)
+    FROM split
+    WHERE rest != ''
+)
+SELECT event_id, position, CAST(item AS INTEGER) FROM split WHERE position >= 0
+;
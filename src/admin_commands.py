@@ -2,7 +2,8 @@ from typing import Any
 
 import discord
 
-import db
+import cache
+import async_db
 import settings
 import user_commands
 from koduck import KoduckContext
@@ -13,7 +14,7 @@ async def update_setting(
 ) -> discord.Message | None:
     assert context.koduck
     assert context.message
-    result = context.koduck.update_setting(
+    result = await context.koduck.update_setting(
         setting_name,
         new_value,
         context.koduck.get_user_level(context.message.author.id),
@@ -34,7 +35,7 @@ async def add_setting(
 ) -> discord.Message | None:
     assert context.koduck
     assert context.message
-    result = context.koduck.add_setting(
+    result = await context.koduck.add_setting(
         setting_name, value, context.koduck.get_user_level(context.message.author.id)
     )
     if result is None:
@@ -49,7 +50,7 @@ async def remove_setting(
 ) -> discord.Message | None:
     assert context.koduck
     assert context.message
-    result = context.koduck.remove_setting(
+    result = await context.koduck.remove_setting(
         setting_name, context.koduck.get_user_level(context.message.author.id)
     )
     if result is None:
@@ -79,7 +80,7 @@ async def restrict_user(context: KoduckContext) -> discord.Message | None:
         return await context.send_message(
             content=settings.message_restrict_failed_2.format(settings.bot_name),
         )
-    context.koduck.update_user_level(user_id, 0)
+    await context.koduck.update_user_level(user_id, 0)
     return await context.send_message(
         content=settings.message_restrict_success.format(user_id, settings.bot_name),
     )
@@ -97,7 +98,7 @@ async def unrestrict_user(context: KoduckContext) -> discord.Message | None:
 
     if user_level != 0:
         return await context.send_message(content=settings.message_unrestrict_failed)
-    context.koduck.update_user_level(user_id, 1)
+    await context.koduck.update_user_level(user_id, 1)
     return await context.send_message(
         content=settings.message_unrestrict_success.format(user_id, settings.bot_name),
     )
@@ -107,7 +108,7 @@ async def add_response(
     context: KoduckContext, trigger: str, response: str
 ) -> discord.Message | None:
     assert context.koduck
-    success = db.add_custom_response(trigger, response)
+    success = await async_db.add_custom_response(trigger, response)
     if not success:
         return await context.send_message(
             content=settings.message_add_response_failed,
@@ -122,7 +123,7 @@ async def remove_response(
     context: KoduckContext, trigger: str
 ) -> discord.Message | None:
     assert context.koduck
-    success = db.remove_custom_response(trigger)
+    success = await async_db.remove_custom_response(trigger)
     if not success:
         return await context.send_message(
             content=settings.message_remove_response_failed.format(trigger),
@@ -155,7 +156,7 @@ async def add_requestable_roles(context: KoduckContext) -> discord.Message | Non
     assert context.message.guild
     guild_id = context.message.guild.id
     role_ids = (r.id for r in context.message.role_mentions)
-    db.add_requestable_roles(guild_id, *role_ids)
+    await async_db.add_requestable_roles(guild_id, *role_ids)
     return await context.send_message(
         content=settings.message_add_requestable_roles_success,
     )
@@ -171,7 +172,23 @@ async def remove_requestable_roles(context: KoduckContext) -> discord.Message |
     assert context.message.guild
     guild_id = context.message.guild.id
     role_ids = (r.id for r in context.message.role_mentions)
-    db.remove_requestable_roles(guild_id, *role_ids)
+    await async_db.remove_requestable_roles(guild_id, *role_ids)
     return await context.send_message(
         content=settings.message_remove_requestable_roles_success,
     )
+
+
+async def reload_data(context: KoduckContext) -> discord.Message | None:
+    """Rebuild the in-memory game data after the shuffle database has been updated."""
+    await async_db.refresh_event_members()
+    await async_db.reload_game_data()
+    return await context.send_message(content=settings.message_reload_data_success)
+
+
+async def cache_stats(context: KoduckContext) -> discord.Message | None:
+    """Show the hit/miss counters of the result caches."""
+    return await context.send_message(
+        content=settings.message_cache_stats.format(
+            "\n".join(f"{name}: {c.stats()}" for name, c in cache.caches.items())
+        )
+    )
@@ -0,0 +1,56 @@
+from typing import Iterable
+
+
+class AhoCorasick:
+    """Automaton finding which of a list of patterns appear in a text, in one pass.
+
+    Only the first pattern (in the order they were given) that appears in the text is returned,
+    which is what checking each pattern in turn with ``in`` would find.
+    """
+
+    def __init__(self, patterns: Iterable[str]) -> None:
+        self.patterns = list(dict.fromkeys(patterns))
+        # state -> character -> next state; state 0 is the root
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        # state -> smallest index of the patterns ending at this state, or after its fail links
+        self._first: list[int] = [len(self.patterns)]
+
+        for index, pattern in enumerate(self.patterns):
+            state = 0
+            for char in pattern:
+                if char not in self._goto[state]:
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._first.append(len(self.patterns))
+                    self._goto[state][char] = len(self._goto) - 1
+                state = self._goto[state][char]
+            self._first[state] = min(self._first[state], index)
+
+        # breadth-first, so that fail links point to states already completed
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for char, next_state in self._goto[state].items():
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                self._first[next_state] = min(
+                    self._first[next_state], self._first[self._fail[next_state]]
+                )
+                queue.append(next_state)
+
+    def find_first(self, text: str) -> str | None:
+        """Return the first pattern contained in the text, if any."""
+        goto, fail = self._goto, self._fail
+        first = self._first[0]
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if self._first[state] < first:
+                first = self._first[state]
+                if first == 0:
+                    break
+        return self.patterns[first] if first < len(self.patterns) else None
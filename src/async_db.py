@@ -0,0 +1,75 @@
+"""Awaitable versions of the ``db`` functions that still read or write the database files.
+
+Each database has its own worker thread: its queries run there, one at a time,
+so that the event loop never waits on disk.
+Everything in the game data snapshot is already in memory and can be used directly from ``db``.
+"""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Coroutine, Iterator
+
+import db
+from metrics import metrics
+
+bot_worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="bot_db")
+shuffle_worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="shuffle_db")
+
+
+def in_worker[**P, T](
+    worker: ThreadPoolExecutor, function: Callable[P, T]
+) -> Callable[P, Coroutine[Any, Any, T]]:
+    @functools.wraps(function)
+    async def wrapper(*args: P.args, **kwargs: P.kwargs) -> T:
+        loop = asyncio.get_running_loop()
+        with metrics.timer("db"):
+            return await loop.run_in_executor(
+                worker, functools.partial(function, *args, **kwargs)
+            )
+
+    return wrapper
+
+
+def listed[**P, T](function: Callable[P, Iterator[T]]) -> Callable[P, list[T]]:
+    """Consume the generator in the worker thread, where the query actually runs."""
+
+    @functools.wraps(function)
+    def wrapper(*args: P.args, **kwargs: P.kwargs) -> list[T]:
+        return list(function(*args, **kwargs))
+
+    return wrapper
+
+
+# bot database
+get_commands = in_worker(bot_worker, listed(db.get_commands))
+query_setting = in_worker(bot_worker, db.query_setting)
+update_setting = in_worker(bot_worker, db.update_setting)
+add_setting = in_worker(bot_worker, db.add_setting)
+remove_setting = in_worker(bot_worker, db.remove_setting)
+update_user_level = in_worker(bot_worker, db.update_user_level)
+query_custom_response = in_worker(bot_worker, db.query_custom_response)
+add_custom_response = in_worker(bot_worker, db.add_custom_response)
+remove_custom_response = in_worker(bot_worker, db.remove_custom_response)
+query_requestable_roles = in_worker(bot_worker, listed(db.query_requestable_roles))
+add_requestable_roles = in_worker(bot_worker, db.add_requestable_roles)
+remove_requestable_roles = in_worker(bot_worker, db.remove_requestable_roles)
+get_last_reminder_run = in_worker(bot_worker, db.get_last_reminder_run)
+start_reminder_run = in_worker(bot_worker, db.start_reminder_run)
+complete_reminder_run = in_worker(bot_worker, db.complete_reminder_run)
+get_reminder_deliveries = in_worker(bot_worker, db.get_reminder_deliveries)
+add_reminder_delivery = in_worker(bot_worker, db.add_reminder_delivery)
+add_reminder_failure = in_worker(bot_worker, db.add_reminder_failure)
+
+# shuffle database
+add_aliases = in_worker(shuffle_worker, db.add_aliases)
+remove_aliases = in_worker(shuffle_worker, db.remove_aliases)
+get_reminder_subscribers = in_worker(shuffle_worker, db.get_reminder_subscribers)
+query_reminder = in_worker(shuffle_worker, db.query_reminder)
+add_reminder_week = in_worker(shuffle_worker, db.add_reminder_week)
+add_reminder_pokemon = in_worker(shuffle_worker, db.add_reminder_pokemon)
+remove_reminder_week = in_worker(shuffle_worker, db.remove_reminder_week)
+remove_reminder_pokemon = in_worker(shuffle_worker, db.remove_reminder_pokemon)
+refresh_event_members = in_worker(shuffle_worker, db.refresh_event_members)
+reload_game_data = in_worker(shuffle_worker, db.reload_game_data)
+replace_shuffle_database = in_worker(shuffle_worker, db.replace_shuffle_database)
@@ -0,0 +1,360 @@
+"""Replay recorded command traffic offline, to measure the latency of the commands.
+
+The corpus is either an activity log written by ``Koduck.log``
+(its prefix commands are replayed, as sent by the same users),
+or a text file with one message per line.
+Messages go through ``on_message`` against copies of the databases,
+with stand-ins for the Discord objects: nothing is sent, and nobody reacts to the messages.
+Rate limits are disabled, and the emojis are not loaded.
+
+Run from the repository root:
+
+    python src/benchmark.py run logs/log.txt --repeat 5 --allocations --output new.json
+    python src/benchmark.py compare old.json new.json --threshold 0.1
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import itertools
+import json
+import re
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import db
+import koduck
+import main
+import settings
+from buffered_log import activity_log
+from metrics import metrics
+
+_ids = itertools.count(1)
+
+
+@dataclass
+class StubUser:
+    id: int
+    name: str = "benchmark"
+    discriminator: str = "0"
+    bot: bool = False
+
+    @property
+    def mention(self) -> str:
+        return f"<@{self.id}>"
+
+
+@dataclass
+class StubGuild:
+    id: int = 1
+    name: str = "benchmark"
+
+    def get_member(self, user_id: int) -> None:
+        return None
+
+    def get_role(self, role_id: int) -> None:
+        return None
+
+
+@dataclass
+class StubChannel:
+    id: int = 1
+    name: str = "benchmark"
+    sent: int = 0
+
+    async def send(self, **kwargs: Any) -> "StubMessage":
+        self.sent += 1
+        return StubMessage(
+            content=kwargs.get("content") or "", author=BOT_USER, channel=self
+        )
+
+    async def fetch_message(self, message_id: int) -> "StubMessage":
+        return StubMessage(author=BOT_USER, channel=self, id=message_id)
+
+
+@dataclass
+class StubMessage:
+    content: str = ""
+    author: StubUser = field(default_factory=lambda: StubUser(1))
+    channel: StubChannel = field(default_factory=StubChannel)
+    guild: StubGuild | None = field(default_factory=StubGuild)
+    id: int = field(default_factory=lambda: next(_ids))
+
+    @property
+    def raw_mentions(self) -> list[int]:
+        return [int(x) for x in re.findall(r"<@!?([0-9]+)>", self.content)]
+
+    async def add_reaction(self, emoji: str) -> None:
+        pass
+
+    async def remove_reaction(self, emoji: str, user: Any) -> None:
+        pass
+
+    async def edit(self, **kwargs: Any) -> None:
+        pass
+
+    async def delete(self) -> None:
+        pass
+
+
+BOT_USER = StubUser(0, name="SobbleDex", bot=True)
+
+
+@dataclass
+class Request:
+    content: str
+    user_id: int = 1
+
+    @property
+    def command(self) -> str:
+        if not self.content.startswith(settings.command_prefix):
+            return "(no command)"
+        words = self.content[len(settings.command_prefix) :].split(maxsplit=1)
+        return words[0].lower() if words else "(no command)"
+
+    def message(self, channel: StubChannel) -> StubMessage:
+        return StubMessage(self.content, StubUser(self.user_id), channel)
+
+
+def read_corpus(path: Path) -> list[Request]:
+    """Read the prefix commands of an activity log, or the lines of a text file."""
+    fields = re.findall(r"\{(\w+)\}", settings.log_format)
+    requests: list[Request] = []
+    with open(path, encoding="utf8") as file:
+        for line in file:
+            line = line.rstrip("\n")
+            values = line.split("\t")
+            if len(values) != len(fields):
+                if line.strip() and not line.startswith("#"):
+                    requests.append(Request(line))
+                continue
+            entry = dict(zip(fields, values))
+            if entry["type"] != "prefix_command" or entry["extra"]:
+                continue
+            requests.append(
+                Request(
+                    entry["message_content"].replace("\\n", "\n"),
+                    int(entry["user_id"]) if entry["user_id"].isdigit() else 1,
+                )
+            )
+    return requests
+
+
+async def _no_reaction(*args: Any, **kwargs: Any) -> None:
+    raise asyncio.TimeoutError
+
+
+async def setup(tmp_dir: Path) -> koduck.Koduck:
+    """Load copies of the databases and the commands, as on startup."""
+    for name, path in (("bot", db.DB_BOT_PATH), ("shuffle", db.DB_SHUFFLE_PATH)):
+        copy = tmp_dir / path.name
+        shutil.copy(path, copy)
+        setattr(db, f"{name}_connection", db.connect(copy))
+    db.load_game_data()
+    db.alias_index.load()
+    db.reminder_index.load()
+
+    instance = koduck.Koduck()
+    instance.client._connection.user = BOT_USER  # type: ignore
+    instance.client.wait_for = _no_reaction  # type: ignore
+    instance.add_command("refreshcommands", main.refresh_commands, "prefix", 3)
+    await instance.run_command("refreshcommands")
+    settings.ignore_cd_level = 0
+    settings.log_file = str(tmp_dir / "log.txt")
+    return instance
+
+
+async def replay(
+    requests: list[Request], channel: StubChannel
+) -> dict[str, list[float]]:
+    """Send each message in turn, and return the latencies (ms) by command."""
+    samples: dict[str, list[float]] = {}
+    for request in requests:
+        message = request.message(channel)
+        start = time.perf_counter()
+        await koduck.on_message(message)  # type: ignore
+        samples.setdefault(request.command, []).append(
+            (time.perf_counter() - start) * 1000
+        )
+    return samples
+
+
+async def measure_allocations(
+    requests: list[Request], channel: StubChannel
+) -> dict[str, list[float]]:
+    """Return the peak memory allocated (KiB) while handling each message, by command."""
+    allocations: dict[str, list[float]] = {}
+    tracemalloc.start()
+    try:
+        for request in requests:
+            message = request.message(channel)
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            await koduck.on_message(message)  # type: ignore
+            _, peak = tracemalloc.get_traced_memory()
+            allocations.setdefault(request.command, []).append((peak - before) / 1024)
+    finally:
+        tracemalloc.stop()
+    return allocations
+
+
+def percentiles(samples: list[float]) -> dict[str, float]:
+    if len(samples) == 1:
+        return {q: samples[0] for q in ("p50", "p95", "p99")}
+    cuts = statistics.quantiles(samples, n=100, method="inclusive")
+    return {"p50": cuts[49], "p95": cuts[94], "p99": cuts[98]}
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    with tempfile.TemporaryDirectory() as tmp:
+        await setup(Path(tmp))
+        requests = read_corpus(args.corpus)
+        if not requests:
+            sys.exit(f"No commands found in {args.corpus}")
+        channel = StubChannel()
+        writer = asyncio.create_task(activity_log.run())
+        # output of the commands, and tracebacks of those failing without Discord
+        output = None if args.verbose else io.StringIO()
+        with (
+            contextlib.redirect_stdout(output or sys.stdout),
+            contextlib.redirect_stderr(output or sys.stderr),
+        ):
+            for _ in range(args.warmup):
+                await replay(requests, channel)
+            metrics.reset()
+            start = time.perf_counter()
+            samples: dict[str, list[float]] = {}
+            for _ in range(args.repeat):
+                for command, values in (await replay(requests, channel)).items():
+                    samples.setdefault(command, []).extend(values)
+            elapsed = time.perf_counter() - start
+            phases = metrics.to_dict()["commands"]
+            allocations = (
+                await measure_allocations(requests, channel) if args.allocations else {}
+            )
+        writer.cancel()
+        db.bot_connection.close()
+        db.shuffle_connection.close()
+
+    total = sum(len(v) for v in samples.values())
+    commands: dict[str, dict[str, Any]] = {}
+    for command, values in sorted(samples.items()):
+        commands[command] = {
+            "count": len(values),
+            "errors": phases.get(command, {}).get("errors", 0),
+            "mean": statistics.fmean(values),
+            **percentiles(values),
+            "phases": {
+                phase: data
+                for phase, data in phases.get(command, {}).items()
+                if isinstance(data, dict)
+            },
+        }
+        if command in allocations:
+            commands[command]["alloc_kib"] = statistics.median(allocations[command])
+    return {
+        "corpus": str(args.corpus),
+        "commands_run": total,
+        "seconds": elapsed,
+        "throughput": total / elapsed if elapsed else 0.0,
+        "commands": commands,
+    }
+
+
+def print_results(results: dict[str, Any]) -> None:
+    print(
+        f"{results['commands_run']} commands in {results['seconds']:.2f}s "
+        f"({results['throughput']:.1f}/s)"
+    )
+    print(
+        f"{'command':<16}{'count':>7}{'errors':>7}"
+        f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'alloc KiB':>11}"
+    )
+    for command, r in results["commands"].items():
+        alloc = f"{r['alloc_kib']:.1f}" if "alloc_kib" in r else "-"
+        print(
+            f"{command:<16}{r['count']:>7}{r['errors']:>7}"
+            f"{r['p50']:>9.2f}{r['p95']:>9.2f}{r['p99']:>9.2f}{alloc:>11}"
+        )
+
+
+def compare(
+    old: dict[str, Any], new: dict[str, Any], threshold: float, min_delta: float
+) -> list[str]:
+    """Print the latency changes between two runs, and return the regressed commands.
+
+    A command regresses if its p50 or p95 grew by more than ``threshold`` (relative)
+    and ``min_delta`` milliseconds.
+    """
+    regressions: list[str] = []
+    print(f"{'command':<16}{'p50 ms':>17}{'p95 ms':>17}{'change':>9}")
+    for command in sorted(old["commands"].keys() & new["commands"].keys()):
+        a, b = old["commands"][command], new["commands"][command]
+        regressed = any(
+            b[q] > a[q] * (1 + threshold) and b[q] - a[q] > min_delta
+            for q in ("p50", "p95")
+        )
+        change = (b["p95"] - a["p95"]) / a["p95"] if a["p95"] else 0.0
+        print(
+            f"{command:<16}{a['p50']:>8.2f} ->{b['p50']:>6.2f}"
+            f"{a['p95']:>8.2f} ->{b['p95']:>6.2f}{change:>+9.0%}"
+            + ("  REGRESSION" if regressed else "")
+        )
+        if regressed:
+            regressions.append(command)
+    print(
+        f"throughput: {old['throughput']:.1f}/s -> {new['throughput']:.1f}/s, "
+        f"{len(regressions)} regressions"
+    )
+    return regressions
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    subparsers = parser.add_subparsers(dest="action", required=True)
+
+    run_parser = subparsers.add_parser("run", help="replay a corpus")
+    run_parser.add_argument("corpus", type=Path)
+    run_parser.add_argument("--repeat", type=int, default=3)
+    run_parser.add_argument("--warmup", type=int, default=1)
+    run_parser.add_argument(
+        "--allocations", action="store_true", help="also measure memory allocations"
+    )
+    run_parser.add_argument("--output", type=Path, help="save the results as JSON")
+    run_parser.add_argument("--verbose", action="store_true", help="show tracebacks")
+
+    compare_parser = subparsers.add_parser("compare", help="compare two runs")
+    compare_parser.add_argument("old", type=Path)
+    compare_parser.add_argument("new", type=Path)
+    compare_parser.add_argument("--threshold", type=float, default=0.1)
+    compare_parser.add_argument("--min-delta", type=float, default=0.05)
+    return parser.parse_args(argv)
+
+
+def benchmark(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    if args.action == "compare":
+        with open(args.old, encoding="utf8") as f:
+            old = json.load(f)
+        with open(args.new, encoding="utf8") as f:
+            new = json.load(f)
+        return 1 if compare(old, new, args.threshold, args.min_delta) else 0
+
+    results = asyncio.run(run(args))
+    print_results(results)
+    if args.output:
+        with open(args.output, "w", encoding="utf8") as f:
+            json.dump(results, f, indent=1)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(benchmark())
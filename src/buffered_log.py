@@ -0,0 +1,104 @@
+import asyncio
+import atexit
+import datetime
+import threading
+from pathlib import Path
+from typing import Callable
+
+import settings
+
+
+class BufferedLog:
+    """Write the activity log in batches, away from the event loop.
+
+    Entries are callables returning the line to write, so that they are only formatted
+    when flushed, in a worker thread, together with the file write.
+    The buffer is flushed every ``settings.log_flush_interval`` seconds,
+    or as soon as it holds ``settings.log_flush_size`` entries.
+
+    The file is rotated when it grows over ``settings.log_max_bytes`` (if not 0),
+    and when the day changes (if ``settings.log_rotate_daily``);
+    the old file is renamed after the day it was started.
+    """
+
+    def __init__(self) -> None:
+        self._buffer: list[Callable[[], str]] = []
+        self._wakeup: asyncio.Event | None = None
+        self._file_lock = threading.Lock()
+        self._day: datetime.date | None = None
+
+    def write(self, entry: Callable[[], str]) -> None:
+        self._buffer.append(entry)
+        if len(self._buffer) < settings.log_flush_size:
+            return
+        if self._wakeup:
+            self._wakeup.set()
+        else:
+            # the writer task is not running, e.g. before the client starts
+            self.flush()
+
+    async def run(self) -> None:
+        """Flush the buffer until cancelled. Started in the client setup."""
+        self._wakeup = asyncio.Event()
+        try:
+            while True:
+                try:
+                    await asyncio.wait_for(
+                        self._wakeup.wait(), settings.log_flush_interval
+                    )
+                except TimeoutError:
+                    pass
+                self._wakeup.clear()
+                entries, self._buffer = self._buffer, []
+                if entries:
+                    await asyncio.to_thread(self._write, entries)
+        finally:
+            self._wakeup = None
+            self.flush()
+
+    def flush(self) -> None:
+        """Write everything in the buffer, blocking."""
+        entries, self._buffer = self._buffer, []
+        if entries:
+            self._write(entries)
+
+    def _write(self, entries: list[Callable[[], str]]) -> None:
+        lines: list[str] = []
+        for entry in entries:
+            try:
+                lines.append(entry())
+            except Exception as e:
+                print(f"Failed to format log entry: {e}")
+        path = Path(settings.log_file)
+        with self._file_lock:
+            try:
+                self._rotate(path)
+                path.parent.mkdir(parents=True, exist_ok=True)
+                with open(path, "a", encoding="utf8") as file:
+                    file.write("".join(lines))
+            except OSError as e:
+                print(f"Failed to write log: {e}")
+
+    def _rotate(self, path: Path) -> None:
+        today = datetime.datetime.now(datetime.timezone.utc).date()
+        if not path.exists():
+            self._day = today
+            return
+        if self._day is None:
+            self._day = datetime.datetime.fromtimestamp(
+                path.stat().st_mtime, datetime.timezone.utc
+            ).date()
+        if (settings.log_rotate_daily and self._day != today) or (
+            settings.log_max_bytes and path.stat().st_size >= settings.log_max_bytes
+        ):
+            target = path.with_name(f"{path.stem}.{self._day}{path.suffix}")
+            count = 1
+            while target.exists():
+                target = path.with_name(f"{path.stem}.{self._day}.{count}{path.suffix}")
+                count += 1
+            path.rename(target)
+        self._day = today
+
+
+activity_log = BufferedLog()
+atexit.register(activity_log.flush)
@@ -0,0 +1,52 @@
+from collections import OrderedDict
+from typing import Any, Hashable
+
+
+class LRUCache[K: Hashable, V]:
+    """Bounded mapping that evicts the least recently used entry when full.
+
+    Entries are tagged with the ``version`` they were computed for (e.g. the game data version):
+    when a different version is requested, the whole cache is dropped.
+    Hits and misses are counted for the cache stats command.
+    """
+
+    def __init__(self, name: str, maxsize: int) -> None:
+        self.name = name
+        self.maxsize = maxsize
+        self.version: int | None = None
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[K, V] = OrderedDict()
+        caches[name] = self
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: K, version: int | None = None) -> V | None:
+        if version != self.version:
+            self.clear()
+            self.version = version
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: K, value: V) -> None:
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > max(self.maxsize, 0):
+            self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def stats(self) -> str:
+        return f"{self.hits} hits, {self.misses} misses, {len(self)}/{self.maxsize} entries"
+
+
+# name -> cache, to report stats
+caches: dict[str, LRUCache[Any, Any]] = {}
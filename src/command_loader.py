@@ -0,0 +1,55 @@
+import contextlib
+import importlib
+import sys
+import time
+from types import ModuleType
+from typing import Any, Callable, Coroutine, Iterator
+
+# what was loaded -> how long it took (ms), in loading order
+load_times: dict[str, float] = {}
+
+
+@contextlib.contextmanager
+def timed(name: str) -> Iterator[None]:
+    """Record how long the block took, for the startup report."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        load_times[name] = (time.perf_counter() - start) * 1000
+
+
+def import_module(name: str) -> ModuleType:
+    """Import a module, recording how long it took if it was not imported yet."""
+    if name in sys.modules:
+        return sys.modules[name]
+    with timed(name):
+        return importlib.import_module(name)
+
+
+def lazy_command(
+    module_name: str, method_name: str
+) -> Callable[..., Coroutine[Any, Any, Any]]:
+    """Stand-in for a command function, importing its module when first run.
+
+    Errors in the import, or a missing function, are raised at that point.
+    """
+    function: Callable[..., Coroutine[Any, Any, Any]] | None = None
+
+    async def command(*args: Any, **kwargs: Any) -> Any:
+        nonlocal function
+        if function is None:
+            function = getattr(import_module(module_name), method_name)
+        return await function(*args, **kwargs)
+
+    command.__name__ = command.__qualname__ = method_name
+    command.__module__ = module_name
+    return command
+
+
+def report() -> str:
+    """Load times, slowest first."""
+    return "\n".join(
+        f"{name}: {ms:.1f}ms"
+        for name, ms in sorted(load_times.items(), key=lambda x: -x[1])
+    )
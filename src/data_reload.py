@@ -0,0 +1,174 @@
+"""Rebuild the shuffle database from the files in ``shuffle_tables/`` while the bot is running.
+
+The new database is built in a temporary file, in a background thread, and checked:
+the row counts must match the files, the pokemon, skills and stages referenced
+by the other tables must exist, and the game data must build from it.
+Only then is it copied over the live database, on the shuffle database worker,
+so that no other query runs in the meantime. The user tables (aliases and reminders)
+are carried over from the live database at that point, so no update is lost.
+Commands already running keep the game data they started with.
+"""
+
+import asyncio
+import sqlite3
+import tempfile
+from pathlib import Path
+from typing import Iterable
+
+import async_db
+import db
+import settings
+from exceptions import DataReloadError
+from game_data import GameData
+from models import StageType
+
+SHUFFLE_TABLES_PATH = Path(__file__).resolve().parent.parent / "shuffle_tables"
+# tables updated by the bot, kept as they are in the live database
+USER_TABLES = ("aliases", "reminder_weeks", "reminder_pokemon")
+# how many missing references are listed for each check
+MAX_LISTED = 10
+# seconds between checks of the setting while watching the files is turned off
+WATCH_OFF_INTERVAL = 60
+
+_lock = asyncio.Lock()
+
+
+async def reload_tables(tables_path: Path = SHUFFLE_TABLES_PATH) -> dict[str, int]:
+    """Rebuild the shuffle database from ``tables_path`` and switch to it.
+
+    Return the number of rows read for each table.
+    Raise ``DataReloadError``, leaving the live database untouched,
+    if the files are invalid or a reload is already running.
+    """
+    if _lock.locked():
+        raise DataReloadError("A reload is already running")
+    async with _lock:
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "shuffle.sqlite"
+            counts, data = await asyncio.to_thread(build_database, path, tables_path)
+            await async_db.replace_shuffle_database(path, data, USER_TABLES)
+    return counts
+
+
+def build_database(path: Path, tables_path: Path) -> tuple[dict[str, int], GameData]:
+    """Create a checked shuffle database at ``path``, without the user tables' rows.
+
+    Return the number of rows read for each table, and the game data built from it.
+    """
+    # pandas takes a while to import, and is only needed here
+    import populate_tables
+
+    try:
+        counts = populate_tables.make_shuffle_database(path, tables_path, USER_TABLES)
+        connection = db.connect(path)
+        try:
+            check_counts(connection, counts)
+            data = GameData(connection)
+            check_references(connection, data)
+        finally:
+            connection.close()
+    except DataReloadError:
+        raise
+    except Exception as e:  # anything in the files can be wrong, the message is enough
+        raise DataReloadError(f"{type(e).__name__}: {e}") from e
+    return counts, data
+
+
+def check_counts(connection: sqlite3.Connection, counts: dict[str, int]) -> None:
+    """Raise if a table is empty, or has a different number of rows than its file."""
+    problems: list[str] = []
+    for table, count in counts.items():
+        rows = connection.execute(f'SELECT COUNT(*) AS n FROM "{table}"').fetchone()
+        if not count:
+            problems.append(f"{table}: no rows")
+        elif rows["n"] != count:
+            problems.append(f"{table}: {rows['n']} rows instead of {count}")
+    if problems:
+        raise DataReloadError("\n".join(problems))
+
+
+def check_references(connection: sqlite3.Connection, data: GameData) -> None:
+    """Raise if the tables refer to pokemon, skills or stages that do not exist."""
+    event_stages = {i for stage_type, i in data.stages if stage_type == StageType.EVENT}
+    skill_notes = [
+        row["skill"] for row in connection.execute("SELECT skill FROM skill_notes")
+    ]
+    problems = [
+        _missing(
+            "stage pokemon",
+            (stage.pokemon for stage in data.stages.values()),
+            data.pokemon,
+        ),
+        _missing(
+            "pokemon skills",
+            (
+                skill
+                for pokemon in data.pokemon.values()
+                for skill in pokemon.all_skills
+            ),
+            data.skills,
+        ),
+        _missing(
+            "event pokemon",
+            (pokemon for event in data.events for pokemon in event.pokemon),
+            data.pokemon,
+        ),
+        _missing(
+            "event stages",
+            (i for event in data.events for i in event.stage_ids),
+            event_stages,
+        ),
+        _missing(
+            "escalation battle pokemon",
+            [*data.eb_details, *data.eb_rewards],
+            data.pokemon,
+        ),
+        _missing("skill notes", skill_notes, data.skills),
+    ]
+    if problems := [p for p in problems if p]:
+        raise DataReloadError("\n".join(problems))
+
+
+def _missing[T: (str, int)](what: str, names: Iterable[T], known: Iterable[T]) -> str:
+    unknown = sorted(set(names).difference(known))
+    if not unknown:
+        return ""
+    listed = ", ".join(map(str, unknown[:MAX_LISTED]))
+    more = f" and {len(unknown) - MAX_LISTED} more" if len(unknown) > MAX_LISTED else ""
+    return f"unknown {what}: {listed}{more}"
+
+
+def _signature(tables_path: Path) -> list[tuple[str, int, int]]:
+    signature: list[tuple[str, int, int]] = []
+    for file in sorted(tables_path.glob("*.txt")):
+        stat = file.stat()
+        signature.append((file.name, stat.st_mtime_ns, stat.st_size))
+    return signature
+
+
+async def watch_tables(tables_path: Path = SHUFFLE_TABLES_PATH) -> None:
+    """Reload the tables when the files change, checking every
+    ``settings.shuffle_tables_watch_interval`` seconds, until cancelled.
+    While the setting is 0 the files are not checked, the changes made in the meantime
+    are reloaded once it is turned on. Started in the client setup."""
+    last = _signature(tables_path)
+    changed = False
+    while True:
+        if not settings.shuffle_tables_watch_interval:
+            await asyncio.sleep(WATCH_OFF_INTERVAL)
+            continue
+        await asyncio.sleep(settings.shuffle_tables_watch_interval)
+        current = _signature(tables_path)
+        if current != last:
+            # wait for the files to stop changing
+            last, changed = current, True
+            continue
+        if not changed:
+            continue
+        changed = False
+        try:
+            counts = await reload_tables(tables_path)
+        except DataReloadError as e:
+            print(f"Shuffle tables not reloaded:\n{e}")
+        else:
+            print(f"Shuffle tables reloaded ({sum(counts.values())} rows)")
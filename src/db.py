@@ -1,19 +1,25 @@
+import contextlib
+import datetime
 import sqlite3
+import time
 from pathlib import Path
-from typing import Any, Iterator
+from types import MappingProxyType
+from typing import Any, Iterable, Iterator, Mapping, Self
 
+import command_loader
+import game_data
 from exceptions import InvalidBP, InvalidLevel
+from game_data import GameData
 from models import (
     Command,
-    Drop,
     EBReward,
     EBStretch,
     Event,
-    EventPokemon,
     EventStageRotation,
     Pokemon,
     PokemonType,
     Reminder,
+    ReminderRun,
     RotationEvent,
     Setting,
     Skill,
@@ -25,11 +31,12 @@ from models import (
 
 DB_BOT_PATH = Path(__file__).resolve().parent.parent / "db" / "bot.sqlite"
 DB_SHUFFLE_PATH = Path(__file__).resolve().parent.parent / "db" / "shuffle.sqlite"
-STAGE_TYPE_TABLE = {
-    StageType.MAIN: "main_stages",
-    StageType.EXPERT: "expert_stages",
-    StageType.EVENT: "event_stages",
-}
+GAME_DATA_SNAPSHOT_PATH = (
+    Path(__file__).resolve().parent.parent / "db" / "game_data.snapshot"
+)
+EVENT_MEMBERS_QUERY = (
+    Path(__file__).resolve().parent.parent / "queries" / "refresh_event_members.sql"
+)
 
 # TODO Initialise these connections in main where appropriate instead of using global variables
 
@@ -39,48 +46,267 @@ def dict_factory(cursor: sqlite3.Cursor, row: sqlite3.Row) -> dict[str, Any]:
     return dict(zip(fields, row))
 
 
-bot_connection = sqlite3.connect(DB_BOT_PATH)
-bot_connection.row_factory = dict_factory
+def connect(path: str | Path) -> sqlite3.Connection:
+    """Open a connection to a database.
+
+    The connection can be used from the database worker thread, see ``async_db``.
+    """
+    connection = sqlite3.connect(path, check_same_thread=False)
+    connection.row_factory = dict_factory
+    return connection
+
+
+def enable_wal() -> None:
+    """Switch the databases to write-ahead logging, so reads are not blocked by writes."""
+    for connection in (bot_connection, shuffle_connection):
+        connection.execute("PRAGMA journal_mode=WAL")
+
+
+bot_connection = connect(DB_BOT_PATH)
+shuffle_connection = connect(DB_SHUFFLE_PATH)
 
-shuffle_connection = sqlite3.connect(DB_SHUFFLE_PATH)
-shuffle_connection.row_factory = dict_factory
+
+class AliasIndex:
+    """In-memory copy of the aliases table, keyed by lowercase alias.
+
+    The table is read in full once and then kept up to date by ``add_aliases``
+    and ``remove_aliases``. If ``shuffle_connection`` is replaced
+    (e.g. pointed at a different database), the index is reloaded on next access.
+    ``version`` changes with every update, for the indexes derived from the aliases.
+    """
+
+    def __init__(self) -> None:
+        self._aliases: dict[str, str] = {}
+        self._view = MappingProxyType(self._aliases)
+        self._connection: sqlite3.Connection | None = None
+        self.version = 0
+
+    def load(self) -> None:
+        q = shuffle_connection.execute(
+            """
+            SELECT alias, original_name
+            FROM aliases
+            """
+        )
+        self._aliases.clear()
+        self._aliases.update(
+            (entry["alias"].lower(), entry["original_name"]) for entry in q.fetchall()
+        )
+        self._connection = shuffle_connection
+        self.version += 1
+
+    @property
+    def aliases(self) -> Mapping[str, str]:
+        if self._connection is not shuffle_connection:
+            self.load()
+        return self._view
+
+    def add(self, alias: str, original: str) -> None:
+        if self._connection is shuffle_connection:
+            self._aliases[alias.lower()] = original
+            self.version += 1
+
+    def remove(self, alias: str) -> None:
+        if self._connection is shuffle_connection:
+            self._aliases.pop(alias.lower(), None)
+            self.version += 1
+
+
+alias_index = AliasIndex()
+
+
+class ReminderIndex:
+    """In-memory copy of the reminder tables, with the subscribers of each week and pokemon.
+
+    Like ``AliasIndex``, the tables are read once and the index is then kept up to date
+    by the functions adding or removing reminders.
+    """
+
+    def __init__(self) -> None:
+        self.users: dict[int, Reminder] = {}
+        self.weeks: dict[int, set[int]] = {}
+        self.pokemon: dict[str, set[int]] = {}
+        self._connection: sqlite3.Connection | None = None
+
+    def load(self) -> None:
+        self.users, self.weeks, self.pokemon = {}, {}, {}
+        for row in shuffle_connection.execute(
+            "SELECT user_id, week FROM reminder_weeks ORDER BY id"
+        ).fetchall():
+            self.add_week(row["user_id"], row["week"])
+        for row in shuffle_connection.execute(
+            "SELECT user_id, pokemon FROM reminder_pokemon ORDER BY id"
+        ).fetchall():
+            self.add_pokemon(row["user_id"], row["pokemon"])
+        self._connection = shuffle_connection
+
+    def current(self) -> Self:
+        """Return the index, reloaded if ``shuffle_connection`` was replaced."""
+        if self._connection is not shuffle_connection:
+            self.load()
+        return self
+
+    def add_week(self, user_id: int, week: int) -> None:
+        self._user(user_id).weeks.append(week)
+        self.weeks.setdefault(week, set()).add(user_id)
+
+    def add_pokemon(self, user_id: int, pokemon: str) -> None:
+        self._user(user_id).pokemon.append(pokemon)
+        self.pokemon.setdefault(pokemon, set()).add(user_id)
+
+    def remove_week(self, user_id: int, week: int) -> None:
+        self.users[user_id].remove_week(week)
+        self.weeks[week].discard(user_id)
+        self._drop_if_empty(user_id)
+
+    def remove_pokemon(self, user_id: int, pokemon: str) -> None:
+        self.users[user_id].remove_pokemon(pokemon)
+        self.pokemon[pokemon].discard(user_id)
+        self._drop_if_empty(user_id)
+
+    def _user(self, user_id: int) -> Reminder:
+        if user_id not in self.users:
+            self.users[user_id] = Reminder(user_id, "", "")
+        return self.users[user_id]
+
+    def _drop_if_empty(self, user_id: int) -> None:
+        reminder = self.users[user_id]
+        if not reminder.weeks and not reminder.pokemon:
+            del self.users[user_id]
+
+
+reminder_index = ReminderIndex()
+
+_game_data: GameData | None = None
+_game_data_connection: sqlite3.Connection | None = None
+
+
+def get_game_data() -> GameData:
+    """Return the snapshot of the static shuffle tables, building it if needed."""
+    if _game_data is None or _game_data_connection is not shuffle_connection:
+        return load_game_data()
+    return _game_data
+
+
+def load_game_data(snapshot: Path | None = None) -> GameData:
+    """(Re)build the game data snapshot from ``shuffle_connection``.
+
+    If a ``snapshot`` file is given, the game data is loaded from it when it was saved
+    from the same database, or built and saved to it otherwise.
+    The time taken by either path is recorded in the startup load times.
+    """
+    global _game_data
+    global _game_data_connection
+    if snapshot is None:
+        _game_data = GameData(shuffle_connection)
+    else:
+        _game_data = _load_game_data_snapshot(snapshot)
+    _game_data_connection = shuffle_connection
+    return _game_data
+
+
+def _load_game_data_snapshot(snapshot: Path) -> GameData:
+    start = time.perf_counter()
+    database = shuffle_connection.execute("PRAGMA database_list").fetchone()["file"]
+    if not database:  # in memory
+        return GameData(shuffle_connection)
+    key = game_data.snapshot_key(Path(database))
+    if loaded := game_data.load_snapshot(snapshot, key):
+        data, build_ms = loaded
+        command_loader.load_times["game data (snapshot)"] = (
+            time.perf_counter() - start
+        ) * 1000
+        command_loader.load_times["game data (last rebuild)"] = build_ms
+        return data
+
+    build_start = time.perf_counter()
+    data = GameData(shuffle_connection)
+    build_ms = (time.perf_counter() - build_start) * 1000
+    try:
+        game_data.save_snapshot(data, snapshot, key, build_ms)
+    except OSError as e:
+        print(f"Could not save the game data snapshot: {e}")
+    command_loader.load_times["game data (rebuild)"] = (
+        time.perf_counter() - start
+    ) * 1000
+    return data
+
+
+def refresh_event_members() -> None:
+    """Rebuild the event_pokemon and event_stage_ids tables from the events table."""
+    with open(EVENT_MEMBERS_QUERY, encoding="utf-8") as f:
+        query = f.read()
+    shuffle_connection.executescript(f"BEGIN;\n{query}\nCOMMIT;")
+
+
+def replace_shuffle_database(
+    path: Path, data: GameData, user_tables: Iterable[str]
+) -> None:
+    """Overwrite the shuffle database with the one at ``path``, and switch to ``data``
+    as the game data snapshot.
+
+    The rows of ``user_tables`` are first copied from the current database into the new one.
+    The copy is written with the backup API, in one transaction, so the connection stays valid.
+    Run it on the shuffle database worker, so that no other query runs in the meantime.
+    """
+    global _game_data
+    global _game_data_connection
+    shuffle_connection.execute("ATTACH DATABASE ? AS fresh", (str(path),))
+    try:
+        with shuffle_connection:
+            for table in user_tables:
+                columns = ", ".join(
+                    f'"{row["name"]}"'
+                    for row in shuffle_connection.execute(
+                        f'PRAGMA fresh.table_info("{table}")'
+                    )
+                )
+                shuffle_connection.execute(f'DELETE FROM fresh."{table}"')
+                shuffle_connection.execute(
+                    f'INSERT INTO fresh."{table}" ({columns})'
+                    f' SELECT {columns} FROM main."{table}"'
+                )
+    finally:
+        shuffle_connection.execute("DETACH DATABASE fresh")
+    with contextlib.closing(sqlite3.connect(path)) as fresh:
+        fresh.backup(shuffle_connection)
+    _game_data = data
+    _game_data_connection = shuffle_connection
+    alias_index.load()
+    reminder_index.load()
+
+
+def reload_game_data() -> GameData:
+    """Reload everything read from the shuffle database after a data refresh."""
+    game_data = load_game_data()
+    alias_index.load()
+    return game_data
 
 
 def query_event_week(week: int) -> Iterator[RotationEvent]:
-    q = shuffle_connection.execute(
-        """
-        SELECT stage_type, pokemon, stage_ids, cost_unlock, encounter_rates
-        FROM events
-        WHERE repeat_type = "Rotation"
-        AND repeat_param_1 + 1 = :query_week
-        """,
-        {"query_week": week},
-    )
-    for event in q.fetchall():
-        yield RotationEvent(**event)
+    yield from get_game_data().calendar.week(week)
+
+
+def query_next_event_week(pokemon: str, week: int) -> int | None:
+    """Return the first rotation week, from the given one onwards, featuring the pokemon."""
+    return get_game_data().calendar.next_week(pokemon, week)
+
+
+def get_next_appearance(
+    event: Event, time: datetime.datetime
+) -> tuple[datetime.datetime, datetime.datetime]:
+    return get_game_data().calendar.next_appearance(event, time)
+
+
+def get_event_pokemon_on(time: datetime.datetime) -> list[str]:
+    return get_game_data().calendar.event_pokemon_on(time)
 
 
 def get_event_stage_by_index(index: int) -> EventStageRotation:
-    q = shuffle_connection.execute(
-        """
-        SELECT cost_type, attempt_cost,
-        drop_1_item, drop_1_amount, drop_2_item, drop_2_amount, drop_3_item, drop_3_amount,
-        drop_1_rate, drop_2_rate, drop_3_rate, items_available
-        FROM event_stages
-        WHERE id = :stage_id""",
-        {"stage_id": index},
-    ).fetchone()
-    if not q:
-        raise ValueError(f"No event stage with index {index}")
-    drops = [
-        Drop(q["drop_1_item"], q["drop_1_amount"], q["drop_1_rate"]),
-        Drop(q["drop_2_item"], q["drop_2_amount"], q["drop_2_rate"]),
-        Drop(q["drop_3_item"], q["drop_3_amount"], q["drop_3_rate"]),
-    ]
-    stage = EventStageRotation(
-        q["cost_type"], q["attempt_cost"], drops, q["items_available"]
-    )
-    return stage
+    try:
+        return get_game_data().event_stages_rotation[index]
+    except KeyError as e:
+        raise ValueError(f"No event stage with index {index}") from e
 
 
 def get_settings() -> Iterator[Setting]:
@@ -156,17 +382,9 @@ def update_user_level(user_id: int, level: int) -> None:
     bot_connection.commit()
 
 
-def query_user_level(user_id: int) -> int | None:
-    q = bot_connection.execute(
-        """
-        SELECT level FROM user_levels
-        WHERE user_id = :user_id
-        """,
-        {"user_id": user_id},
-    ).fetchone()
-    if not q:
-        return None
-    return q["level"]
+def get_user_levels() -> dict[int, int]:
+    q = bot_connection.execute("SELECT user_id, level FROM user_levels")
+    return {row["user_id"]: row["level"] for row in q.fetchall()}
 
 
 def get_commands() -> Iterator[Command]:
@@ -180,51 +398,17 @@ def get_commands() -> Iterator[Command]:
         yield Command(**command)
 
 
-def get_aliases() -> dict[str, str]:
-    q = shuffle_connection.execute(
-        """
-        SELECT alias, original_name
-        FROM aliases
-        """
-    )
-    return {entry["alias"].lower(): entry["original_name"] for entry in q.fetchall()}
+def get_aliases() -> Mapping[str, str]:
+    """Return a read-only view of all aliases, keyed by lowercase alias."""
+    return alias_index.aliases
 
 
 def query_eb_pokemon_by_week(week: int) -> str:
-    q = shuffle_connection.execute(
-        """
-        SELECT pokemon
-        FROM events
-        WHERE 
-        stage_type = "Escalation"
-        AND  (
-            repeat_param_1 + 1 = :week
-            OR (
-                repeat_param_1 + 2 = :week
-                AND duration = "14 days"
-            )
-        )
-        """,
-        {"week": week},
-    ).fetchone()
-    if not q:
-        return ""
-    return q["pokemon"]
+    return get_game_data().calendar.eb_pokemon(week)
 
 
-def get_farmable_pokemon() -> set[str]:
-    q = shuffle_connection.execute(
-        """
-        SELECT pokemon
-        FROM main_stages
-        WHERE (drop_1_item = "PSB" or drop_2_item = "PSB" or drop_3_item = "PSB")
-        UNION
-        SELECT pokemon
-        FROM event_stages
-        WHERE (drop_1_item = "PSB" or drop_2_item = "PSB" or drop_3_item = "PSB")
-        """
-    )
-    return {x["pokemon"] for x in q.fetchall()}
+def get_farmable_pokemon() -> frozenset[str]:
+    return get_game_data().farmable_pokemon
 
 
 def add_aliases(original: str, *aliases: str) -> tuple[list[str], list[str], list[str]]:
@@ -248,6 +432,7 @@ def add_aliases(original: str, *aliases: str) -> tuple[list[str], list[str], lis
             print(f"{alias} - {e}")
             failure.append(alias)
         else:
+            alias_index.add(alias, original)
             success.append(alias)
     return success, duplicate, failure
 
@@ -273,79 +458,39 @@ def remove_aliases(*aliases: str) -> tuple[list[tuple[str, str]], list[str], lis
             failure.append(alias)
         else:
             if q:
+                alias_index.remove(q["alias"])
                 success.append((q["original_name"], q["alias"]))
             else:
                 not_exist.append(alias)
     return success, not_exist, failure
 
 
-def get_all_event_pokemon() -> Iterator[EventPokemon]:
-    q = shuffle_connection.execute(
-        """
-        SELECT
-            stage_type, pokemon, repeat_type, repeat_param_1,
-            repeat_param_2, date_start, date_end, duration
-        FROM events
-        """,
-    )
-    for p in q.fetchall():
-        yield EventPokemon(**p)
-
-
 def query_stage_by_index(index: int, stage_type: StageType) -> Stage:
-    q = shuffle_connection.execute(
-        f"""
-        SELECT * FROM {STAGE_TYPE_TABLE[stage_type]}
-        WHERE id = :id
-        """,
-        {"id": index},
-    ).fetchone()
-    if not q:
-        raise ValueError(f"Invalid stage index: {index}")
-    return Stage(stage_type=stage_type, **q)
+    try:
+        return get_game_data().stages[(stage_type, index)]
+    except KeyError as e:
+        raise ValueError(f"Invalid stage index: {index}") from e
 
 
 def query_stage_by_pokemon(pokemon: str, stage_type: StageType) -> Iterator[Stage]:
-    q = shuffle_connection.execute(
-        f"""
-        SELECT * FROM {STAGE_TYPE_TABLE[stage_type]}
-        WHERE pokemon = :pokemon
-        COLLATE NOCASE
-        """,
-        {"pokemon": pokemon},
-    )
-    for stage in q.fetchall():
-        yield Stage(stage_type=stage_type, **stage)
+    yield from get_game_data().stages_by_pokemon.get((stage_type, pokemon.lower()), [])
 
 
 def query_event_by_pokemon(pokemon: str) -> Iterator[Event]:
-    q = shuffle_connection.execute(
-        """
-        SELECT * FROM events
-        WHERE
-            pokemon = :pokemon
-        OR  pokemon LIKE :pokemon || '/%'
-        OR  pokemon LIKE '%/' || :pokemon || '/%'
-        OR  pokemon LIKE '%/' || :pokemon
-        GROUP BY pokemon, date_start
-        """,
-        {"pokemon": pokemon},
-    )
-    for event in q.fetchall():
-        yield Event(**event)
+    yield from get_game_data().events_by_pokemon.get(pokemon, [])
 
 
 def get_all_stages(stage_type: StageType) -> Iterator[Stage]:
-    q = shuffle_connection.execute(f"SELECT * FROM {STAGE_TYPE_TABLE[stage_type]}")
-    for stage in q.fetchall():
-        yield Stage(stage_type=stage_type, **stage)
+    yield from get_game_data().stages_by_type.get(stage_type, [])
 
 
 def get_db_table_column(
-    table: str, column: str, conn: sqlite3.Connection = shuffle_connection
+    table: str, column: str, conn: sqlite3.Connection | None = None
 ) -> set[str]:
     #! Make sure the arguments can never be chosen by the end user.
     #! Otherwise, make sure to have some sanitisation is in place.
+    if conn is None:
+        conn = shuffle_connection
     q = conn.execute(
         f"""
         SELECT {column}
@@ -355,151 +500,67 @@ def get_db_table_column(
     return {x[column] for x in q}
 
 
+def get_names(table: str, column: str) -> Mapping[str, str]:
+    """Return the entries of the given column, keyed by their lowercase version."""
+    names = get_game_data().names.get((table, column))
+    if names is None:
+        names = {x.lower(): x for x in get_db_table_column(table, column)}
+    return names
+
+
 def query_eb_pokemon(pokemon: str) -> list[EBStretch]:
-    q = shuffle_connection.execute(
-        """
-        SELECT pokemon, start_level, end_level, stage_index
-        FROM eb_details
-        WHERE pokemon = :pokemon
-        ORDER BY id
-        """,
-        {"pokemon": pokemon},
-    )
-    return [EBStretch(**leg) for leg in q.fetchall()]
+    return list(get_game_data().eb_details.get(pokemon, []))
 
 
 def query_pokemon_type(pokemon: str) -> PokemonType:
-    q = shuffle_connection.execute(
-        """
-        SELECT type
-        FROM pokemon
-        WHERE pokemon = :pokemon
-        """,
-        {"pokemon": pokemon},
-    )
-    return PokemonType(q.fetchone()["type"])
+    return PokemonType(get_game_data().pokemon[pokemon].type)
 
 
 def query_stage_notes(stage_id: str) -> str:
-    q = shuffle_connection.execute(
-        """
-        SELECT notes
-        FROM stage_notes
-        WHERE stage_id = :stage_id
-        """,
-        {"stage_id": stage_id},
-    ).fetchone()
-    if not q:
-        return ""
-    return q["notes"]
+    return get_game_data().stage_notes.get(stage_id, "")
 
 
 def query_eb_rewards_pokemon(pokemon: str) -> list[EBReward]:
-    q = shuffle_connection.execute(
-        """
-        SELECT pokemon, level, reward, amount, alternative
-        FROM eb_rewards
-        WHERE pokemon = :pokemon
-        ORDER BY id
-        """,
-        {"pokemon": pokemon},
-    )
-    return [EBReward(**stage) for stage in q.fetchall()]
+    return list(get_game_data().eb_rewards.get(pokemon, []))
 
 
 def query_weak_against(t: PokemonType) -> list[PokemonType]:
-    q = shuffle_connection.execute(
-        """
-        SELECT weak
-        FROM types
-        WHERE type = :type
-        """,
-        {"type": str(t)},
-    ).fetchone()
-    if not q:
+    type_info = get_game_data().types.get(t)
+    if not type_info:
         return []
-    return [PokemonType(t) for t in q["weak"].split(", ")]
+    return [PokemonType(t) for t in type_info.weak.split(", ")]
 
 
 def get_all_pokemon() -> Iterator[Pokemon]:
-    q = shuffle_connection.execute(
-        """
-        SELECT * FROM pokemon ORDER BY id
-        """
-    )
-    for pokemon in q.fetchall():
-        yield Pokemon(**pokemon)
+    yield from get_game_data().pokemon.values()
 
 
 def query_pokemon(pokemon: str) -> Pokemon | None:
-    q = shuffle_connection.execute(
-        """
-        SELECT * FROM pokemon
-        WHERE pokemon = :pokemon
-        """,
-        {"pokemon": pokemon},
-    ).fetchone()
-    if not q:
-        return None
-    return Pokemon(**q)
+    return get_game_data().pokemon.get(pokemon)
 
 
 def get_sm_rewards() -> list[SMReward]:
-    q = shuffle_connection.execute(
-        """
-        SELECT
-        level, first_reward_type AS reward, first_reward_amount AS amount,
-        repeat_reward_type AS reward_repeat, repeat_reward_amount AS amount_repeat
-        FROM sm_rewards
-        ORDER BY level
-        """
-    )
-    return [SMReward(**reward) for reward in q.fetchall()]
+    return list(get_game_data().sm_rewards)
 
 
-def get_reminders() -> Iterator[Reminder]:
-    q = shuffle_connection.execute(
-        """
-        SELECT user_id, weeks, pokemon
-        FROM reminders
-        ORDER BY id
-        """
-    )
-    for reminder in q.fetchall():
-        yield Reminder(**reminder)
+def query_reminder(user_id: int) -> Reminder | None:
+    reminder = reminder_index.current().users.get(user_id)
+    return reminder.copy() if reminder else None
 
 
-def query_reminder(user_id: int) -> Reminder | None:
-    q = shuffle_connection.execute(
-        """
-        SELECT user_id, weeks, pokemon
-        FROM reminders
-        WHERE user_id = :user_id
-        """,
-        {"user_id": user_id},
-    ).fetchone()
-    if not q:
-        return None
-    return Reminder(**q)
+def get_reminder_subscribers(
+    week: int | None, pokemon: Iterable[str]
+) -> list[Reminder]:
+    """Return the reminders of the users subscribed to the week or any of the pokemon."""
+    index = reminder_index.current()
+    user_ids: set[int] = set(index.weeks.get(week, ())) if week is not None else set()
+    for p in pokemon:
+        user_ids.update(index.pokemon.get(p, ()))
+    return [index.users[user_id].copy() for user_id in sorted(user_ids)]
 
 
 def query_skill(skill: str) -> Skill | None:
-    q = shuffle_connection.execute(
-        """
-        SELECT
-        s.id AS id, s.skill AS skill, description, rate1, rate2, rate3,
-        type, multiplier, bonus_effect, bonus1, bonus2, bonus3, bonus4,
-        sp1, sp2, sp3, sp4, notes
-        FROM skills s
-        LEFT JOIN skill_notes sn
-        ON s.skill = sn.skill
-        WHERE s.skill = :skill
-        """,
-        {"skill": skill},
-    ).fetchone()
-    if not q:
-        return None
-    return Skill(**q)
+    return get_game_data().skills.get(skill)
 
 
 def query_ap(bp: int) -> list[int]:
@@ -508,86 +569,152 @@ def query_ap(bp: int) -> list[int]:
     Raises:
         InvalidBP: if `bp` is not 30, 40, ..., 90.
     """
-    q = shuffle_connection.execute(
-        f"""
-        SELECT {', '.join(f"lvl{i}" for i in range(1, 31))} FROM ap
-        WHERE base_ap = :bp
-        """,
-        {"bp": bp},
-    ).fetchone()
+    try:
+        return sorted(get_game_data().ap[bp])
+    except KeyError as e:
+        raise InvalidBP() from e
 
-    if not q:
-        raise InvalidBP()
 
-    return sorted(q.values())
+def query_exp(bp: int) -> list[int]:
+    return sorted(get_game_data().exp.get(bp, ()))
 
 
-def query_exp(bp: int) -> list[int]:
+def query_type(t: PokemonType) -> TypeInfo:
+    return get_game_data().types[t]
+
+
+def add_reminder_week(user_id: int, week: int) -> None:
+    index = reminder_index.current()
     q = shuffle_connection.execute(
-        f"""
-        SELECT {', '.join(f"lvl{i}" for i in range(1, 31))} FROM exp
-        WHERE base_ap = :bp
+        """
+        INSERT OR IGNORE INTO reminder_weeks (user_id, week)
+        VALUES (:user_id, :week)
         """,
-        {"bp": bp},
-    ).fetchone()
-    if not q:
-        return []
-    return sorted(q.values())
+        {"user_id": user_id, "week": week},
+    )
+    shuffle_connection.commit()
+    if q.rowcount:
+        index.add_week(user_id, week)
 
 
-def query_type(t: PokemonType) -> TypeInfo:
+def add_reminder_pokemon(user_id: int, pokemon: str) -> None:
+    index = reminder_index.current()
     q = shuffle_connection.execute(
         """
-        SELECT * FROM types
-        WHERE type = :type
+        INSERT OR IGNORE INTO reminder_pokemon (user_id, pokemon)
+        VALUES (:user_id, :pokemon)
         """,
-        {"type": t.value},
-    ).fetchone()
-    return TypeInfo(**q)
+        {"user_id": user_id, "pokemon": pokemon},
+    )
+    shuffle_connection.commit()
+    if q.rowcount:
+        index.add_pokemon(user_id, pokemon)
 
 
-def add_reminder_week(user_id: int, week: int) -> None:
-    shuffle_connection.execute(
+def remove_reminder_week(user_id: int, week: int) -> None:
+    index = reminder_index.current()
+    q = shuffle_connection.execute(
         """
-        INSERT INTO reminders (user_id, weeks)
-        VALUES (:user_id, :week)
-        ON CONFLICT DO UPDATE
-        SET weeks = weeks || ", " || :week
-        WHERE user_id = :user_id
+        DELETE FROM reminder_weeks
+        WHERE user_id = :user_id AND week = :week
         """,
-        {"user_id": user_id, "week": str(week)},
+        {"user_id": user_id, "week": week},
     )
     shuffle_connection.commit()
+    if q.rowcount:
+        index.remove_week(user_id, week)
 
 
-def add_reminder_pokemon(user_id: int, pokemon: str) -> None:
-    shuffle_connection.execute(
+def remove_reminder_pokemon(user_id: int, pokemon: str) -> None:
+    index = reminder_index.current()
+    q = shuffle_connection.execute(
         """
-        INSERT INTO reminders (user_id, pokemon)
-        VALUES (:user_id, :pokemon)
-        ON CONFLICT DO UPDATE
-        SET pokemon = pokemon || ", " || :pokemon
-        WHERE user_id = :user_id
+        DELETE FROM reminder_pokemon
+        WHERE user_id = :user_id AND pokemon = :pokemon
         """,
         {"user_id": user_id, "pokemon": pokemon},
     )
     shuffle_connection.commit()
+    if q.rowcount:
+        index.remove_pokemon(user_id, pokemon)
 
 
-def update_reminder(reminder: Reminder) -> None:
-    shuffle_connection.execute(
+def get_last_reminder_run() -> ReminderRun | None:
+    q = bot_connection.execute(
         """
-        UPDATE reminders
-        SET weeks = :weeks, pokemon = :pokemon
-        WHERE user_id = :user_id
+        SELECT day, week, week_changed, completed
+        FROM reminder_runs
+        ORDER BY day DESC
+        LIMIT 1
+        """
+    ).fetchone()
+    if not q:
+        return None
+    return ReminderRun(
+        q["day"], q["week"], bool(q["week_changed"]), bool(q["completed"])
+    )
+
+
+def start_reminder_run(run: ReminderRun) -> None:
+    bot_connection.execute(
+        """
+        INSERT INTO reminder_runs (day, week, week_changed, completed)
+        VALUES (:day, :week, :week_changed, :completed)
         """,
         {
-            "user_id": reminder.user_id,
-            "weeks": reminder.weeks_str,
-            "pokemon": reminder.pokemon_str,
+            "day": run.day,
+            "week": run.week,
+            "week_changed": run.week_changed,
+            "completed": run.completed,
         },
     )
-    shuffle_connection.commit()
+    bot_connection.commit()
+
+
+def complete_reminder_run(day: str) -> None:
+    bot_connection.execute(
+        "UPDATE reminder_runs SET completed = 1 WHERE day = :day", {"day": day}
+    )
+    bot_connection.commit()
+
+
+def get_reminder_deliveries(day: str, max_attempts: int) -> set[int]:
+    """Return the users whose reminder was delivered, or failed ``max_attempts`` times."""
+    q = bot_connection.execute(
+        """
+        SELECT user_id
+        FROM reminder_deliveries
+        WHERE day = :day AND (delivered OR attempts >= :max_attempts)
+        """,
+        {"day": day, "max_attempts": max_attempts},
+    )
+    return {row["user_id"] for row in q.fetchall()}
+
+
+def add_reminder_delivery(day: str, user_id: int) -> None:
+    bot_connection.execute(
+        """
+        INSERT INTO reminder_deliveries (day, user_id, delivered, attempts)
+        VALUES (:day, :user_id, 1, 1)
+        ON CONFLICT (day, user_id) DO UPDATE SET
+            delivered = 1,
+            attempts = attempts + 1
+        """,
+        {"day": day, "user_id": user_id},
+    )
+    bot_connection.commit()
+
+
+def add_reminder_failure(day: str, user_id: int) -> None:
+    bot_connection.execute(
+        """
+        INSERT INTO reminder_deliveries (day, user_id, delivered, attempts)
+        VALUES (:day, :user_id, 0, 1)
+        ON CONFLICT (day, user_id) DO UPDATE SET attempts = attempts + 1
+        """,
+        {"day": day, "user_id": user_id},
+    )
+    bot_connection.commit()
 
 
 def query_custom_response(message: str) -> str:
@@ -605,17 +732,8 @@ def query_custom_response(message: str) -> str:
 
 
 def query_help_message(message: str) -> str:
-    q = shuffle_connection.execute(
-        """
-        SELECT message_text
-        FROM help_messages
-        WHERE message_type = 'message_help' || :message
-        """,
-        {"message": f"_{message}" if message else ""},
-    ).fetchone()
-    if not q:
-        return ""
-    return q["message_text"]
+    message_type = "message_help" + (f"_{message}" if message else "")
+    return get_game_data().help_messages.get(message_type, "")
 
 
 def query_commands(command: str) -> Command | None:
@@ -719,19 +837,13 @@ def query_requestable_roles(guild_id: int) -> Iterator[int]:
 
 
 def farming_stages(pokemon_name: str) -> list[Stage]:
-    q = shuffle_connection.execute(
-        """
-        SELECT 'Main' AS stage_type, * FROM main_stages
-        WHERE pokemon = :pokemon
-        AND (drop_1_item = "PSB" or drop_2_item = "PSB" or drop_3_item = "PSB")
-        UNION
-        SELECT 'Event' AS stage_type, * FROM event_stages
-        WHERE pokemon = :pokemon
-        AND (drop_1_item = "PSB" or drop_2_item = "PSB" or drop_3_item = "PSB")
-        """,
-        {"pokemon": pokemon_name},
-    )
-    return [Stage(**stage) for stage in q.fetchall()]
+    """Return the stages of the pokemon that drop PSBs, sorted by stage id."""
+    return list(get_game_data().farming_stages.get(pokemon_name, []))
+
+
+def get_runs_to_farm(stage: Stage, skill: Skill) -> tuple[int, int]:
+    """Return the expected runs of the stage to max the skill, without and with DRI."""
+    return get_game_data().runs_to_farm[(stage.stage_type, stage.id, skill.skill)]
 
 
 def get_ap_at_level(bp: int, level: int) -> int:
@@ -741,20 +853,12 @@ def get_ap_at_level(bp: int, level: int) -> int:
         InvalidLevel: `level` is not 1, 2, ..., 30.
         InvalidBP: `bp` is not 30, 40, ..., 90.
     """
+    if not isinstance(level, int) or not 1 <= level <= 30:
+        raise InvalidLevel()
     try:
-        assert isinstance(level, int)
-        q = shuffle_connection.execute(
-            f"""
-            SELECT lvl{level} AS ap FROM ap
-            WHERE base_ap = :bp
-            """,
-            {"bp": bp},
-        ).fetchone()
-    except (AssertionError, sqlite3.OperationalError) as e:
-        raise InvalidLevel() from e
-    if not q:
-        raise InvalidBP()
-    return q["ap"]
+        return get_game_data().ap[bp][level - 1]
+    except KeyError as e:
+        raise InvalidBP() from e
 
 
 if __name__ == "__main__":
@@ -1,8 +1,10 @@
 import asyncio
+import copy
 import datetime
+import functools
 import itertools
 import math
-from typing import Any, Iterable, Sequence
+from typing import Any, Callable, Hashable, Iterable, Sequence
 
 import discord
 import pytz
@@ -11,7 +13,9 @@ import constants
 import db
 import settings
 import utils
+from cache import LRUCache
 from koduck import KoduckContext
+from metrics import metrics
 from models import (
     CostType,
     EBReward,
@@ -32,7 +36,43 @@ from models import (
 DATE_FORMAT = "%Y/%m/%d %H:%M UTC"
 DATE_MANUAL_FORMAT = "{}/{}/{} {}:{} UTC"
 
+# (formatter, key) -> embed dict
+embed_cache: LRUCache[tuple[str, Hashable], dict[str, Any]] = LRUCache(
+    "embed", settings.embed_cache_size
+)
+
+
+def cached_embed[
+    **P
+](key: Callable[P, Hashable]) -> Callable[
+    [Callable[P, discord.Embed]], Callable[P, discord.Embed]
+]:
+    """Cache the embeds built by a formatter that only depends on the game data.
+
+    ``key`` maps the arguments of the formatter to the key of the embed in the cache.
+    Embeds are stored as dicts, and a new copy is returned each time,
+    since they are modified before being sent (e.g. emojified).
+    """
+
+    def decorator(
+        format_embed: Callable[P, discord.Embed]
+    ) -> Callable[P, discord.Embed]:
+        @functools.wraps(format_embed)
+        def wrapper(*args: P.args, **kwargs: P.kwargs) -> discord.Embed:
+            with metrics.timer("format"):
+                cache_key = (format_embed.__name__, key(*args, **kwargs))
+                data = embed_cache.get(cache_key, db.get_game_data().version)
+                if data is None:
+                    data = format_embed(*args, **kwargs).to_dict()
+                    embed_cache.put(cache_key, data)
+                return discord.Embed.from_dict(copy.deepcopy(data))
 
+        return wrapper
+
+    return decorator
+
+
+@cached_embed(lambda pokemon: pokemon.pokemon)
 def format_pokemon_embed(pokemon: Pokemon) -> discord.Embed:
     if pokemon.mega_power:
         stats = (
@@ -60,6 +100,7 @@ def format_pokemon_embed(pokemon: Pokemon) -> discord.Embed:
     return embed
 
 
+@cached_embed(lambda skill: skill.skill)
 def format_skill_embed(skill: Skill) -> discord.Embed:
     stats = f"**Description**: {skill.description}\n"
     if skill.notes:
@@ -101,6 +142,7 @@ def format_skill_embed(skill: Skill) -> discord.Embed:
     return embed
 
 
+@cached_embed(lambda t: t.type)
 def format_type_embed(t: TypeInfo) -> discord.Embed:
     embed = discord.Embed(title=t.type.value, color=constants.type_colors[t.type.value])
     embed.add_field(name="Super Effective Against", value=t.se)
@@ -111,6 +153,13 @@ def format_type_embed(t: TypeInfo) -> discord.Embed:
     return embed
 
 
+@cached_embed(
+    lambda stage, eb_data=("", 0, "", 0), shorthand=False: (
+        stage.string_id,
+        eb_data,
+        shorthand,
+    )
+)
 def format_stage_embed(
     stage: Stage,
     eb_data: tuple[str, int, str, int] = ("", 0, "", 0),
@@ -330,13 +379,15 @@ def format_event_embed(event: Event) -> discord.Embed:
     current_year, current_month, current_day = now.year, now.month, now.day
     # TODO find a way to do this better
     if event.repeat_type != RepeatType.WEEKLY:
-        st = event.date_start
-        et = event.date_end
+        # copies, the event is shared with every other caller
+        st: list[str | int] = list(event.date_start)
+        et: list[str | int] = list(event.date_end)
         if event.repeat_type == RepeatType.ROTATION:
-            start_time = event.next_appearance[0].strftime(DATE_FORMAT)
-            end_time = event.next_appearance[1].strftime(DATE_FORMAT)
-            starts_when = event.next_appearance[0] - datetime.datetime.now(tz=pytz.utc)
-            ends_when = event.next_appearance[1] - datetime.datetime.now(tz=pytz.utc)
+            next_start, next_end = db.get_next_appearance(event, now)
+            start_time = next_start.strftime(DATE_FORMAT)
+            end_time = next_end.strftime(DATE_FORMAT)
+            starts_when = next_start - now
+            ends_when = next_end - now
         else:
             start_time = DATE_MANUAL_FORMAT.format(*event.date_start)
             end_time = DATE_MANUAL_FORMAT.format(*event.date_end)
@@ -417,6 +468,7 @@ def format_eb_rewards_embed(rewards: Sequence[EBReward]) -> discord.Embed:
     return embed
 
 
+@cached_embed(lambda eb_stretches: eb_stretches[0].pokemon)
 def format_eb_details_embed(eb_stretches: Sequence[EBStretch]) -> discord.Embed:
     if not eb_stretches:
         raise ValueError("No EB stretch provided")
@@ -454,6 +506,7 @@ def format_eb_details_embed(eb_stretches: Sequence[EBStretch]) -> discord.Embed:
     return embed
 
 
+@cached_embed(lambda query_week: query_week)
 def format_week_embed(query_week: int) -> discord.Embed:
     comp: str = ""
     daily: str = ""
@@ -657,7 +710,7 @@ def format_farming_cost(
     for group in skill_groups:
         cost_string = ""
         for i, stage in enumerate(stages):
-            std, dri = utils.runs_to_farm(stage, group[0])
+            std, dri = db.get_runs_to_farm(stage, group[0])
             if len(stages) > 1:
                 cost_string += f"{'\n\n' if i else ''}Stage: {stage.string_id}\n"
             cost_string += skill_farming_cost_string(std, dri, stage)
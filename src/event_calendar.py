@@ -0,0 +1,217 @@
+import bisect
+import datetime
+from typing import Iterable, Iterator, Mapping
+
+import pytz
+
+from models import Event, EventType, RepeatType, RotationEvent
+
+# the rotation events repeat every 24 weeks
+ROTATION_PERIOD = datetime.timedelta(weeks=24)
+DAY = datetime.timedelta(days=1)
+
+
+class EventCalendar:
+    """Schedule of the events, to answer date questions with lookups.
+
+    Each rotation event is placed once on a timeline covering one rotation period,
+    as the interval of its offsets from the start of the timeline, sorted by start:
+    the events live at a given time, or starting within a given range, are found by bisection.
+    The other recurring events are indexed by the weekday, day of the month or month they repeat on.
+
+    ``events`` must be in table order, which is the order the pokemon of a day are listed in.
+    ``rotation_events`` are the rotation events by event id, listed by week.
+    """
+
+    def __init__(
+        self, events: Iterable[Event], rotation_events: Mapping[int, RotationEvent]
+    ) -> None:
+        self.events = tuple(events)
+
+        self._weeks: dict[int, list[RotationEvent]] = {}
+        self._eb_pokemon: dict[int, str] = {}
+        self._pokemon_weeks: dict[str, list[int]] = {}
+        self._recurring: dict[RepeatType, dict[int, list[int]]] = {
+            RepeatType.WEEKLY: {},
+            RepeatType.MONTHLY: {},
+            RepeatType.YEARLY: {},
+        }
+        rotation = [
+            i for i, e in enumerate(self.events) if e.repeat_type == RepeatType.ROTATION
+        ]
+
+        for i, event in enumerate(self.events):
+            if event.repeat_type in self._recurring:
+                self._recurring[event.repeat_type].setdefault(
+                    event.repeat_param_1, []
+                ).append(i)
+                continue
+            week = event.repeat_param_1 + 1
+            self._weeks.setdefault(week, []).append(rotation_events[event.id])
+            for pokemon in event.pokemon:
+                self._pokemon_weeks.setdefault(pokemon, []).append(week)
+            if event.event_type == EventType.ESCALATION:
+                self._eb_pokemon.setdefault(week, "/".join(event.pokemon))
+                if event.duration == "14 days":
+                    self._eb_pokemon.setdefault(week + 1, "/".join(event.pokemon))
+        for weeks in self._pokemon_weeks.values():
+            weeks[:] = sorted(set(weeks))
+
+        # event index -> offsets of its start and end from the start of the timeline
+        self._offsets: dict[int, tuple[datetime.timedelta, datetime.timedelta]] = {}
+        self._origin = min(
+            (self.events[i].date_start_datetime for i in rotation),
+            default=datetime.datetime(1970, 1, 1, tzinfo=pytz.utc),
+        )
+        for i in rotation:
+            start = self.events[i].date_start_datetime
+            end = self.events[i].date_end_datetime
+            offset = (start - self._origin) % ROTATION_PERIOD
+            self._offsets[i] = (offset, offset + (end - start))
+
+        # (start, end, event index), sorted by start;
+        # intervals running past the end of the period are also added one period earlier
+        self._intervals = sorted(
+            [(s, e, i) for i, (s, e) in self._offsets.items()]
+            + [
+                (s - ROTATION_PERIOD, e - ROTATION_PERIOD, i)
+                for i, (s, e) in self._offsets.items()
+                if e > ROTATION_PERIOD
+            ]
+        )
+        self._interval_starts = [s for s, _, _ in self._intervals]
+        self._max_length = max(
+            (e - s for s, e, _ in self._intervals), default=datetime.timedelta()
+        )
+        # (start, event index), sorted by start
+        self._starts = sorted((s, i) for i, (s, _) in self._offsets.items())
+        self._by_id = {event.id: i for i, event in enumerate(self.events)}
+
+    def _offset(self, time: datetime.datetime) -> datetime.timedelta:
+        return (time - self._origin) % ROTATION_PERIOD
+
+    def _live(self, time: datetime.datetime) -> Iterator[tuple[int, datetime.datetime]]:
+        """Yield (event index, start) for each rotation event live at the given time."""
+        offset = self._offset(time)
+        lo = bisect.bisect_right(self._interval_starts, offset - self._max_length)
+        hi = bisect.bisect_right(self._interval_starts, offset)
+        for start, end, i in self._intervals[lo:hi]:
+            if end > offset:
+                yield i, time - (offset - start)
+
+    def _starting(
+        self, start: datetime.datetime, end: datetime.datetime
+    ) -> Iterator[tuple[int, datetime.datetime]]:
+        """Yield (event index, start) for each rotation event starting in [start, end).
+
+        The range must not be longer than the rotation period.
+        """
+        offset = self._offset(start)
+        ranges = [(offset, offset + (end - start), start - offset)]
+        if ranges[0][1] > ROTATION_PERIOD:
+            # the range continues at the beginning of the next period
+            ranges.append(
+                (
+                    datetime.timedelta(),
+                    ranges[0][1] - ROTATION_PERIOD,
+                    start - offset + ROTATION_PERIOD,
+                )
+            )
+        for lo, hi, origin in ranges:
+            for s, i in self._starts[
+                bisect.bisect_left(self._starts, (lo, -1)) : bisect.bisect_left(
+                    self._starts, (hi, -1)
+                )
+            ]:
+                yield i, origin + s
+
+    def live_at(self, time: datetime.datetime) -> list[Event]:
+        """Return the rotation events live at the given time."""
+        return [self.events[i] for i, _ in sorted(self._live(time))]
+
+    def week(self, week: int) -> list[RotationEvent]:
+        """Return the rotation events of the given week (1 to 24)."""
+        return self._weeks.get(week, [])
+
+    def eb_pokemon(self, week: int) -> str:
+        """Return the escalation battle pokemon of the given week (1 to 24), if any."""
+        return self._eb_pokemon.get(week, "")
+
+    def next_week(self, pokemon: str, week: int) -> int | None:
+        """Return the first rotation week, from the given one onwards, featuring the pokemon."""
+        weeks = self._pokemon_weeks.get(pokemon)
+        if not weeks:
+            return None
+        i = bisect.bisect_left(weeks, week)
+        return weeks[i] if i < len(weeks) else weeks[0]
+
+    def next_appearance(
+        self, event: Event, time: datetime.datetime
+    ) -> tuple[datetime.datetime, datetime.datetime]:
+        """Return the start and end of the first appearance of a rotation event
+        that ends after the given time."""
+        start, end = self._offsets[self._by_id[event.id]]
+        offset = self._offset(time)
+        cycles = (offset - end) // ROTATION_PERIOD + 1
+        next_start = time - offset + start + cycles * ROTATION_PERIOD
+        return next_start, next_start + (end - start)
+
+    def event_pokemon_on(self, time: datetime.datetime) -> list[str]:
+        """Return the event pokemon appearing on the (UTC) day of the given time.
+
+        These are the pokemon of the weekly, monthly and yearly events of that day,
+        the pokemon of the daily rotation events live at that time,
+        and the pokemon of the other rotation events starting on that day.
+        They are listed in the order of the events.
+        """
+        day = time.replace(hour=0, minute=0, second=0, microsecond=0)
+        matches: list[tuple[int, datetime.datetime | None]] = [
+            (i, None)
+            for repeat_type, key in (
+                (RepeatType.WEEKLY, time.weekday()),
+                (RepeatType.MONTHLY, time.day),
+                (RepeatType.YEARLY, time.month),
+            )
+            for i in self._recurring[repeat_type].get(key, [])
+        ]
+        matches.extend(
+            (i, start)
+            for i, start in self._live(time)
+            if self.events[i].event_type == EventType.DAILY
+        )
+        matches.extend(
+            (i, start)
+            for i, start in self._starting(day, day + DAY)
+            if self.events[i].event_type != EventType.DAILY
+        )
+
+        ans: list[str] = []
+        for i, start in sorted(matches, key=lambda x: x[0]):
+            event = self.events[i]
+            duration = int(event.duration.split()[0])
+            if event.repeat_type in (RepeatType.WEEKLY, RepeatType.MONTHLY):
+                ans.extend(event.pokemon)
+            elif event.repeat_type == RepeatType.YEARLY:
+                # assuming all yearly events are daily stage type
+                days = (
+                    time
+                    - datetime.datetime(
+                        time.year,
+                        event.repeat_param_1,
+                        event.repeat_param_2,
+                        tzinfo=pytz.utc,
+                    )
+                ).days
+                if 0 <= days < duration:
+                    ans.append(event.pokemon[days % len(event.pokemon)])
+            elif event.event_type == EventType.DAILY:
+                assert start
+                days = (time - start).days
+                if days < duration:
+                    try:
+                        ans.append(event.pokemon[(days + 1) % 7])
+                    except IndexError:
+                        pass
+            else:
+                ans.extend([pokemon for pokemon in event.pokemon if pokemon not in ans])
+        return ans
@@ -8,3 +8,15 @@ class InvalidBP(CommandError):
 
 class InvalidLevel(CommandError):
     ...
+
+
+class MigrationError(Exception):
+    ...
+
+
+class QueryPlanError(Exception):
+    ...
+
+
+class DataReloadError(Exception):
+    ...
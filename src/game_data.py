@@ -0,0 +1,370 @@
+import functools
+import gc
+import hashlib
+import inspect
+import itertools
+import operator
+import os
+import pickle
+import sqlite3
+from pathlib import Path
+from typing import Any, Callable, Iterable
+
+from event_calendar import EventCalendar
+from models import (
+    EBReward,
+    EBStretch,
+    Event,
+    EventStageRotation,
+    Pokemon,
+    PokemonType,
+    RepeatType,
+    RotationEvent,
+    Skill,
+    SMReward,
+    Stage,
+    StageType,
+    TypeInfo,
+)
+from pokemon_table import PokemonTable
+
+STAGE_TYPE_TABLE = {
+    StageType.MAIN: "main_stages",
+    StageType.EXPERT: "expert_stages",
+    StageType.EVENT: "event_stages",
+}
+
+_versions = itertools.count(1)
+
+# bump when the format of the snapshot file changes
+SNAPSHOT_FORMAT = 1
+# the code building the snapshot: when it changes, saved snapshots are stale
+SNAPSHOT_SOURCES = tuple(
+    Path(__file__).resolve().parent / f"{module}.py"
+    for module in ("game_data", "models", "event_calendar", "pokemon_table")
+)
+
+
+class GameData:
+    """Snapshot of the static tables of the shuffle database.
+
+    Everything except the aliases and reminders only changes when the data is refreshed,
+    so the tables are read and hydrated once and indexed for dictionary lookups.
+
+    The snapshot should be treated as read-only: the same objects are handed out to every caller.
+    Each snapshot gets a new ``version``, which can be used to invalidate derived caches.
+    """
+
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        self.version = next(_versions)
+
+        self.pokemon: dict[str, Pokemon] = {
+            pokemon.pokemon: pokemon
+            for pokemon in _hydrate(conn, Pokemon, "SELECT * FROM pokemon ORDER BY id")
+        }
+        self.pokemon_table = PokemonTable(self.pokemon.values())
+
+        self.stages: dict[tuple[StageType, int], Stage] = {}
+        self.stages_by_type: dict[StageType, list[Stage]] = {}
+        self.stages_by_pokemon: dict[tuple[StageType, str], list[Stage]] = {}
+        self.event_stages_rotation: dict[int, EventStageRotation] = {}
+        for stage_type, table in STAGE_TYPE_TABLE.items():
+            for stage in _hydrate(
+                conn, Stage, f"SELECT * FROM {table}", stage_type=stage_type
+            ):
+                self.stages[(stage_type, stage.id)] = stage
+                self.stages_by_type.setdefault(stage_type, []).append(stage)
+                self.stages_by_pokemon.setdefault(
+                    (stage_type, stage.pokemon.lower()), []
+                ).append(stage)
+                if stage_type == StageType.EVENT:
+                    self.event_stages_rotation[stage.id] = EventStageRotation(
+                        stage.cost.type,
+                        stage.cost.amount,
+                        stage.drops,
+                        "/".join(stage.items),
+                    )
+
+        self.skills: dict[str, Skill] = {
+            skill.skill: skill
+            for skill in _hydrate(
+                conn,
+                Skill,
+                """
+                SELECT
+                s.id AS id, s.skill AS skill, description, rate1, rate2, rate3,
+                type, multiplier, bonus_effect, bonus1, bonus2, bonus3, bonus4,
+                sp1, sp2, sp3, sp4, notes
+                FROM skills s
+                LEFT JOIN skill_notes sn
+                ON s.skill = sn.skill
+                ORDER BY s.id
+                """,
+            )
+        }
+
+        # pokemon -> stages dropping PSBs, sorted by stage id
+        self.farming_stages: dict[str, list[Stage]] = {}
+        for stage_type in (StageType.MAIN, StageType.EVENT):
+            for stage in self.stages_by_type.get(stage_type, []):
+                if any(drop.item == "PSB" for drop in stage.drops):
+                    self.farming_stages.setdefault(stage.pokemon, []).append(stage)
+        for stages in self.farming_stages.values():
+            stages.sort(key=lambda s: s.string_id)
+        self.farmable_pokemon = frozenset(self.farming_stages)
+        # (stage type, stage id, skill) -> expected runs to max the skill, without/with DRI
+        self.runs_to_farm: dict[tuple[StageType, int, str], tuple[int, int]] = {
+            (stage.stage_type, stage.id, skill.skill): runs_to_farm(stage, skill)
+            for pokemon, stages in self.farming_stages.items()
+            if pokemon in self.pokemon
+            for skill_name in self.pokemon[pokemon].all_skills
+            if (skill := self.skills.get(skill_name))
+            for stage in stages
+        }
+
+        self.types: dict[PokemonType, TypeInfo] = {
+            info.type: info for info in _hydrate(conn, TypeInfo, "SELECT * FROM types")
+        }
+
+        cursor = _execute(conn, "SELECT * FROM events")
+        event_rows = cursor.fetchall()
+        event = _constructor(Event, _columns(cursor))
+        rotation_event = _constructor(RotationEvent, _columns(cursor))
+        self.events: tuple[Event, ...] = tuple(map(event, event_rows))
+        self.calendar = EventCalendar(
+            self.events,
+            {
+                e.id: rotation_event(row)
+                for e, row in zip(self.events, event_rows)
+                if e.repeat_type == RepeatType.ROTATION
+            },
+        )
+        self.events_by_pokemon = _index_events_by_pokemon(conn, self.events)
+
+        self.eb_details: dict[str, list[EBStretch]] = _group(
+            _hydrate(
+                conn,
+                EBStretch,
+                """
+                SELECT pokemon, start_level, end_level, stage_index
+                FROM eb_details
+                ORDER BY id
+                """,
+            ),
+        )
+        self.eb_rewards: dict[str, list[EBReward]] = _group(
+            _hydrate(
+                conn,
+                EBReward,
+                """
+                SELECT pokemon, level, reward, amount, alternative
+                FROM eb_rewards
+                ORDER BY id
+                """,
+            ),
+        )
+
+        levels = ", ".join(f"lvl{i}" for i in range(1, 31))
+        self.ap: dict[int, tuple[int, ...]] = {
+            row[0]: row[1:]
+            for row in _execute(conn, f"SELECT base_ap, {levels} FROM ap")
+        }
+        self.exp: dict[int, tuple[int, ...]] = {
+            row[0]: row[1:]
+            for row in _execute(conn, f"SELECT base_ap, {levels} FROM exp")
+        }
+
+        self.sm_rewards: tuple[SMReward, ...] = tuple(
+            _hydrate(
+                conn,
+                SMReward,
+                """
+                SELECT
+                level, first_reward_type AS reward, first_reward_amount AS amount,
+                repeat_reward_type AS reward_repeat, repeat_reward_amount AS amount_repeat
+                FROM sm_rewards
+                ORDER BY level
+                """,
+            )
+        )
+
+        self.stage_notes: dict[str, str] = {
+            row["stage_id"]: row["notes"]
+            for row in _fetch(conn, "SELECT stage_id, notes FROM stage_notes")
+        }
+        self.help_messages: dict[str, str] = {}
+        for row in _fetch(conn, "SELECT message_type, message_text FROM help_messages"):
+            self.help_messages.setdefault(row["message_type"], row["message_text"])
+
+        # lowercase name -> name, used to match user input to table entries
+        self.names: dict[tuple[str, str], dict[str, str]] = {
+            ("pokemon", "pokemon"): {name.lower(): name for name in self.pokemon},
+            ("skills", "skill"): {name.lower(): name for name in self.skills},
+        }
+
+
+def runs_to_farm(stage: Stage, skill: Skill) -> tuple[int, int]:
+    rates = tuple(drop.rate for drop in stage.drops if drop.item == "PSB")
+    cost = skill.sp_cost[3]
+    expected = round(100 * cost / sum(rates))
+    expected_dri = round(cost / sum(map(chance_with_reroll, rates)))
+    return expected, expected_dri
+
+
+def chance_with_reroll(p: float) -> float:
+    return 1 - (1 - p / 100) ** 2
+
+
+def snapshot_key(database: Path) -> str:
+    """Content hash of the database (with its write-ahead log) and of the code building the snapshot."""
+    digest = hashlib.sha256(f"format {SNAPSHOT_FORMAT}".encode())
+    for path in (
+        database,
+        database.with_name(f"{database.name}-wal"),
+        *SNAPSHOT_SOURCES,
+    ):
+        if path.exists():
+            digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def save_snapshot(data: GameData, path: Path, key: str, build_ms: float) -> None:
+    """Write the game data to a snapshot file, to be loaded back when the key matches.
+
+    ``build_ms`` is how long building the data took, reported when loading the snapshot.
+    """
+    temp = path.with_name(f"{path.name}.tmp")
+    with open(temp, "wb") as f:
+        f.write(f"{key} {build_ms:.1f}\n".encode())
+        pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temp, path)
+
+
+def load_snapshot(path: Path, key: str) -> tuple[GameData, float] | None:
+    """Load the game data saved with ``save_snapshot``, with how long building it took.
+
+    Return None if there is no snapshot, if it is unreadable,
+    or if it was saved with a different key.
+    """
+    try:
+        with open(path, "rb") as f:
+            stored_key, build_ms = f.readline().decode().split()
+            if stored_key != key:
+                return None
+            build_time = float(build_ms)
+            payload = f.read()
+    except (OSError, UnicodeDecodeError, ValueError):
+        return None
+    # the collector would walk the objects being created many times over
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        data = pickle.loads(payload)
+    except Exception:
+        return None
+    finally:
+        if enabled:
+            gc.enable()
+    if not isinstance(data, GameData):
+        return None
+    data.version = next(_versions)
+    return data, build_time
+
+
+def _fetch(conn: sqlite3.Connection, query: str) -> list[dict[str, Any]]:
+    return conn.execute(query).fetchall()
+
+
+def _execute(conn: sqlite3.Connection, query: str) -> sqlite3.Cursor:
+    """Run the query returning plain tuples, whatever the row factory of the connection."""
+    cursor = conn.cursor()
+    cursor.row_factory = None
+    return cursor.execute(query)
+
+
+def _columns(cursor: sqlite3.Cursor) -> tuple[str, ...]:
+    return tuple(column[0] for column in cursor.description)
+
+
+def _hydrate[
+    T
+](conn: sqlite3.Connection, cls: Callable[..., T], query: str, **fixed: Any) -> list[T]:
+    """Build an object from each row of the query.
+
+    The columns are passed by name, as for ``cls(**row, **fixed)``,
+    but the mapping from columns to arguments is only worked out once per statement.
+    """
+    cursor = _execute(conn, query)
+    return list(map(_constructor(cls, _columns(cursor), **fixed), cursor))
+
+
+def _constructor[
+    T
+](cls: Callable[..., T], columns: tuple[str, ...], **fixed: Any) -> Callable[
+    [tuple[Any, ...]], T
+]:
+    """Function building an object from a tuple row with the given columns."""
+    arguments = _column_map(cls, columns, frozenset(fixed))
+    if fixed:
+        return lambda row: cls(*arguments(row), **fixed)
+    return lambda row: cls(*arguments(row))
+
+
+@functools.cache
+def _column_map(
+    cls: Callable[..., Any], columns: tuple[str, ...], fixed: frozenset[str]
+) -> Callable[[tuple[Any, ...]], tuple[Any, ...]]:
+    """Getter returning, from a row, the positional arguments of the constructor.
+
+    Columns that are not arguments are ignored.
+    The arguments missing from the columns must come last,
+    and either be passed as keywords (``fixed``) or have a default value.
+    """
+    parameters = list(inspect.signature(cls).parameters.values())
+    positional = list(itertools.takewhile(lambda p: p.name in columns, parameters))
+    for parameter in parameters[len(positional) :]:
+        if parameter.name in columns or (
+            parameter.name not in fixed and parameter.default is parameter.empty
+        ):
+            raise TypeError(
+                f"Cannot build {cls.__name__} from columns {', '.join(columns)}"
+            )
+    indices = [columns.index(parameter.name) for parameter in positional]
+    if len(indices) == 1:
+        return lambda row: (row[indices[0]],)
+    return operator.itemgetter(*indices)
+
+
+def _group[T: (EBStretch, EBReward)](items: Iterable[T]) -> dict[str, list[T]]:
+    groups: dict[str, list[T]] = {}
+    for item in items:
+        groups.setdefault(item.pokemon, []).append(item)
+    return groups
+
+
+def _index_events_by_pokemon(
+    conn: sqlite3.Connection, events: tuple[Event, ...]
+) -> dict[str, list[Event]]:
+    """Map each pokemon to the events it appears in, from the event_pokemon table.
+
+    Events sharing the same pokemon list and start date are duplicates,
+    only the first one is kept.
+    Each list is sorted by the event pokemon list, then start date.
+    """
+    by_id = {event.id: event for event in events}
+    index: dict[str, list[Event]] = {}
+    for row in _fetch(
+        conn,
+        """
+        SELECT DISTINCT ep.pokemon, e.id, e.pokemon AS event_pokemon, e.date_start
+        FROM event_pokemon ep
+        JOIN events e ON e.id = ep.event_id
+        WHERE e.id = (
+            SELECT MIN(d.id) FROM events d
+            WHERE d.pokemon = e.pokemon AND d.date_start IS e.date_start
+        )
+        ORDER BY ep.pokemon, e.pokemon, e.date_start
+        """,
+    ):
+        index.setdefault(row["pokemon"], []).append(by_id[row["id"]])
+    return index
@@ -0,0 +1,73 @@
+import time
+from collections import OrderedDict, deque
+from typing import Iterator
+
+
+class HistoryStore[T]:
+    """Most recent items of each user, e.g. their queries or the bot outputs they triggered.
+
+    Each user gets a ring buffer of the last ``size`` items, oldest first,
+    created the first time the user is looked up (like a ``defaultdict``).
+    At most ``max_users`` users are kept: the least recently seen ones are evicted first,
+    and users not seen for ``ttl`` seconds are dropped.
+    Evictions are counted, for the stats.
+    """
+
+    def __init__(self, name: str, size: int, max_users: int, ttl: float) -> None:
+        self.name = name
+        self.size = size
+        self.max_users = max_users
+        self.ttl = ttl
+        self.evictions = 0
+        # user id -> (last seen, items)
+        self._data: OrderedDict[int, tuple[float, deque[T]]] = OrderedDict()
+
+    def __getitem__(self, user_id: int) -> deque[T]:
+        now = time.monotonic()
+        entry = self._data.pop(user_id, None)
+        if entry is None or now - entry[0] > self.ttl:
+            if entry is not None:
+                self.evictions += 1
+            entry = (now, deque(maxlen=max(self.size, 1)))
+            self._evict(now)
+        self._data[user_id] = (now, entry[1])
+        return entry[1]
+
+    def __contains__(self, user_id: object) -> bool:
+        return user_id in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._data)
+
+    def _evict(self, now: float) -> None:
+        """Make room for a new user: drop the least recently seen, and the expired ones."""
+        while self._data:
+            user_id, (last_seen, _) = next(iter(self._data.items()))
+            if len(self._data) < self.max_users and now - last_seen <= self.ttl:
+                break
+            del self._data[user_id]
+            self.evictions += 1
+
+    def resize(self, size: int, max_users: int, ttl: float) -> None:
+        """Change the limits, keeping the most recent items and users that still fit."""
+        if size != self.size:
+            for user_id, (last_seen, items) in self._data.items():
+                self._data[user_id] = (last_seen, deque(items, maxlen=max(size, 1)))
+        self.size = size
+        self.max_users = max_users
+        self.ttl = ttl
+        while len(self._data) > self.max_users:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def stats(self) -> str:
+        return (
+            f"{len(self)}/{self.max_users} users, "
+            f"{self.size} items each, {self.evictions} evictions"
+        )
@@ -24,22 +24,37 @@ import functools
 import re
 import sqlite3
 import sys
+import time
 import traceback
 from collections import defaultdict
 from typing import Any, Callable, Coroutine, Optional, Self, Union
 
 import discord
-import pytz
 
+import data_reload
+import async_db
 import db
 import settings
 import utils
-from models import QueryType, RealCommand, Setting, UserQuery
+from aho_corasick import AhoCorasick
+from buffered_log import activity_log
+from history import HistoryStore
+from metrics import current_command, metrics
+from models import MessageRef, QueryType, RealCommand, Setting, UserQuery
+from rate_limit import Limit, RateLimiter, parse_costs
 
 
 class ClientWithBackgroundTask(discord.Client):
     async def setup_hook(self) -> None:
         self.loop.create_task(self.background_task(settings.background_task))
+        self.loop.create_task(activity_log.run())
+        self.loop.create_task(metrics.monitor_loop())
+        self.loop.create_task(metrics.run_dump())
+        self.loop.create_task(data_reload.watch_tables())
+
+    async def close(self) -> None:
+        await super().close()
+        activity_log.flush()
 
     # background task is run every set interval while bot is running
     # this method is added to the event loop automatically on bot setup
@@ -107,23 +122,40 @@ class Koduck:
         self.commands: dict[str, RealCommand] = {}
 
         self.prefix_commands: list[str] = []
-        self.match_commands: list[str] = []
+        self.match_commands: set[str] = set()
         self.contain_commands: list[str] = []
         self.slash_commands: list[str] = []
-
-        self.query_history: dict[int, list[UserQuery]] = defaultdict(list)
-        self.output_history: dict[int, list[discord.Message]] = defaultdict(list)
-        # userid -> list of Discord Messages sent by bot in response to the user, oldest first
+        self._contain_matcher: AhoCorasick | None = None
+        # built from ``contain_commands`` when needed, reset whenever they change
+
+        self.query_history = HistoryStore[UserQuery](
+            "query_history",
+            settings.output_history_size,
+            settings.history_max_users,
+            settings.history_ttl,
+        )
+        # userid -> last queries of the user, oldest first
+        self.output_history = HistoryStore[MessageRef](
+            "output_history",
+            settings.output_history_size,
+            settings.history_max_users,
+            settings.history_ttl,
+        )
+        # userid -> messages sent by bot in response to the user, oldest first
         # (only keeps track since bot startup)
-        self.last_message_dt: dict[int, datetime.datetime] = {}
-        # channelid -> datetime of most recent Discord Message sent
+        self.rate_limiter = RateLimiter()
+        # token buckets of users, channels and guilds, checked before running a command
         self.interactions: dict[int, bool] = {}
         # interactionid -> boolean indicating whether the interaction received a response
 
         self.emojis: dict[str, str] = {}
         # emoji map available, updated with ``shuffle_commands.update_emojis``
 
+        self.user_levels: dict[int, int] = {}
+        # userid -> user level, kept in sync with the user_levels table
+
         self.refresh_settings()
+        self.refresh_user_levels()
 
     # Records bot activity in the log text file, each log on one line,
     # formatted by settings.log_format.
@@ -132,6 +164,7 @@ class Koduck:
     # - message: the Discord Message that triggered the activity
     # - extra: an extra string that helps describes the activity
     #   (if, for example, a message is not involved)
+    # The line is formatted and written later, see ``buffered_log``
     def log(
         self,
         type: str = "",
@@ -139,10 +172,27 @@ class Koduck:
         interaction: Optional[discord.Interaction] = None,
         extra: str = "",
     ) -> None:
+        activity_log.write(
+            functools.partial(
+                self.format_log,
+                datetime.datetime.now(datetime.timezone.utc),
+                type,
+                message,
+                interaction,
+                extra,
+            )
+        )
+
+    @staticmethod
+    def format_log(
+        timestamp: datetime.datetime,
+        type: str = "",
+        message: Optional[discord.Message] = None,
+        interaction: Optional[discord.Interaction] = None,
+        extra: str = "",
+    ) -> str:
         log_fields: dict[str, Any] = {
-            "timestamp": datetime.datetime.now(datetime.timezone.utc).strftime(
-                "%Y-%m-%d %H:%M:%S.%f"
-            ),
+            "timestamp": timestamp.strftime("%Y-%m-%d %H:%M:%S.%f"),
             "type": type,
             "server_id": "",
             "server_name": "",
@@ -216,91 +266,77 @@ class Koduck:
             log_fields["data"]["interaction"] = interaction.data
 
         log_string = settings.log_format.format(**log_fields)
-        log_string = log_string.replace("\n", "\\n") + "\n"
-        with open(settings.log_file, "a", encoding="utf8") as file:
-            file.write(log_string)
+        return log_string.replace("\n", "\\n") + "\n"
 
     async def send_message(
         self,
         receive_message: Optional[Union[discord.Message, discord.Interaction]] = None,
         channel: Optional[discord.abc.Messageable] = None,
-        ignore_cd: bool = False,
         **kwargs: Any,
     ) -> discord.Message | None:
         """Sends a Discord Message to a Discord Channel, possibly including a Discord Embed.
 
-        Returns the Message object or a string if sending failed (i.e. cooldown is active)
+        Returns the Message object
         - receive_message: the Discord Message/Interaction that triggered the activity (can be None)
         - channel: the Discord Channel to send the message to;
           by default it's the channel where the triggering message was sent
         - content: the String to include in the outgoing Discord Message
         - embed: the Discord Embed to attach to the outgoing Discord Message
         - file: a Discord File to include in the outgoing Discord Message
-        - view: a Discord View to include in the outgoing Discord Message
-        - ignore_cd: set this to True to ignore cooldown checks"""
+        - view: a Discord View to include in the outgoing Discord Message"""
 
         emojify = functools.partial(
             utils.emojify,
             emojis=self.emojis,
             check_aliases=kwargs.get("check_aliases", False),
         )
-        if "content" in kwargs:
-            kwargs["content"] = emojify(kwargs["content"])
-
-        if "embed" in kwargs:
-            embed: discord.Embed = kwargs["embed"]
-            embed.title = emojify(embed.title or "") or None
-            embed.description = emojify(embed.description or "") or None
-            for i, field in enumerate(embed.fields):
-                embed.set_field_at(
-                    i,
-                    name=field.name,
-                    value=emojify(field.value or ""),
-                    inline=field.inline,
-                )
+        with metrics.timer("format"):
+            if "content" in kwargs:
+                kwargs["content"] = emojify(kwargs["content"])
+
+            if "embed" in kwargs:
+                embed: discord.Embed = kwargs["embed"]
+                embed.title = emojify(embed.title or "") or None
+                embed.description = emojify(embed.description or "") or None
+                for i, field in enumerate(embed.fields):
+                    embed.set_field_at(
+                        i,
+                        name=field.name,
+                        value=emojify(field.value or ""),
+                        inline=field.inline,
+                    )
 
         send_channel = channel
         if isinstance(receive_message, discord.Interaction):
             send_channel = receive_message.channel
-        # If send_message was triggered by a user message, check cooldowns
-        elif receive_message is not None:
-            if channel is None:
-                send_channel = receive_message.channel
-
-            # Check cooldowns
-            cooldown_active = False
-            user_level = self.get_user_level(receive_message.author.id)
-            if user_level < settings.ignore_cd_level:
-                cooldown_active = self.check_channel_cooldown(send_channel.id)
-                cooldown_active = cooldown_active or self.check_user_cooldown(
-                    receive_message.author.id
-                )
-
-            # ignore message if bot is on channel cooldown or user cooldown
-            if cooldown_active and not ignore_cd:
-                self.log(type="cooldown", extra=settings.message_cooldown_active)
-                return
+        elif receive_message is not None and channel is None:
+            send_channel = receive_message.channel
 
-        # send message to a "/run" interaction
-        if isinstance(receive_message, SlashMessage) and channel is None:
-            if not receive_message.interaction.response.is_done():
-                the_message = await receive_message.interaction.response.send_message(
-                    **kwargs
-                )
-            else:
-                the_message = await receive_message.interaction.followup.send(**kwargs)
-        # send message to an interaction
-        elif isinstance(receive_message, discord.Interaction) and channel is None:
-            # This is not returning the sent message for some reason,
-            # so here's a workaround to fetch it after it's sent
-            if not receive_message.response.is_done():
-                await receive_message.response.send_message(**kwargs)
-                the_message = await receive_message.original_response()
+        with metrics.timer("send"):
+            # send message to a "/run" interaction
+            if isinstance(receive_message, SlashMessage) and channel is None:
+                if not receive_message.interaction.response.is_done():
+                    the_message = (
+                        await receive_message.interaction.response.send_message(
+                            **kwargs
+                        )
+                    )
+                else:
+                    the_message = await receive_message.interaction.followup.send(
+                        **kwargs
+                    )
+            # send message to an interaction
+            elif isinstance(receive_message, discord.Interaction) and channel is None:
+                # This is not returning the sent message for some reason,
+                # so here's a workaround to fetch it after it's sent
+                if not receive_message.response.is_done():
+                    await receive_message.response.send_message(**kwargs)
+                    the_message = await receive_message.original_response()
+                else:
+                    the_message = await receive_message.followup.send(**kwargs)
+            # send message normally
             else:
-                the_message = await receive_message.followup.send(**kwargs)
-        # send message normally
-        else:
-            the_message = await send_channel.send(**kwargs)
+                the_message = await send_channel.send(**kwargs)
 
         # track user outputs
         if receive_message is not None and the_message is not None:
@@ -309,12 +345,9 @@ class Koduck:
                 if isinstance(receive_message, discord.Interaction)
                 else receive_message.author.id
             )
-            user_last_outputs = self.get_user_last_outputs(user_id)
-            user_last_outputs.append(the_message)
-            self.output_history[user_id] = user_last_outputs[
-                max(0, len(user_last_outputs) - settings.output_history_size) :
-            ]
-        self.last_message_dt[send_channel.id] = datetime.datetime.now()
+            self.output_history[user_id].append(
+                MessageRef(the_message.id, the_message.channel.id)
+            )
 
         return the_message
 
@@ -336,9 +369,10 @@ class Koduck:
         if type == "prefix":
             self.prefix_commands.append(command_name.lower())
         elif type == "match":
-            self.match_commands.append(command_name.lower())
+            self.match_commands.add(command_name.lower())
         elif type == "contain":
             self.contain_commands.append(command_name.lower())
+            self._contain_matcher = None
         elif type == "slash":
             self.slash_commands.append(command_name.lower())
 
@@ -400,15 +434,23 @@ class Koduck:
             "slash": self.slash_commands,
         }[self.commands[command].type].remove(command)
         del self.commands[command]
+        self._contain_matcher = None
 
     def clear_commands(self) -> None:
         self.prefix_commands = []
-        self.match_commands = []
+        self.match_commands = set()
         self.contain_commands = []
         self.slash_commands = []
+        self._contain_matcher = None
         self.commands = {}
         self.command_tree.clear_commands(guild=None)
 
+    def find_contain_command(self, text: str) -> str | None:
+        """Return the first contain command (in the order they were added) found in the text."""
+        if self._contain_matcher is None:
+            self._contain_matcher = AhoCorasick(self.contain_commands)
+        return self._contain_matcher.find_first(text)
+
     def add_run_slash_command(self) -> None:
         """Registers a "run" slash command which simulates running a prefix command.
 
@@ -458,8 +500,18 @@ class Koduck:
             except ValueError:
                 value = value.replace("\\n", "\n").replace("\\t", "\t")
             setattr(settings, setting.key, value)
+        self.resize_history()
+
+    def resize_history(self) -> None:
+        """Apply the history settings to ``query_history`` and ``output_history``."""
+        for store in (self.query_history, self.output_history):
+            store.resize(
+                settings.output_history_size,
+                settings.history_max_users,
+                settings.history_ttl,
+            )
 
-    def update_setting(
+    async def update_setting(
         self, variable: str, value: str, auth_level: int = settings.default_user_level
     ) -> Any | None:
         """Update the setting variable -> value.
@@ -472,13 +524,15 @@ class Koduck:
         except AttributeError:
             return None
 
-        setting = db.query_setting(variable)
+        setting = await async_db.query_setting(variable)
         setting_level = setting.tier if setting else settings.max_user_level
 
         if setting_level > auth_level:
             return None
 
-        db.update_setting(variable, value.replace("\n", "\\n").replace("\t", "\\t"))
+        await async_db.update_setting(
+            variable, value.replace("\n", "\\n").replace("\t", "\\t")
+        )
 
         try:
             if float(value) % 1 == 0:
@@ -488,9 +542,10 @@ class Koduck:
         except (ValueError, TypeError):
             new_value = value
         setattr(settings, variable, new_value)
+        self.resize_history()
         return old_value
 
-    def add_setting(
+    async def add_setting(
         self, variable: str, value: str, auth_level: int = settings.default_user_level
     ) -> str | None:
         """Add a setting and updates the database accordingly.
@@ -502,7 +557,7 @@ class Koduck:
         except AttributeError:
             pass
 
-        db.add_setting(
+        await async_db.add_setting(
             Setting(
                 variable, value.replace("\n", "\\n").replace("\t", "\\t"), auth_level
             )
@@ -518,7 +573,7 @@ class Koduck:
         setattr(settings, variable, new_value)
         return value
 
-    def remove_setting(
+    async def remove_setting(
         self, variable: str, auth_level: int = settings.default_user_level
     ) -> Any | None:
         """Remove a setting and updates the database accordingly.
@@ -532,32 +587,38 @@ class Koduck:
         except AttributeError:
             return None
 
-        setting = db.query_setting(variable)
+        setting = await async_db.query_setting(variable)
         setting_level = setting.tier if setting else settings.max_user_level
 
         if setting_level > auth_level:
             return None
 
-        db.remove_setting(variable)
+        await async_db.remove_setting(variable)
         delattr(settings, variable)
         return value
 
-    def update_user_level(self, user_id: int, level: int) -> bool:
+    def refresh_user_levels(self) -> None:
+        """Load the user levels in memory. Always run on startup.
+
+        Levels are only read from the table here: run it again after a manual update of the table.
+        """
+        try:
+            self.user_levels = db.get_user_levels()
+        except sqlite3.OperationalError as e:
+            print(f"Failed to get user levels: {e}")
+            self.user_levels = {}
+
+    async def update_user_level(self, user_id: int, level: int) -> bool:
         try:
             level = int(level)
         except ValueError:
             return False
-        db.update_user_level(user_id, level)
+        await async_db.update_user_level(user_id, level)
+        self.user_levels[user_id] = level
         return True
 
     def get_user_level(self, user_id: int) -> int:
-        try:
-            level = db.query_user_level(user_id)
-            assert level is not None
-        except (sqlite3.OperationalError, AssertionError) as e:
-            print(f"Failed to get user level: {e}")
-            return settings.default_user_level
-        return level
+        return self.user_levels.get(user_id, settings.default_user_level)
 
     # Run a command as if it was triggered by a Discord message
     async def run_command(
@@ -576,33 +637,51 @@ class Koduck:
         except (KeyError, IndexError):
             return
 
-    def check_channel_cooldown(self, channel_id: int) -> bool:
-        # calculate time since the last bot output on the given channel
-        try:
-            td = datetime.datetime.now() - self.last_message_dt[channel_id]
-            return (td.microseconds / 1000) + (
-                td.seconds * 1000
-            ) < settings.channel_cooldown
-        except KeyError:
-            return False
+    def check_rate_limit(self, message: discord.Message, command: str) -> bool:
+        """Take the cost of the command from the token buckets of the message author,
+        channel and guild, and return whether there were enough tokens to run it.
 
-    def check_user_cooldown(self, user_id: int) -> bool:
-        user_level = self.get_user_level(user_id)
-        user_last_outputs = self.get_user_last_outputs(user_id)
-        if not user_last_outputs:
-            return False
-        # calculate time since the last bot output from the user
-        td = datetime.datetime.now(pytz.utc) - user_last_outputs[-1].created_at
-        user_cooldown: int = 0
-        while user_cooldown == 0 and user_level >= 0:
-            try:
-                user_cooldown = getattr(settings, f"user_cooldown_{user_level}")
-            except AttributeError:
-                user_level -= 1
-        return (td.microseconds / 1000) + (td.seconds * 1000) < user_cooldown
+        Each bucket regains a token every ``user_cooldown_{level}``, ``channel_cooldown``
+        or ``guild_cooldown`` milliseconds.
+        Users with level ``ignore_cd_level`` or higher are not limited.
+        """
+        user_level = self.get_user_level(message.author.id)
+        if user_level >= settings.ignore_cd_level:
+            return True
+        limits = [
+            Limit(
+                "user",
+                message.author.id,
+                self.get_user_cooldown(user_level) / 1000,
+                settings.rate_limit_burst,
+            ),
+            Limit(
+                "channel",
+                message.channel.id,
+                settings.channel_cooldown / 1000,
+                settings.rate_limit_burst,
+            ),
+        ]
+        if message.guild:
+            limits.append(
+                Limit(
+                    "guild",
+                    message.guild.id,
+                    settings.guild_cooldown / 1000,
+                    settings.guild_rate_limit_burst,
+                )
+            )
+        cost = parse_costs(settings.command_costs).get(
+            command, settings.default_command_cost
+        )
+        return self.rate_limiter.acquire(cost, limits) is None
 
-    def get_user_last_outputs(self, user_id: int) -> list[discord.Message]:
-        return self.output_history[user_id]
+    def get_user_cooldown(self, user_level: int) -> int:
+        """Return the cooldown of the level, or of the closest lower level that has one."""
+        for level in range(user_level, -1, -1):
+            if cooldown := getattr(settings, f"user_cooldown_{level}", 0):
+                return cooldown
+        return 0
 
 
 # Context that is attached to callbacks
@@ -625,7 +704,6 @@ class KoduckContext:
         *args: Any,
         receive_message: Optional[Union[discord.Message, discord.Interaction]] = None,
         channel: Optional[discord.abc.Messageable] = None,
-        ignore_cd: bool = False,
         **kwargs: Any,
     ) -> discord.Message | None:
         assert self.koduck
@@ -633,7 +711,6 @@ class KoduckContext:
             *args,
             receive_message=receive_message or self.message,
             channel=channel,
-            ignore_cd=ignore_cd,
             **kwargs,
         )
 
@@ -729,6 +806,7 @@ async def on_message(message: discord.Message) -> discord.Message | None:
     if message.author.bot:
         return
 
+    start = time.perf_counter()
     try:
         # PARSE COMMAND AND PARAMS
         context = KoduckContext()
@@ -813,20 +891,16 @@ async def on_message(message: discord.Message) -> discord.Message | None:
                 context.kwargs = kwargs
 
         # MATCH COMMANDS
-        if not context.command:
-            for command_name in koduck_instance.match_commands:
-                if command_name == message.content.lower():
-                    activity_type = "match_command"
-                    context.command = command_name
-                    break
+        content = message.content.lower()
+        if not context.command and content in koduck_instance.match_commands:
+            activity_type = "match_command"
+            context.command = content
 
         # CONTAIN COMMANDS
         if not context.command:
-            for command_name in koduck_instance.contain_commands:
-                if command_name in message.content.lower():
-                    activity_type = "contain_command"
-                    context.command = command_name
-                    break
+            if command_name := koduck_instance.find_contain_command(content):
+                activity_type = "contain_command"
+                context.command = command_name
 
         if not context.command:
             return
@@ -844,15 +918,22 @@ async def on_message(message: discord.Message) -> discord.Message | None:
                 )
             return
 
+        # CHECK RATE LIMITS, before doing any work
+        if not koduck_instance.check_rate_limit(message, context.command):
+            metrics.count(context.command, "cooldown")
+            koduck_instance.log(
+                type="cooldown", message=message, extra=settings.message_cooldown_active
+            )
+            return
+        metrics.count(context.command, "invocations")
+        metrics.observe(context.command, "parse", (time.perf_counter() - start) * 1000)
+        # from here on, the time spent in shared code is attributed to this command
+        current_command.set(context.command)
+
         koduck_instance.log(type=activity_type, message=message)
         koduck_instance.query_history[message.author.id].append(
             UserQuery(QueryType(context.command), args=tuple(args), kwargs=kwargs)
         )
-        koduck_instance.query_history[
-            message.author.id
-        ] = koduck_instance.query_history[message.author.id][
-            -settings.output_history_size :
-        ]
         # RUN THE COMMAND
         context.log(context)
         function = koduck_instance.commands[context.command].function
@@ -875,15 +956,20 @@ async def on_message(message: discord.Message) -> discord.Message | None:
             koduck_instance.log(type="result", extra=result)
 
     except Exception:
+        if context.command:
+            metrics.count(context.command, "errors")
         exc_type, exc_value, _ = sys.exc_info()
         error_message = f"{exc_type.__name__ if exc_type else None}: {exc_value}"
         traceback.print_exc()
         await koduck_instance.send_message(
             message,
             content=settings.message_something_broke + f"\n``{error_message}``",
-            ignore_cd=True,
         )
         koduck_instance.log(
             type="command_error",
             extra=settings.message_unhandled_error.format(error_message),
         )
+    finally:
+        if command := current_command.get():
+            metrics.observe(command, "total", (time.perf_counter() - start) * 1000)
+            current_command.set(None)
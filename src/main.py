@@ -1,15 +1,21 @@
+import asyncio
 import datetime
-import importlib
 import logging
 import sys
+from typing import Iterable
 
+import discord
 import dotenv
 import pytz
 
+import async_db
+import command_loader
 import db
+import migrations
 import settings
 import utils
 from koduck import Koduck, KoduckContext
+from models import Reminder, ReminderRun
 
 
 # Required method to setup Koduck.
@@ -17,7 +23,7 @@ from koduck import Koduck, KoduckContext
 async def refresh_commands(context: KoduckContext) -> None:
     assert context.koduck
     errors: list[str] = []
-    commands = list(db.get_commands())
+    commands = await async_db.get_commands()
     if commands:
         context.koduck.clear_commands()
         for command in commands:
@@ -34,17 +40,30 @@ async def refresh_commands(context: KoduckContext) -> None:
                     errors.append(f"Failed to import command '{command}': `{e}`")
                 continue
 
-            if command.module_name not in sys.modules:
-                try:
-                    importlib.import_module(command.module_name)
-                except Exception as e:
-                    errors.append(
-                        f"Failed to import module '{command.module_name}': `{e}`"
-                    )
+            # modules not imported yet are only imported when one of their commands is run;
+            # slash commands need the actual function, to describe their parameters
+            if (
+                command.module_name not in sys.modules
+                and command.command_type != "slash"
+            ):
+                context.koduck.add_command(
+                    command.command_name,
+                    command_loader.lazy_command(
+                        command.module_name, command.method_name
+                    ),
+                    command.command_type,
+                    command.command_tier,
+                    command.description,
+                )
+                continue
             try:
+                function = getattr(
+                    command_loader.import_module(command.module_name),
+                    command.method_name,
+                )
                 context.koduck.add_command(
                     command.command_name,
-                    getattr(sys.modules[command.module_name], command.method_name),
+                    function,
                     command.command_type,
                     command.command_tier,
                     command.description,
@@ -71,45 +90,108 @@ async def refresh_commands(context: KoduckContext) -> None:
 
     for e in errors:
         print(e)
+    if command_loader.load_times:
+        print(f"Load times:\n{command_loader.report()}")
 
 
-current_day = -1
-current_week = -1
+# held while reminders are being sent, which can take longer than the task interval
+reminder_lock = asyncio.Lock()
 
 
 async def background_task(koduck: Koduck) -> None:
-    global current_day
-    global current_week
+    if reminder_lock.locked():
+        return
+    async with reminder_lock:
+        await send_reminders(koduck)
+
+
+async def send_reminders(koduck: Koduck) -> None:
+    """Send the reminders of the day, once per day.
+
+    Each run and each delivery is recorded, so that if the bot restarts mid-run
+    the remaining reminders are sent, and the others are not sent again.
+    On the very first run, no reminder is sent.
+    """
     current_time = datetime.datetime.now(tz=pytz.timezone("Etc/GMT+6"))
+    today = current_time.date().isoformat()
 
-    if current_day == -1 or current_week == -1:
-        current_day = current_time.day
-        current_week = utils.get_current_week()
+    last_run = await async_db.get_last_reminder_run()
+    if last_run is None:
+        await async_db.start_reminder_run(
+            ReminderRun(today, utils.get_current_week(), False, True)
+        )
         return
-
-    if current_time.day == current_day:
+    if last_run.day == today and last_run.completed:
         return
 
-    current_day = current_time.day
-    current_week2 = utils.get_current_week()
-    week_changed, current_week = current_week2 != current_week, current_week2
+    run = last_run
+    if run.day != today:
+        current_week = utils.get_current_week()
+        run = ReminderRun(today, current_week, current_week != last_run.week, False)
+        await async_db.start_reminder_run(run)
+
+    delivered = await async_db.get_reminder_deliveries(
+        today, settings.reminder_max_attempts
+    )
     event_pokemon = utils.get_current_event_pokemon()
-    for reminder in db.get_reminders():
-        reminder_strings: list[str] = []
-        if week_changed and current_week in reminder.weeks:
-            reminder_strings.append(settings.message_reminder_week.format(current_week))
-        reminder_strings.extend(
-            settings.message_reminder_pokemon.format(ep)
-            for ep in event_pokemon
-            if ep in reminder.pokemon
-        )
-        if reminder_strings:
-            the_user = await koduck.client.fetch_user(reminder.user_id)
-            await the_user.send(
-                content=settings.message_reminder_header.format(
-                    reminder.user_id, "\n".join(reminder_strings)
+    subscribers = await async_db.get_reminder_subscribers(
+        run.week if run.week_changed else None, event_pokemon
+    )
+    messages = {
+        reminder.user_id: message
+        for reminder in subscribers
+        if reminder.user_id not in delivered
+        and (message := reminder_message(reminder, run, event_pokemon))
+    }
+
+    semaphore = asyncio.Semaphore(settings.reminder_concurrency)
+
+    async def deliver(user_id: int, message: str) -> bool:
+        async with semaphore:
+            try:
+                # use the member cache, only ask Discord for unknown users
+                user = koduck.client.get_user(user_id) or (
+                    await koduck.client.fetch_user(user_id)
                 )
-            )
+                await user.send(content=message)
+            except (discord.Forbidden, discord.NotFound):
+                # DMs closed or user gone, it won't work any better later
+                pass
+            except discord.HTTPException as e:
+                koduck.log(
+                    type="reminder_error",
+                    extra=settings.message_unhandled_error.format(e),
+                )
+                await async_db.add_reminder_failure(today, user_id)
+                return False
+            await async_db.add_reminder_delivery(today, user_id)
+            return True
+
+    results = await asyncio.gather(
+        *(deliver(user_id, message) for user_id, message in messages.items())
+    )
+    # failed deliveries are retried on the next runs of the task,
+    # up to settings.reminder_max_attempts times
+    if all(results):
+        await async_db.complete_reminder_run(today)
+
+
+def reminder_message(
+    reminder: Reminder, run: ReminderRun, event_pokemon: Iterable[str]
+) -> str | None:
+    reminder_strings: list[str] = []
+    if run.week_changed and run.week in reminder.weeks:
+        reminder_strings.append(settings.message_reminder_week.format(run.week))
+    reminder_strings.extend(
+        settings.message_reminder_pokemon.format(ep)
+        for ep in event_pokemon
+        if ep in reminder.pokemon
+    )
+    if not reminder_strings:
+        return None
+    return settings.message_reminder_header.format(
+        reminder.user_id, "\n".join(reminder_strings)
+    )
 
 
 def main() -> None:
@@ -120,6 +202,17 @@ def main() -> None:
         sys.exit(1)
 
     settings.background_task = background_task
+    db.enable_wal()
+    connections = {"bot": db.bot_connection, "shuffle": db.shuffle_connection}
+    for name, connection in connections.items():
+        for migration in migrations.migrate(connection, name):
+            print(f"Applied {migration.name} to the {name} database")
+    migrations.check_query_plans(connections)
+    db.load_game_data(db.GAME_DATA_SNAPSHOT_PATH)
+    with command_loader.timed("alias index"):
+        db.alias_index.load()
+    with command_loader.timed("reminder index"):
+        db.reminder_index.load()
 
     koduck = Koduck()
     koduck.add_command("refreshcommands", refresh_commands, "prefix", 3)
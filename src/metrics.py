@@ -0,0 +1,192 @@
+import asyncio
+import bisect
+import contextlib
+import contextvars
+import json
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Iterator
+
+import settings
+
+# phases of a command, in the order they happen
+PHASES = ("parse", "db", "format", "send", "total")
+# upper bounds of the histogram buckets, in milliseconds: 0.1ms, 0.2ms, ... ~105s
+BUCKETS = tuple(0.1 * 2**k for k in range(21))
+
+# command being run by the current task, to attribute the time spent in shared code
+current_command: contextvars.ContextVar[str | None] = contextvars.ContextVar(
+    "current_command", default=None
+)
+
+
+class Histogram:
+    """Distribution of durations (in milliseconds) over exponential buckets.
+
+    Percentiles are estimated as the upper bound of the bucket they fall in,
+    i.e. they are at most twice the actual value.
+    """
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, value: float) -> None:
+        self.counts[bisect.bisect_left(BUCKETS, value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def percentile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = max(1, round(q * self.count))
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return min(BUCKETS[i], self.max) if i < len(BUCKETS) else self.max
+        return self.max
+
+    def to_dict(self) -> dict[str, float]:
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0.0,
+            "p50": self.percentile(0.5),
+            "p95": self.percentile(0.95),
+            "p99": self.percentile(0.99),
+            "max": self.max,
+        }
+
+
+class Metrics:
+    """Latency and throughput of the commands, collected in process.
+
+    Each command has a histogram of the time spent in each phase:
+    parsing the message, waiting for the database, formatting the output,
+    sending it to Discord, and in total.
+    A phase can be timed several times per invocation (e.g. one for each query).
+    Invocations, errors and requests dropped by the rate limiter are counted by command.
+    The lag of the event loop is sampled every ``settings.metrics_lag_interval`` seconds.
+    """
+
+    def __init__(self) -> None:
+        self.started = time.time()
+        self.timings: dict[tuple[str, str], Histogram] = {}
+        self.counters: Counter[tuple[str, str]] = Counter()
+        self.loop_lag = Histogram()
+
+    def reset(self) -> None:
+        self.started = time.time()
+        self.timings.clear()
+        self.counters.clear()
+        self.loop_lag = Histogram()
+
+    def observe(self, command: str, phase: str, milliseconds: float) -> None:
+        histogram = self.timings.get((command, phase))
+        if histogram is None:
+            histogram = self.timings[(command, phase)] = Histogram()
+        histogram.add(milliseconds)
+
+    def count(self, command: str, counter: str) -> None:
+        self.counters[(command, counter)] += 1
+
+    @contextlib.contextmanager
+    def timer(self, phase: str, command: str | None = None) -> Iterator[None]:
+        """Time the block as a phase of the given command, or of the current one.
+
+        Nothing is recorded outside of commands (e.g. in background tasks).
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            command = command or current_command.get()
+            if command:
+                self.observe(command, phase, (time.perf_counter() - start) * 1000)
+
+    def commands(self) -> list[str]:
+        """Commands with any recorded activity, most invoked first."""
+        names = {c for c, _ in self.timings} | {c for c, _ in self.counters}
+        return sorted(names, key=lambda c: (-self.counters[(c, "invocations")], c))
+
+    def report(self, max_commands: int) -> str:
+        """Summary of the most invoked commands, with the p50/p95/p99 of each phase."""
+        uptime = time.time() - self.started
+        total = sum(
+            n for (_, name), n in self.counters.items() if name == "invocations"
+        )
+        lines = [
+            f"{total} commands in {uptime / 3600:.1f}h, "
+            f"loop lag p50/p99/max {self._percentiles(self.loop_lag, (0.5, 0.99))}"
+            f"/{self.loop_lag.max:.1f}ms"
+        ]
+        for command in self.commands()[:max_commands]:
+            counts = ", ".join(
+                f"{self.counters[(command, name)]} {name}"
+                for name in ("invocations", "errors", "cooldown")
+                if self.counters[(command, name)]
+            )
+            lines.append(f"{command}: {counts or 'no invocations'}")
+            for phase in PHASES:
+                histogram = self.timings.get((command, phase))
+                if histogram:
+                    lines.append(
+                        f"  {phase} x{histogram.count}: p50/p95/p99 "
+                        f"{self._percentiles(histogram, (0.5, 0.95, 0.99))}ms"
+                    )
+        return "\n".join(lines)
+
+    @staticmethod
+    def _percentiles(histogram: Histogram, quantiles: tuple[float, ...]) -> str:
+        return "/".join(f"{histogram.percentile(q):.1f}" for q in quantiles)
+
+    def to_dict(self) -> dict[str, Any]:
+        commands: dict[str, dict[str, Any]] = {}
+        for (command, counter), n in self.counters.items():
+            commands.setdefault(command, {})[counter] = n
+        for (command, phase), histogram in self.timings.items():
+            commands.setdefault(command, {})[phase] = histogram.to_dict()
+        return {
+            "time": time.time(),
+            "started": self.started,
+            "loop_lag": self.loop_lag.to_dict(),
+            "commands": commands,
+        }
+
+    def dump(self, path: Path) -> None:
+        _write_json(path, self.to_dict())
+
+    async def monitor_loop(self) -> None:
+        """Sample the event loop lag until cancelled. Started in the client setup."""
+        while True:
+            interval = settings.metrics_lag_interval
+            start = time.perf_counter()
+            await asyncio.sleep(interval)
+            self.loop_lag.add(max(0.0, time.perf_counter() - start - interval) * 1000)
+
+    async def run_dump(self) -> None:
+        """Write the metrics to ``settings.metrics_file`` every
+        ``settings.metrics_dump_interval`` seconds (if not 0), until cancelled.
+        Started in the client setup."""
+        while settings.metrics_dump_interval:
+            await asyncio.sleep(settings.metrics_dump_interval)
+            # the snapshot is taken in the event loop, only the write is done elsewhere
+            await asyncio.to_thread(
+                _write_json, Path(settings.metrics_file), self.to_dict()
+            )
+
+
+def _write_json(path: Path, data: dict[str, Any]) -> None:
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf8") as file:
+            json.dump(data, file, indent=1)
+    except OSError as e:
+        print(f"Failed to write metrics: {e}")
+
+
+metrics = Metrics()
@@ -0,0 +1,188 @@
+"""Apply the numbered scripts of ``queries/`` to the databases, in order.
+
+Scripts are named ``{version}_{description}.sql`` and run on the bot database,
+unless their first line is ``-- shuffle database``.
+Each database records the versions applied to it in its ``schema_version`` table.
+
+The scripts up to ``BASELINE_VERSION`` were applied by hand to the deployed databases
+before versions were recorded: by default, a database without a ``schema_version`` table
+is assumed to be at that version.
+``create_bot_tables.sql``, ``create_shuffle_tables.sql`` and the files of ``tables/``
+are older than all the scripts, so a database created from them is migrated
+with a baseline of 0, to apply every script.
+"""
+
+import datetime
+import re
+import sqlite3
+from pathlib import Path
+from typing import Iterable, NamedTuple
+
+from exceptions import MigrationError, QueryPlanError
+
+QUERIES_PATH = Path(__file__).resolve().parent.parent / "queries"
+BASELINE_VERSION = 5
+SHUFFLE_MARKER = "-- shuffle database"
+
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    database: str
+    script: str
+
+
+# queries run by db.py on every lookup, with sample parameters:
+# (database, description, query, parameters)
+HOT_QUERIES: tuple[tuple[str, str, str, dict[str, object]], ...] = (
+    (
+        "bot",
+        "setting by key",
+        "SELECT key, value, tier FROM settings WHERE key = :key",
+        {"key": "command_prefix"},
+    ),
+    (
+        "bot",
+        "custom response",
+        "SELECT response FROM custom_responses WHERE message = :message",
+        {"message": "hello"},
+    ),
+    (
+        "bot",
+        "command by name",
+        "SELECT command_name FROM commands WHERE command_name = :command",
+        {"command": "pokemon"},
+    ),
+    (
+        "bot",
+        "reminder deliveries",
+        "SELECT user_id FROM reminder_deliveries"
+        " WHERE day = :day AND (delivered OR attempts >= :max_attempts)",
+        {"day": "2024-01-01", "max_attempts": 5},
+    ),
+    (
+        "shuffle",
+        "alias removal",
+        "SELECT alias FROM aliases WHERE alias = :alias COLLATE NOCASE",
+        {"alias": "bulba"},
+    ),
+    (
+        "shuffle",
+        "reminder week removal",
+        "SELECT id FROM reminder_weeks WHERE user_id = :user_id AND week = :week",
+        {"user_id": 1, "week": 1},
+    ),
+    (
+        "shuffle",
+        "reminder pokemon removal",
+        "SELECT id FROM reminder_pokemon"
+        " WHERE user_id = :user_id AND pokemon = :pokemon",
+        {"user_id": 1, "pokemon": "Mew"},
+    ),
+    (
+        "shuffle",
+        "events of a pokemon",
+        "SELECT event_id FROM event_pokemon WHERE pokemon = :pokemon",
+        {"pokemon": "Mew"},
+    ),
+    (
+        "shuffle",
+        "duplicate events",
+        "SELECT MIN(id) FROM events WHERE pokemon = :pokemon AND date_start IS :date",
+        {"pokemon": "Mew", "date": "2024/1/1/0"},
+    ),
+)
+
+
+def read_migrations(path: Path = QUERIES_PATH) -> list[Migration]:
+    migrations: list[Migration] = []
+    for file in path.glob("*.sql"):
+        if not (match := re.match(r"(\d+)_", file.name)):
+            continue
+        script = file.read_text(encoding="utf-8")
+        database = "shuffle" if script.startswith(SHUFFLE_MARKER) else "bot"
+        migrations.append(Migration(int(match[1]), file.stem, database, script))
+    return sorted(migrations)
+
+
+def applied_versions(connection: sqlite3.Connection) -> set[int] | None:
+    """Return the versions applied to the database, or None if they were never recorded."""
+    if not connection.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'schema_version'"
+    ).fetchone():
+        return None
+    cursor = connection.cursor()
+    cursor.row_factory = None
+    return {row[0] for row in cursor.execute("SELECT version FROM schema_version")}
+
+
+def migrate(
+    connection: sqlite3.Connection,
+    database: str,
+    migrations: Iterable[Migration] | None = None,
+    baseline: int = BASELINE_VERSION,
+) -> list[Migration]:
+    """Apply the pending migrations of the database, in a single transaction.
+
+    If the versions were never recorded, the ones up to ``baseline`` are assumed applied.
+    Return the migrations applied; if one of them fails, none are.
+    """
+    if migrations is None:
+        migrations = read_migrations()
+    migrations = [m for m in migrations if m.database == database]
+    applied = applied_versions(connection)
+
+    now = datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds")
+    script = ["BEGIN;"]
+    if applied is None:
+        script.append(
+            """
+            CREATE TABLE "schema_version" (
+                "version" INTEGER NOT NULL PRIMARY KEY,
+                "name" TEXT NOT NULL,
+                "applied_at" TEXT NOT NULL
+            );
+            """
+        )
+        baseline = [m for m in migrations if m.version <= baseline]
+        script.extend(_record(m, "baseline") for m in baseline)
+        applied = {m.version for m in baseline}
+    pending = [m for m in migrations if m.version not in applied]
+    for migration in pending:
+        script.append(migration.script)
+        script.append(_record(migration, now))
+    if len(script) == 1:
+        return []
+    script.append("COMMIT;")
+
+    try:
+        connection.executescript("\n".join(script))
+    except sqlite3.Error as e:
+        connection.rollback()
+        raise MigrationError(f"Failed to migrate the {database} database: {e}") from e
+    return pending
+
+
+def _record(migration: Migration, applied_at: str) -> str:
+    name = migration.name.replace("'", "''")
+    return (
+        "INSERT INTO schema_version (version, name, applied_at)"
+        f" VALUES ({migration.version}, '{name}', '{applied_at}');"
+    )
+
+
+def check_query_plans(connections: dict[str, sqlite3.Connection]) -> None:
+    """Raise if any of the hot queries reads a whole table instead of using an index."""
+    scans: list[str] = []
+    for database, description, query, parameters in HOT_QUERIES:
+        for row in connections[database].execute(
+            f"EXPLAIN QUERY PLAN {query}", parameters
+        ):
+            detail = row["detail"] if isinstance(row, dict) else row[3]
+            # a scan reads the whole table (or index), a search without index walks the rows
+            if detail.startswith("SCAN") or (
+                detail.startswith("SEARCH") and " USING " not in detail
+            ):
+                scans.append(f"{description}: {detail}")
+    if scans:
+        raise QueryPlanError("Queries not using an index:\n" + "\n".join(scans))
@@ -1,7 +1,7 @@
 import enum
 import re
 from dataclasses import dataclass, field
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import Any, Callable, Self, TypedDict
 
 import discord
@@ -122,6 +122,14 @@ class UserQuery:
     kwargs: dict[str, Any] = field(default_factory=dict)
 
 
+@dataclass
+class MessageRef:
+    """Reference to a message sent by the bot, lighter than the message itself."""
+
+    message_id: int
+    channel_id: int
+
+
 @dataclass
 class Setting:
     key: str
@@ -139,6 +147,14 @@ class Command:
     description: str
 
 
+@dataclass
+class ReminderRun:
+    day: str
+    week: int
+    week_changed: bool
+    completed: bool
+
+
 @dataclass(frozen=True)
 class RealCommand:
     function: Callable[..., Any]
@@ -158,6 +174,8 @@ class StageCost:
 
 
 class RotationEvent:
+    __slots__ = ("stage_type", "pokemon", "stage_ids", "cost_unlock", "encounter_rates")
+
     def __init__(
         self,
         stage_type: str,
@@ -183,50 +201,9 @@ class RotationEvent:
         return f" ({self.cost_unlock.split()[1]} {self.cost_unlock.split()[2]})"
 
 
-class EventPokemon:
-    def __init__(
-        self,
-        stage_type: str,
-        pokemon: str,
-        repeat_type: str,
-        repeat_param_1: int,
-        repeat_param_2: int,
-        date_start: str,
-        date_end: str,
-        duration: str,
-    ) -> None:
-        self.stage_type = EventType(stage_type)
-        self.pokemon = pokemon.split("/")
-        self.repeat_type = RepeatType(repeat_type)
-        self.repeat_param_1 = repeat_param_1
-        self.repeat_param_2 = repeat_param_2
-        self.date_start = date_start.split("/")
-        self.date_end = date_end.split("/")
-        self.duration = int(duration.split()[0])
-
-    @property
-    def this_year_start_date(self) -> datetime:
-        return datetime(
-            datetime.now(tz=pytz.utc).year,
-            self.repeat_param_1,
-            self.repeat_param_2,
-            tzinfo=pytz.utc,
-        )
-
-    @property
-    def start_time(self) -> datetime:
-        return datetime(*map(int, self.date_start), tzinfo=pytz.utc)
-
-    @property
-    def end_time(self) -> datetime:
-        return datetime(*map(int, self.date_end), tzinfo=pytz.utc)
-
-    def latest_start_time_for(self, date: datetime) -> datetime:
-        num_rotations = (date - self.end_time).days // 168 + 1
-        return self.start_time + timedelta(168) * num_rotations
-
-
 class Drop:
+    __slots__ = ("item", "amount", "rate")
+
     def __init__(self, item: str, amount: int, rate: float) -> None:
         self.item = item
         self.amount = amount
@@ -237,6 +214,8 @@ class Drop:
 
 
 class EventStageRotation:
+    __slots__ = ("cost", "drops", "items_available")
+
     def __init__(
         self,
         cost_type: str,
@@ -285,6 +264,37 @@ class EventStageRotation:
 
 
 class Stage:
+    __slots__ = (
+        "id",
+        "pokemon",
+        "hp",
+        "hp_mobile",
+        "moves",
+        "moves_mobile",
+        "seconds",
+        "exp",
+        "exp_mobile",
+        "base_catch",
+        "bonus_catch",
+        "base_catch_mobile",
+        "bonus_catch_mobile",
+        "default_supports",
+        "s_rank",
+        "a_rank",
+        "b_rank",
+        "s_unlock",
+        "is_puzzle_stage",
+        "extra_hp",
+        "layout_index",
+        "cost",
+        "drops",
+        "items",
+        "rewards",
+        "rewards_ux",
+        "disruptions",
+        "stage_type",
+    )
+
     def __init__(
         self,
         id: int,
@@ -381,7 +391,7 @@ class Stage:
         raise ValueError("Cannot generate stage id")
 
 
-@dataclass
+@dataclass(slots=True)
 class Pokemon:
     id: str
     pokemon: str
@@ -410,7 +420,7 @@ class Pokemon:
         return self.icons - self.msu
 
 
-@dataclass
+@dataclass(slots=True)
 class EBStretch:
     pokemon: str
     start_level: int
@@ -418,7 +428,7 @@ class EBStretch:
     stage_index: int
 
 
-@dataclass
+@dataclass(slots=True)
 class EBReward:
     pokemon: str
     level: int
@@ -428,6 +438,22 @@ class EBReward:
 
 
 class Event:
+    __slots__ = (
+        "id",
+        "event_type",
+        "pokemon",
+        "stage_ids",
+        "repeat_type",
+        "repeat_param_1",
+        "repeat_param_2",
+        "date_start",
+        "date_end",
+        "duration",
+        "cost_unlock",
+        "notes",
+        "encounter_rates",
+    )
+
     def __init__(
         self,
         id: int,
@@ -470,17 +496,8 @@ class Event:
     def date_end_datetime(self) -> datetime:
         return datetime(*map(int, self.date_end), tzinfo=pytz.utc)
 
-    @property
-    def next_appearance(self) -> tuple[datetime, datetime]:
-        num_cycles = (
-            datetime.now(tz=pytz.utc) - self.date_end_datetime
-        ).days // 168 + 1
-        next_start = self.date_start_datetime + num_cycles * timedelta(168)
-        next_end = self.date_end_datetime + num_cycles * timedelta(168)
-        return next_start, next_end
-
 
-@dataclass
+@dataclass(slots=True)
 class SMReward:
     level: int
     reward: str
@@ -501,6 +518,12 @@ class Reminder:
     def remove_pokemon(self, pokemon: str) -> None:
         self.pokemon.remove(pokemon)
 
+    def copy(self) -> "Reminder":
+        reminder = Reminder(self.user_id, "", "")
+        reminder.weeks = self.weeks.copy()
+        reminder.pokemon = self.pokemon.copy()
+        return reminder
+
     @property
     def weeks_str(self) -> str:
         return ", ".join(map(str, self.weeks))
@@ -511,6 +534,19 @@ class Reminder:
 
 
 class Skill:
+    __slots__ = (
+        "id",
+        "skill",
+        "description",
+        "rates",
+        "type",
+        "multiplier",
+        "bonus_effect",
+        "bonus",
+        "sp_cost",
+        "notes",
+    )
+
     def __init__(
         self,
         id: int,
@@ -553,6 +589,8 @@ class Skill:
 
 
 class TypeInfo:
+    __slots__ = ("id", "type", "se", "nve", "weak", "resist", "status_immune")
+
     def __init__(
         self,
         id: int,
@@ -0,0 +1,112 @@
+from typing import Any, Callable, Iterable
+
+import numpy as np
+import numpy.typing as npt
+
+from models import Pokemon
+
+Mask = npt.NDArray[np.bool_]
+
+# megas that are not named "Mega {pokemon}"
+HAS_MEGA_EXCEPTIONS = {"Charizard", "Mewtwo", "Charizard (Shiny)"}
+
+COMPARISONS: dict[str, Callable[[Any, Any], Mask]] = {
+    ">=": np.greater_equal,
+    "=>": np.greater_equal,
+    "<=": np.less_equal,
+    "=<": np.less_equal,
+    ">": np.greater,
+    "<": np.less,
+    "=": np.equal,
+    "!=": np.not_equal,
+}
+
+
+class PokemonTable:
+    """Columnar copy of the pokemon table, used by the query command.
+
+    Each column is stored as an array, ordered like the table,
+    so that each subquery can be evaluated on every pokemon at once as a boolean mask.
+    """
+
+    def __init__(self, pokemon: Iterable[Pokemon]) -> None:
+        rows = list(pokemon)
+        self.size = len(rows)
+        self.names: list[str] = [p.pokemon for p in rows]
+        self.names_lower = np.array([p.pokemon.lower() for p in rows], dtype=str)
+        self.types = np.array([p.type for p in rows], dtype=object)
+        self.types_lower = np.array([p.type.lower() for p in rows], dtype=str)
+        self.bp = np.array([p.bp for p in rows], dtype=np.int64)
+        self.max_ap = np.array([p.max_ap for p in rows], dtype=np.int64)
+        self.evo_speed = np.array([p.evo_speed for p in rows], dtype=np.int64)
+        self.numeric: dict[str, npt.NDArray[np.int64]] = {
+            "dex": np.array([p.dex for p in rows], dtype=np.int64),
+            "bp": self.bp,
+            "rml": np.array([p.rml for p in rows], dtype=np.int64),
+            "maxap": self.max_ap,
+            "evospeed": self.evo_speed,
+        }
+        self.numeric["rmls"] = self.numeric["rml"]
+        self.numeric["megaspeed"] = self.evo_speed
+
+        self.mega = np.array([bool(p.mega_power) for p in rows], dtype=bool)
+        self.fake = np.array([bool(p.fake) for p in rows], dtype=bool)
+        all_names = set(self.names)
+        self.has_mega = np.array(
+            [
+                p.pokemon in HAS_MEGA_EXCEPTIONS or f"Mega {p.pokemon}" in all_names
+                for p in rows
+            ],
+            dtype=bool,
+        )
+
+        # lowercase skill -> pokemon having it as main skill / skill swapper skill
+        self.skills: dict[str, Mask] = {}
+        self.ss_skills: dict[str, Mask] = {}
+        for i, p in enumerate(rows):
+            self._skill_mask(self.skills, p.skill.lower())[i] = True
+            for skill in p.ss_skills:
+                self._skill_mask(self.ss_skills, skill.lower())[i] = True
+
+    def _skill_mask(self, masks: dict[str, Mask], skill: str) -> Mask:
+        if skill not in masks:
+            masks[skill] = np.zeros(self.size, dtype=bool)
+        return masks[skill]
+
+    def empty(self) -> Mask:
+        return np.zeros(self.size, dtype=bool)
+
+    def skill(self, skill: str) -> Mask:
+        """Pokemon having the skill, either as main skill or through a skill swapper."""
+        skill = skill.lower()
+        return self.skills.get(skill, self.empty()) | self.ss(skill)
+
+    def ss(self, skill: str) -> Mask:
+        return self.ss_skills.get(skill.lower(), self.empty())
+
+    def is_in(self, names: Iterable[str]) -> Mask:
+        names = set(names)
+        return np.fromiter(
+            (name in names for name in self.names), dtype=bool, count=self.size
+        )
+
+    def name_contains(self, text: str) -> Mask:
+        return np.char.find(self.names_lower, text.lower()) >= 0
+
+    def group(
+        self, column: npt.NDArray[Any], indices: npt.NDArray[np.intp], names: list[str]
+    ) -> dict[Any, list[str]]:
+        """Group the names of the selected pokemon by the value of the given column.
+
+        ``names`` are the names to use for each of the ``indices``, in the same order.
+        """
+        if not len(indices):
+            return {}
+        keys = column[indices]
+        order = np.argsort(keys, kind="stable")
+        unique_keys, starts = np.unique(keys[order], return_index=True)
+        # tolist converts the numpy scalars to python values
+        return {
+            key: [names[i] for i in group]
+            for key, group in zip(unique_keys.tolist(), np.split(order, starts[1:]))
+        }
@@ -2,10 +2,12 @@ import sqlite3
 from collections import OrderedDict
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Callable
+from typing import Any, Callable, Iterable
 
 import pandas
 
+import migrations
+
 # TODO populating other tables with straight imports of tsv files
 
 EB_DETAILS = "shuffle_tables/eb_details.txt"
@@ -15,6 +17,7 @@ DB_SHUFFLE_PATH = "shuffle.sqlite"
 
 BOT_TABLES_PATH = Path(".") / "tables"
 SHUFFLE_TABLES_PATH = Path(".") / "shuffle_tables"
+QUERIES_PATH = Path(__file__).resolve().parent.parent / "queries"
 
 
 @dataclass
@@ -307,11 +310,13 @@ SHUFFLE_TABLES = (
 )
 
 
-def populate_eb_details() -> None:
-    with open(EB_DETAILS, encoding="utf-8") as f:
+def populate_eb_details(
+    db_path: str | Path = DB_SHUFFLE_PATH, file: str | Path = EB_DETAILS
+) -> None:
+    with open(file, encoding="utf-8") as f:
         data = f.readlines()
 
-    db = sqlite3.connect(DB_SHUFFLE_PATH)
+    db = sqlite3.connect(db_path)
     with db:
         for row in data:
             pokemon, *pokemon_data = row.split("\t")
@@ -326,11 +331,13 @@ def populate_eb_details() -> None:
             )
 
 
-def populate_eb_rewards() -> None:
-    with open(EB_REWARDS, encoding="utf-8") as f:
+def populate_eb_rewards(
+    db_path: str | Path = DB_SHUFFLE_PATH, file: str | Path = EB_REWARDS
+) -> None:
+    with open(file, encoding="utf-8") as f:
         data = f.readlines()
 
-    db = sqlite3.connect(DB_SHUFFLE_PATH)
+    db = sqlite3.connect(db_path)
     with db:
         for row in data:
             pokemon, *pokemon_data = row.split("\t")
@@ -351,9 +358,21 @@ def populate_eb_rewards() -> None:
                 )
 
 
-def populate_special_tables() -> None:
-    populate_eb_details()
-    populate_eb_rewards()
+def populate_special_tables(
+    db_path: str | Path = DB_SHUFFLE_PATH, tables_path: Path = SHUFFLE_TABLES_PATH
+) -> None:
+    populate_eb_details(db_path, tables_path / "eb_details.txt")
+    populate_eb_rewards(db_path, tables_path / "eb_rewards.txt")
+
+
+def migrate(db_path: str | Path, database: str) -> None:
+    """Bring a database created from the ``create_*_tables.sql`` scripts up to date.
+
+    The database is new, so every numbered script is applied.
+    """
+    conn = sqlite3.connect(db_path)
+    migrations.migrate(conn, database, baseline=0)
+    conn.close()
 
 
 def make_table(
@@ -385,6 +404,32 @@ def make_tables() -> None:
     sqlite3.Connection(DB_SHUFFLE_PATH).executescript(query)
 
 
+def make_shuffle_database(
+    db_path: str | Path,
+    tables_path: Path = SHUFFLE_TABLES_PATH,
+    skip: Iterable[str] = (),
+) -> dict[str, int]:
+    """Create and fill the shuffle tables of a new database, except the ones in ``skip``,
+    and apply the migrations.
+
+    Return the number of rows read from the file of each table.
+    """
+    with open(QUERIES_PATH / "create_shuffle_tables.sql", encoding="utf-8") as f:
+        query = f.read()
+    conn = sqlite3.connect(db_path)
+    conn.executescript(query)
+    counts = {
+        table.name: len(make_table(table, tables_path, conn))
+        for table in SHUFFLE_TABLES
+        if table.name not in skip
+    }
+    conn.commit()
+    conn.close()
+    populate_special_tables(db_path, tables_path)
+    migrate(db_path, "shuffle")
+    return counts
+
+
 def main() -> None:
     make_tables()
     bot_c = sqlite3.Connection(DB_BOT_PATH)
@@ -394,6 +439,8 @@ def main() -> None:
     for table in SHUFFLE_TABLES:
         make_table(table, SHUFFLE_TABLES_PATH, shuffle_c)
     populate_special_tables()
+    migrate(DB_BOT_PATH, "bot")
+    migrate(DB_SHUFFLE_PATH, "shuffle")
 
 
 if __name__ == "__main__":
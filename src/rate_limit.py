@@ -0,0 +1,112 @@
+import functools
+import time
+from collections import Counter
+from typing import Hashable, Iterable, NamedTuple
+
+# buckets unused for this long are full again, and can be forgotten
+IDLE_SECONDS = 3600
+
+
+class Limit(NamedTuple):
+    """Token bucket of a user, channel or guild.
+
+    One token is regained every ``interval`` seconds, up to ``capacity`` tokens.
+    """
+
+    scope: str
+    key: Hashable
+    interval: float
+    capacity: float
+
+
+class TokenBucket:
+    def __init__(self, capacity: float, now: float) -> None:
+        self.tokens = capacity
+        self.updated = now
+
+    def refill(self, interval: float, capacity: float, now: float) -> float:
+        if interval > 0:
+            self.tokens = min(capacity, self.tokens + (now - self.updated) / interval)
+        else:
+            self.tokens = capacity
+        self.updated = now
+        return self.tokens
+
+
+class RateLimiter:
+    """Token buckets limiting how often commands can be run.
+
+    A command takes its cost from every bucket that applies (e.g. its user, channel and guild),
+    and is only run if all of them have enough tokens.
+    Throttled requests are counted by the scope of the bucket that was short of tokens.
+    """
+
+    def __init__(self, max_buckets: int = 10000) -> None:
+        self.buckets: dict[tuple[str, Hashable], TokenBucket] = {}
+        self.max_buckets = max_buckets
+        self._prune_at = max_buckets
+        self.allowed = 0
+        self.throttled: Counter[str] = Counter()
+
+    def acquire(
+        self, cost: float, limits: Iterable[Limit], now: float | None = None
+    ) -> str | None:
+        """Take ``cost`` tokens from each bucket.
+
+        Return the scope of the first bucket without enough tokens, if any,
+        in which case no token is taken.
+        """
+        if now is None:
+            now = time.monotonic()
+        limits = list(limits)
+        buckets: list[TokenBucket] = []
+        for limit in limits:
+            bucket = self.buckets.get((limit.scope, limit.key))
+            if bucket is None:
+                bucket = self.buckets[(limit.scope, limit.key)] = TokenBucket(
+                    limit.capacity, now
+                )
+            # a command costing more than the capacity could never run otherwise
+            if bucket.refill(limit.interval, limit.capacity, now) < min(
+                cost, limit.capacity
+            ):
+                self.throttled[limit.scope] += 1
+                return limit.scope
+            buckets.append(bucket)
+        for bucket, limit in zip(buckets, limits):
+            bucket.tokens -= min(cost, limit.capacity)
+        self.allowed += 1
+        if len(self.buckets) > self._prune_at:
+            self._prune(now)
+        return None
+
+    def _prune(self, now: float) -> None:
+        """Forget the buckets that have not been used for a while."""
+        self.buckets = {
+            key: bucket
+            for key, bucket in self.buckets.items()
+            if now - bucket.updated < IDLE_SECONDS
+        }
+        # if most buckets are in use, wait for more of them before trying again
+        self._prune_at = max(self.max_buckets, 2 * len(self.buckets))
+
+    def stats(self) -> str:
+        return f"{self.allowed} allowed, " + (
+            ", ".join(
+                f"{n} throttled by {scope}" for scope, n in self.throttled.items()
+            )
+            or "0 throttled"
+        )
+
+
+@functools.lru_cache(maxsize=8)
+def parse_costs(text: str) -> dict[str, float]:
+    """Parse command costs written as ``command:cost``, separated by spaces or commas."""
+    costs: dict[str, float] = {}
+    for item in text.replace(",", " ").split():
+        command, _, cost = item.rpartition(":")
+        try:
+            costs[command.lower()] = float(cost)
+        except ValueError:
+            continue
+    return costs
@@ -3,6 +3,10 @@ commands_table_name = "tables/commands"
 settings_table_name = "tables/settings"
 user_levels_table_name = "tables/user_levels"
 log_file = "logs/log.txt"
+log_flush_interval = 5
+log_flush_size = 100
+log_max_bytes = 10000000
+log_rotate_daily = True
 debug_log_file_name = "discord.log"
 
 # BOT SETTINGS
@@ -12,10 +16,27 @@ default_user_level = 1
 max_user_level = 3
 log_format = "{timestamp}\t{type}\t{server_id}\t{server_name}\t{channel_id}\t{channel_name}\t{user_id}\t{discord_tag}\t{nickname}\t{message_content}\t{data}\t{extra}"
 channel_cooldown = 1000
+guild_cooldown = 200
 ignore_cd_level = 2
 user_cooldown_0 = 60000
 user_cooldown_1 = 3000
+rate_limit_burst = 3
+guild_rate_limit_burst = 20
+default_command_cost = 1
+command_costs = (
+    "query:3 q:3 queryx:3 qx:3 "
+    "james:2 jamesx:2 skillp:2 skillpx:2 skp:2 skpx:2 farm:2"
+)
 output_history_size = 10
+history_max_users = 10000
+history_ttl = 86400
+query_cache_size = 256
+embed_cache_size = 512
+metrics_file = "logs/metrics.json"
+metrics_dump_interval = 300
+metrics_lag_interval = 1
+stats_max_commands = 8
+shuffle_tables_watch_interval = 0
 background_task = None
 background_task_interval = 10
 enable_debug_logger = False
@@ -66,6 +87,8 @@ reminders_table = "shuffle_table/reminders"
 message_reminder_week = "Rotation week {} has started!"
 message_reminder_pokemon = "{} has appeared in an event!"
 message_reminder_header = "<@!{}> Here are your reminders:\n{}"
+reminder_concurrency = 5
+reminder_max_attempts = 5
 message_stage_no_param = "I need a stage index/pokemon to look up!"
 message_stage_invalid_param = "Result number should be 1 or higher"
 message_stage_main_invalid_param = "Main Stages range from {} to {}"
@@ -217,6 +240,11 @@ message_request_roles_finished = "All done"
 message_no_mentioned_user_2 = "I need exactly zero or one mentioned user!"
 roll_default_max = 7260
 message_refresh_settings_success = "Settings refreshed"
+message_reload_data_success = "Game data reloaded"
+message_reload_tables_success = "Shuffle tables reloaded ({} rows)"
+message_reload_tables_failure = "Shuffle tables not reloaded:\n{}"
+message_cache_stats = "Cache stats:\n{}"
+message_stats = "```\n{}\n```"
 message_refresh_app_commands_success = "App commands refreshed successfully"
 message_add_admin_failed = "That user is already an admin"
 message_add_admin_success = "<@!{}> is now an admin!"
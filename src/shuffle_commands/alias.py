@@ -2,6 +2,7 @@ import itertools
 import re
 from typing import Any
 
+import async_db
 import db
 import settings
 import utils
@@ -44,7 +45,7 @@ async def add_alias(context: KoduckContext, *args: str, **kwargs: Any) -> Payloa
     new_aliases = utils.remove_duplicates(filter(None, args[1:]))
 
     bad_alias = list(filter(lambda x: bool(RE_PING.findall(x)), new_aliases))
-    success, duplicate, failure = db.add_aliases(
+    success, duplicate, failure = await async_db.add_aliases(
         original, *(a for a in new_aliases if a not in bad_alias)
     )
     return_message = (
@@ -79,7 +80,9 @@ async def remove_alias(context: KoduckContext, *args: str, **kwargs: Any) -> Pay
             )
         )
 
-    success, not_exist, failure = db.remove_aliases(*utils.remove_duplicates(args))
+    success, not_exist, failure = await async_db.remove_aliases(
+        *utils.remove_duplicates(args)
+    )
     return_message = "\n".join(
         itertools.chain(
             (settings.message_remove_alias_success.format(*s) for s in success),
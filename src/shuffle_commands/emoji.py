@@ -1,11 +1,12 @@
 import settings
+import utils
 from koduck import KoduckContext
 from models import Payload
 
 
 async def update_emojis(context: KoduckContext) -> None:
     assert context.koduck
-    context.koduck.emojis = {}
+    emojis: dict[str, str] = {}
     for server in context.koduck.client.guilds:
         if not (
             server.name.startswith("Pokemon Shuffle Icons")
@@ -13,7 +14,8 @@ async def update_emojis(context: KoduckContext) -> None:
         ):
             continue
         for emoji in server.emojis:
-            context.koduck.emojis[emoji.name.lower()] = f"<:{emoji.name}:{emoji.id}>"
+            emojis[utils.emoji_key(emoji.name)] = f"<:{emoji.name}:{emoji.id}>"
+    context.koduck.emojis = emojis
 
 
 async def emojify_2(context: KoduckContext) -> Payload:
@@ -68,18 +68,12 @@ async def week(context: KoduckContext, *args: str) -> Payload:
             print("Unrecognized Pokemon")
             return Payload()
 
-        # retrieve data
-        weeks = [
-            event.repeat_param_1 for event in db.query_event_by_pokemon(query_pokemon)
-        ]
-        if not weeks:
+        next_week = db.query_next_event_week(query_pokemon, curr_week)
+        if next_week is None:
             return Payload(
                 content=settings.message_event_no_result.format(query_pokemon)
             )
-        sorted_results = [w + 1 for w in weeks if w + 1 >= curr_week] + [
-            w + 1 for w in weeks if w + 1 < curr_week
-        ]
-        query_week = sorted_results[0]
+        query_week = next_week
 
     if not 1 <= query_week <= settings.num_weeks:
         return Payload(
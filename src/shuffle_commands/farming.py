@@ -21,7 +21,6 @@ async def farming_cost(
     farming_stages = db.farming_stages(pokemon_name)
     if not farming_stages:
         return Payload(content=f"{pokemon_name} cannot be farmed")
-    farming_stages.sort(key=lambda s: s.string_id)
 
     pokemon = db.query_pokemon(pokemon_name)
     assert pokemon
@@ -1,5 +1,4 @@
 import asyncio
-import difflib
 import functools
 
 import discord
@@ -8,6 +7,27 @@ import constants
 import db
 import settings
 from koduck import KoduckContext
+from suggestion_index import SuggestionIndex
+
+# (table, column) -> (alias version, game data version, index)
+_suggestion_indexes: dict[tuple[str, str], tuple[int, int, SuggestionIndex]] = {}
+
+
+def get_suggestion_index(table: str, column: str) -> SuggestionIndex:
+    """Return the suggestion index of the aliases and names of the table.
+
+    The index is rebuilt when the aliases or the game data changed since it was built.
+    """
+    aliases = db.get_aliases()
+    versions = (db.alias_index.version, db.get_game_data().version)
+    cached = _suggestion_indexes.get((table, column))
+    if cached and cached[:2] == versions:
+        return cached[2]
+    index = SuggestionIndex(
+        set(aliases.keys()) | set(db.get_names(table, column).values())
+    )
+    _suggestion_indexes[(table, column)] = (*versions, index)
+    return index
 
 
 async def choice_react(
@@ -85,7 +105,7 @@ async def lookup(
     aliases = db.get_aliases()
     _query = aliases.get(_query.lower(), _query)
 
-    names_dict = {k.lower(): k for k in db.get_db_table_column(table, column)}
+    names_dict = db.get_names(table, column)
 
     if _query.lower() in names_dict:
         return names_dict[_query.lower()]
@@ -93,11 +113,8 @@ async def lookup(
     if not enable_dym:
         return ""
 
-    close_matches = difflib.get_close_matches(
-        _query,
-        set(aliases.keys()) | set(names_dict.values()),
-        n=settings.dym_limit,
-        cutoff=settings.dym_threshold,
+    close_matches = get_suggestion_index(table, column).close_matches(
+        _query, n=settings.dym_limit, cutoff=settings.dym_threshold
     )
 
     if not close_matches:
@@ -1,13 +1,70 @@
 import itertools
-from collections import defaultdict
-from typing import Any
+from typing import Any, NamedTuple
+
+import numpy as np
 
 import db
 import embed_formatters
 import settings
 import utils
+from cache import LRUCache
 from koduck import KoduckContext
 from models import Param, Payload, PokemonType
+from pokemon_table import COMPARISONS
+
+
+OPERATIONS = [">=", "<=", "=>", "=<", ">", "<", "!=", "="]
+OPERATION_ALIASES = {"=>": ">=", "=<": "<="}
+FIELD_ALIASES = {"sk": "skill", "rmls": "rml", "megaspeed": "evospeed"}
+NUMERIC_FIELDS = ["dex", "bp", "rml", "maxap", "evospeed"]
+
+query_cache: LRUCache[
+    "QueryPlan",
+    tuple[
+        list[str],
+        dict[int, list[str]],
+        dict[int, list[str]],
+        dict[PokemonType, list[str]],
+        dict[int, list[str]],
+    ],
+] = LRUCache("query", settings.query_cache_size)
+
+
+class QueryPlan(NamedTuple):
+    """Normalized form of a query, used as key of the result cache.
+
+    Equivalent filters are written in the same way and sorted,
+    so that the same query typed differently maps to the same plan.
+    """
+
+    filters: tuple[tuple[str, str, str], ...]
+    mega: bool
+    include_fake: bool
+    farmable: Param
+    ss_filter: Param
+    has_mega: bool
+
+
+def split_subquery(subquery: str) -> tuple[str, str, str] | None:
+    """Split a subquery on the first operation appearing exactly once."""
+    for op in OPERATIONS:
+        parts = subquery.split(op)
+        if len(parts) == 2:
+            return parts[0], op, parts[1]
+    return None
+
+
+def normalize_filter(left: str, operation: str, right: str) -> tuple[str, str, str]:
+    left = FIELD_ALIASES.get(left, left)
+    operation = OPERATION_ALIASES.get(operation, operation)
+    if left == "sortby":
+        # sorting does not change the results
+        return (left, "=", "")
+    if left in NUMERIC_FIELDS:
+        right = str(int(right))
+    elif left in ["skill", "type", "name"]:
+        right = right.lower()
+    return (left, operation, right)
 
 
 def validate_query(subqueries: list[str]) -> list[tuple[str, str, str]]:
@@ -16,12 +73,7 @@ def validate_query(subqueries: list[str]) -> list[tuple[str, str, str]]:
         subqueries = subqueries[0].split(" ")
         new_subqueries: list[str] = []
         for subquery in subqueries:
-            operation = ""
-            for op in [">=", "<=", "=>", "=<", ">", "<", "!=", "="]:
-                if len(subquery.split(op)) == 2:
-                    operation = op
-                    break
-            if operation == "" and len(new_subqueries) > 0:
+            if split_subquery(subquery) is None and len(new_subqueries) > 0:
                 new_subqueries[-1] = new_subqueries[-1] + " " + subquery
             else:
                 new_subqueries.append(subquery)
@@ -31,16 +83,11 @@ def validate_query(subqueries: list[str]) -> list[tuple[str, str, str]]:
     for subquery in subqueries:
         subquery = subquery.strip()
         # accept five (seven) different operations
-        operation = ""
-        for op in [">=", "<=", "=>", "=<", ">", "<", "!=", "="]:
-            if len(subquery.split(op)) == 2:
-                operation = op
-                break
-        if operation == "":
+        split = split_subquery(subquery)
+        if split is None:
             continue
-
-        # split
-        left = subquery.split(operation)[0].strip().lower()
+        left, operation, right = split
+        left = left.strip().lower()
         if left not in [
             "dex",
             "type",
@@ -67,7 +114,7 @@ def validate_query(subqueries: list[str]) -> list[tuple[str, str, str]]:
         ] and operation not in ["=", "!="]:
             continue
 
-        right = subquery.split(operation)[1].strip()
+        right = right.strip()
         if right == "":
             continue
 
@@ -205,7 +252,6 @@ async def query_with_emojis(
 
 
 # Helper function for query command
-# farmable/ss_filter: 0 = ignore, 1 = include, 2 = exclude
 def pokemon_filter(
     queries: list[tuple[str, str, str]],
     mega: bool = False,
@@ -220,173 +266,101 @@ def pokemon_filter(
     dict[PokemonType, list[str]],
     dict[int, list[str]],
 ]:
-    hits: list[str] = []
-    hits_bp: dict[int, list[str]] = defaultdict(list)
-    hits_max_ap: dict[int, list[str]] = defaultdict(list)
-    hits_type: dict[PokemonType, list[str]] = defaultdict(list)
-    hits_evo_speed: dict[int, list[str]] = defaultdict(list)
-
-    se_types = set(
-        itertools.chain(
-            *(
-                db.query_weak_against(PokemonType(right))
-                for left, _, right in queries
-                if left == "se"
-            )
-        )
-    )
-
-    farmable_pokemon: set[str] = (
-        db.get_farmable_pokemon() if farmable != Param.IGNORE else set()
+    """Return the matching pokemon, also grouped by bp, max ap, type and mega speed.
+
+    Results are cached by query plan, and shared: they must not be modified.
+    """
+    plan = QueryPlan(
+        tuple(sorted(set(normalize_filter(*subquery) for subquery in queries))),
+        mega,
+        include_fake,
+        farmable,
+        ss_filter,
+        has_mega,
     )
+    game_data = db.get_game_data()
+    # the farmable pokemon are derived from the stages, part of the game data
+    result = query_cache.get(plan, game_data.version)
+    if result is None:
+        result = run_query_plan(plan)
+        query_cache.put(plan, result)
+    return result
 
-    all_pokemon_names = db.get_db_table_column(table="pokemon", column="pokemon")
-
-    # check each pokemon
-    for pokemon_ in db.get_all_pokemon():
-        if mega ^ bool(pokemon_.mega_power):
-            continue
-        # ? add a has_mega field in the pokemon table?
-        # ? or another table to map pokemon -> mega pokemon
-        if has_mega and pokemon_.pokemon in [
-            "Charizard",
-            "Mewtwo",
-            "Charizard (Shiny)",
-        ]:
-            pass
-        elif has_mega and f"Mega {pokemon_.pokemon}" not in all_pokemon_names:
-            continue
-
-        if not include_fake and pokemon_.fake:
-            continue
 
-        if farmable == Param.INCLUDE and pokemon_.pokemon not in farmable_pokemon:
-            continue
-        if farmable == Param.EXCLUDE and pokemon_.pokemon in farmable_pokemon:
-            continue
-
-        temp_ss = list(map(str.lower, pokemon_.ss_skills))
-
-        result = True
-        is_ss = False
-        # TODO do this less painfully
-        for subquery in queries:
-            left, operation, right = subquery
-
-            if (left == "dex") and (
-                (operation in [">=", "=>"] and pokemon_.dex < int(right))
-                or (operation in ["<=", "=<"] and pokemon_.dex > int(right))
-                or (operation == ">" and pokemon_.dex <= int(right))
-                or (operation == "<" and pokemon_.dex >= int(right))
-                or (operation == "=" and pokemon_.dex != int(right))
-                or (operation == "!=" and pokemon_.dex == int(right))
-            ):
-                result = False
-                break
-            if (left == "bp") and (
-                (operation in [">=", "=>"] and pokemon_.bp < int(right))
-                or (operation in ["<=", "=<"] and pokemon_.bp > int(right))
-                or (operation == ">" and pokemon_.bp <= int(right))
-                or (operation == "<" and pokemon_.bp >= int(right))
-                or (operation == "=" and pokemon_.bp != int(right))
-                or (operation == "!=" and pokemon_.bp == int(right))
-            ):
-                result = False
-                break
-            if (left in ["rml", "rmls"]) and (
-                (operation in [">=", "=>"] and pokemon_.rml < int(right))
-                or (operation in ["<=", "=<"] and pokemon_.rml > int(right))
-                or (operation == ">" and pokemon_.rml <= int(right))
-                or (operation == "<" and pokemon_.rml >= int(right))
-                or (operation == "=" and pokemon_.rml != int(right))
-                or (operation == "!=" and pokemon_.rml == int(right))
-            ):
-                result = False
-                break
-            if (left == "maxap") and (
-                (operation in [">=", "=>"] and pokemon_.max_ap < int(right))
-                or (operation in ["<=", "=<"] and pokemon_.max_ap > int(right))
-                or (operation == ">" and pokemon_.max_ap <= int(right))
-                or (operation == "<" and pokemon_.max_ap >= int(right))
-                or (operation == "=" and pokemon_.max_ap != int(right))
-                or (operation == "!=" and pokemon_.max_ap == int(right))
-            ):
-                result = False
-                break
-            if (left == "type") and (
-                (operation == "=" and right.lower() != pokemon_.type.lower())
-                or (operation == "!=" and right.lower() == pokemon_.type.lower())
-            ):
-                result = False
-                break
-            if (left == "se") and (
-                (operation == "=" and pokemon_.type not in se_types)
-                or (operation == "!=" and pokemon_.type in se_types)
-            ):
-                result = False
-                break
-            if (left in ["skill", "sk"]) and (
-                (
-                    operation == "="
-                    and right.lower() != pokemon_.skill.lower()
-                    and right.lower() not in temp_ss
-                )
-                or (
-                    operation == "!="
-                    and (
-                        right.lower() == pokemon_.skill.lower()
-                        or right.lower() in temp_ss
-                    )
+def run_query_plan(
+    plan: QueryPlan,
+) -> tuple[
+    list[str],
+    dict[int, list[str]],
+    dict[int, list[str]],
+    dict[PokemonType, list[str]],
+    dict[int, list[str]],
+]:
+    mega, include_fake, farmable, ss_filter, has_mega = plan[1:]
+    queries = plan.filters
+    table = db.get_game_data().pokemon_table
+
+    result = table.mega == mega
+    if has_mega:
+        result &= table.has_mega
+    if not include_fake:
+        result &= ~table.fake
+    if farmable != Param.IGNORE:
+        farmable_mask = table.is_in(db.get_farmable_pokemon())
+        result &= farmable_mask if farmable == Param.INCLUDE else ~farmable_mask
+
+    se_types = list(
+        set(
+            itertools.chain(
+                *(
+                    db.query_weak_against(PokemonType(right))
+                    for left, _, right in queries
+                    if left == "se"
                 )
-            ):
-                result = False
-                break
-            if (
-                left in ["skill", "sk"]
-                and operation == "="
-                and right.lower() in temp_ss
-            ):
-                is_ss = True
-                if ss_filter == Param.EXCLUDE:
-                    result = False
-            else:
-                if ss_filter == Param.INCLUDE:
-                    result = False
-            if (left in ["evospeed", "megaspeed"]) and (
-                (operation in [">=", "=>"] and pokemon_.evo_speed < int(right))
-                or (operation in ["<=", "=<"] and pokemon_.evo_speed > int(right))
-                or (operation == ">" and pokemon_.evo_speed <= int(right))
-                or (operation == "<" and pokemon_.evo_speed >= int(right))
-                or (operation == "=" and pokemon_.evo_speed != int(right))
-                or (operation == "!=" and pokemon_.evo_speed == int(right))
-            ):
-                result = False
-                break
-            if (left == "name") and (
-                (operation == "=" and right.lower() not in pokemon_.pokemon.lower())
-                or (operation == "!=" and (right.lower() in pokemon_.pokemon.lower()))
-            ):
-                result = False
-                break
-        if not result:
-            continue
-
-        # if skill is used, boldify pokemon with ss
-        # it can't start with ** because it needs to be sorted by name
-        hit_name = f"{pokemon_.pokemon}**" if is_ss else pokemon_.pokemon
-
-        #! farmable == 3 is not an option described in the previous documentation
-        #! the goal is to tag farmable with *, but apparently it's done by default anyway?
-        if farmable == 3 and pokemon_.pokemon in farmable_pokemon:
-            hit_name += "\\*"
-
-        hits_bp[pokemon_.bp].append(hit_name)
-        hits_max_ap[pokemon_.max_ap].append(hit_name)
-        hits_type[pokemon_.type].append(hit_name)
-        hits_evo_speed[pokemon_.evo_speed].append(hit_name)
-        hits.append(hit_name)
+            )
+        )
+    )
 
-    return (hits, hits_bp, hits_max_ap, hits_type, hits_evo_speed)
+    # pokemon matching at least one of the skills through a skill swapper
+    is_ss = table.empty()
+    for left, operation, right in queries:
+        if left in table.numeric:
+            result &= COMPARISONS[operation](table.numeric[left], int(right))
+        elif left == "type":
+            result &= COMPARISONS[operation](table.types_lower, right.lower())
+        elif left == "se":
+            se_mask = np.isin(table.types, se_types)
+            result &= se_mask if operation == "=" else ~se_mask
+        elif left == "skill":
+            skill_mask = table.skill(right)
+            result &= skill_mask if operation == "=" else ~skill_mask
+        elif left == "name":
+            name_mask = table.name_contains(right)
+            result &= name_mask if operation == "=" else ~name_mask
+
+        if left == "skill" and operation == "=":
+            ss_mask = table.ss(right)
+            is_ss |= ss_mask
+            if ss_filter == Param.EXCLUDE:
+                result &= ~ss_mask
+            elif ss_filter == Param.INCLUDE:
+                result &= ss_mask
+        elif ss_filter == Param.INCLUDE:
+            # only-SS accepts skill subqueries only
+            result = table.empty()
+
+    indices = np.flatnonzero(result)
+    # if skill is used, boldify pokemon with ss
+    # it can't start with ** because it needs to be sorted by name
+    hits = [f"{table.names[i]}**" if is_ss[i] else table.names[i] for i in indices]
+
+    return (
+        hits,
+        table.group(table.bp, indices, hits),
+        table.group(table.max_ap, indices, hits),
+        table.group(table.types, indices, hits),
+        table.group(table.evo_speed, indices, hits),
+    )
 
 
 def pokemon_filter_results_to_string(
@@ -1,6 +1,6 @@
 from typing import Any
 
-import db
+import async_db
 import settings
 from koduck import KoduckContext
 from models import Payload, Reminder
@@ -12,7 +12,7 @@ async def remind_me(context: KoduckContext, *args: str, **kwargs: Any) -> Payloa
     assert context.message
     assert context.message.author
     user_id = context.message.author.id
-    user_reminders = db.query_reminder(user_id)
+    user_reminders = await async_db.query_reminder(user_id)
     if not user_reminders:
         user_reminders = Reminder(user_id, "", "")
 
@@ -35,7 +35,7 @@ async def remind_me(context: KoduckContext, *args: str, **kwargs: Any) -> Payloa
             )
         if query_week in user_reminders.weeks:
             return Payload(content=settings.message_remind_me_week_exists)
-        db.add_reminder_week(user_id, query_week)
+        await async_db.add_reminder_week(user_id, query_week)
         return Payload(
             content=settings.message_remind_me_week_success.format(query_week)
         )
@@ -48,7 +48,7 @@ async def remind_me(context: KoduckContext, *args: str, **kwargs: Any) -> Payloa
     if query_pokemon in user_reminders.pokemon:
         return Payload(content=settings.message_remind_me_pokemon_exists)
 
-    db.add_reminder_pokemon(user_id, query_pokemon)
+    await async_db.add_reminder_pokemon(user_id, query_pokemon)
     return Payload(
         content=settings.message_remind_me_pokemon_success.format(query_pokemon),
     )
@@ -60,7 +60,7 @@ async def unremind_me(context: KoduckContext, *args: str, **kwargs: Any) -> Payl
     assert context.message
     assert context.message.author
     user_id = context.message.author.id
-    user_reminders = db.query_reminder(user_id)
+    user_reminders = await async_db.query_reminder(user_id)
     if not user_reminders:
         user_reminders = Reminder(user_id, "", "")
 
@@ -78,8 +78,7 @@ async def unremind_me(context: KoduckContext, *args: str, **kwargs: Any) -> Payl
         if query_week not in user_reminders.weeks:
             return Payload(content=settings.message_unremind_me_week_non_exists)
 
-        user_reminders.remove_week(query_week)
-        db.update_reminder(user_reminders)
+        await async_db.remove_reminder_week(user_id, query_week)
         return Payload(
             content=settings.message_unremind_me_week_success.format(query_week),
         )
@@ -94,8 +93,7 @@ async def unremind_me(context: KoduckContext, *args: str, **kwargs: Any) -> Payl
             content=settings.message_unremind_me_pokemon_non_exists,
         )
 
-    user_reminders.remove_pokemon(query_pokemon)
-    db.update_reminder(user_reminders)
+    await async_db.remove_reminder_pokemon(user_id, query_pokemon)
     return Payload(
         content=settings.message_unremind_me_pokemon_success.format(query_pokemon),
     )
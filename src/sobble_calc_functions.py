@@ -1,10 +1,11 @@
 #!/usr/bin/env python3
 
 import difflib
+import functools
 import json
 import os
 import re
-from typing import Any
+from typing import Any, NamedTuple
 
 import discord
 
@@ -50,17 +51,32 @@ def initialize_shuffle_calc_json_data(
     )
 
 
-(
-    sm_stages_data,
-    sm_stage_aliases_by_stage,
-    sm_stage_aliases,
-    sm_data,
-    wm_data,
-    explain_data,
-) = initialize_shuffle_calc_json_data(shuffle_calc_json_filename)
+class ShuffleCalcData(NamedTuple):
+    sm_stages_data: list[SMStageResult]
+    sm_stage_aliases_by_stage: list[list[str]]
+    sm_stage_aliases: list[str]
+    sm_data: list[SMTeam]
+    wm_data: list[WMTeam]
+    explain_data: dict[str, str]
+
+
+@functools.cache
+def shuffle_calc_data() -> ShuffleCalcData:
+    """Load the calculator data the first time one of the commands is used."""
+    return ShuffleCalcData(
+        *initialize_shuffle_calc_json_data(shuffle_calc_json_filename)
+    )
 
 
 async def sm(context: KoduckContext, *args: str) -> discord.Message | None:
+    (
+        sm_stages_data,
+        sm_stage_aliases_by_stage,
+        sm_stage_aliases,
+        sm_data,
+        _,
+        _,
+    ) = shuffle_calc_data()
     if len(sm_data) == 0 or len(sm_stages_data) < 300 or context["message"].author.bot:
         return
     selected_stage_index = -1
@@ -166,6 +182,7 @@ async def sm(context: KoduckContext, *args: str) -> discord.Message | None:
 
 async def wm(context: KoduckContext) -> discord.Message | None:
     assert context.message
+    wm_data = shuffle_calc_data().wm_data
     if not wm_data or context.message.author.bot:
         return
     txt = ["Moves used: **15** (*+5 price not applied*)", "```Coins Std%  Team"]
@@ -180,6 +197,7 @@ async def wm(context: KoduckContext) -> discord.Message | None:
 
 async def explain(context: KoduckContext, *args: str) -> discord.Message | None:
     assert context.message
+    explain_data = shuffle_calc_data().explain_data
     if not explain_data or context.message.author.bot:
         return
     question = [
@@ -0,0 +1,71 @@
+import heapq
+from collections import Counter
+from difflib import SequenceMatcher
+from typing import Iterable
+
+import numpy as np
+import numpy.typing as npt
+
+
+class SuggestionIndex:
+    """Find the same close matches as ``difflib.get_close_matches``, scoring fewer candidates.
+
+    ``get_close_matches`` keeps the candidates whose ``SequenceMatcher.ratio`` reaches the cutoff,
+    after checking two cheaper upper bounds of it.
+    The second one, ``quick_ratio``, only depends on the characters the two strings have in common:
+    here it is computed for every candidate at once, from an inverted index
+    (character, number of occurrences) -> candidates,
+    so that only the few candidates passing it are compared in full.
+    """
+
+    def __init__(self, candidates: Iterable[str]) -> None:
+        self.candidates = list(dict.fromkeys(candidates))
+        self.lengths = np.array([len(c) for c in self.candidates], dtype=np.int64)
+        postings: dict[tuple[str, int], list[int]] = {}
+        for i, candidate in enumerate(self.candidates):
+            for key in _char_counts(candidate):
+                postings.setdefault(key, []).append(i)
+        self.postings: dict[tuple[str, int], npt.NDArray[np.intp]] = {
+            key: np.array(ids, dtype=np.intp) for key, ids in postings.items()
+        }
+
+    def close_matches(self, word: str, n: int = 3, cutoff: float = 0.6) -> list[str]:
+        if not n > 0:
+            raise ValueError(f"n must be > 0: {n!r}")
+        if not 0.0 <= cutoff <= 1.0:
+            raise ValueError(f"cutoff must be in [0.0, 1.0]: {cutoff!r}")
+
+        # number of characters in common with each candidate, counting repetitions
+        hits = [
+            self.postings[key] for key in _char_counts(word) if key in self.postings
+        ]
+        common = np.bincount(
+            np.concatenate(hits) if hits else np.empty(0, dtype=np.intp),
+            minlength=len(self.candidates),
+        )
+        total = len(word) + self.lengths
+        # same formula as SequenceMatcher.quick_ratio
+        quick_ratio = np.divide(
+            2.0 * common, total, out=np.ones(len(total)), where=total > 0
+        )
+
+        result: list[tuple[float, str]] = []
+        s = SequenceMatcher()
+        s.set_seq2(word)
+        for i in np.flatnonzero(quick_ratio >= cutoff):
+            s.set_seq1(self.candidates[i])
+            if (
+                s.real_quick_ratio() >= cutoff
+                and s.quick_ratio() >= cutoff
+                and s.ratio() >= cutoff
+            ):
+                result.append((s.ratio(), self.candidates[i]))
+
+        return [x for _, x in heapq.nlargest(n, result)]
+
+
+def _char_counts(text: str) -> Iterable[tuple[str, int]]:
+    """Yield (char, k) for each k-th occurrence of each character."""
+    for char, count in Counter(text).items():
+        for k in range(1, count + 1):
+            yield (char, k)
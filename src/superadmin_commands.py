@@ -1,7 +1,11 @@
 import discord
 
+import command_loader
+import data_reload
 import settings
+from exceptions import DataReloadError
 from koduck import KoduckContext
+from metrics import metrics
 
 
 async def shutdown(context: KoduckContext) -> None:
@@ -21,7 +25,6 @@ async def send_message(
     return await context.send_message(
         channel=the_channel,
         content=message_content,
-        ignore_cd=True,
     )
 
 
@@ -43,10 +46,11 @@ async def change_status(context: KoduckContext) -> None:
     )
 
 
-# Updates any manual changes to the settings table
+# Updates any manual changes to the settings and user levels tables
 async def refresh_settings(context: KoduckContext) -> discord.Message | None:
     assert context.koduck
     context.koduck.refresh_settings()
+    context.koduck.refresh_user_levels()
     return await context.send_message(
         content=settings.message_refresh_settings_success,
     )
@@ -78,7 +82,7 @@ async def add_admin(context: KoduckContext) -> discord.Message | None:
     if user_level == 2:
         return await context.send_message(content=settings.message_add_admin_failed)
 
-    context.koduck.update_user_level(user_id, 2)
+    await context.koduck.update_user_level(user_id, 2)
     return await context.send_message(
         content=settings.message_add_admin_success.format(user_id),
     )
@@ -100,7 +104,7 @@ async def remove_admin(context: KoduckContext) -> discord.Message | None:
             content=settings.message_remove_admin_failed,
         )
 
-    context.koduck.update_user_level(user_id, 1)
+    await context.koduck.update_user_level(user_id, 1)
     return await context.send_message(
         content=settings.message_remove_admin_success.format(user_id),
     )
@@ -127,3 +131,33 @@ async def purge(context: KoduckContext, message_count: int) -> discord.Message |
         if message.author.id == context.koduck.client.user.id:
             await message.delete()
             counter += 1
+
+
+async def stats(context: KoduckContext) -> discord.Message | None:
+    """Show the latency and throughput of the most used commands, the event loop lag,
+    the rate limiter and history counters, and how long the modules took to load."""
+    assert context.koduck
+    report = "\n".join(
+        [
+            metrics.report(settings.stats_max_commands),
+            f"rate limiter: {context.koduck.rate_limiter.stats()}",
+            f"query history: {context.koduck.query_history.stats()}",
+            f"output history: {context.koduck.output_history.stats()}",
+            f"load times:\n{command_loader.report()}",
+        ]
+    )
+    return await context.send_message(content=settings.message_stats.format(report))
+
+
+async def reload_tables(context: KoduckContext) -> discord.Message | None:
+    """Rebuild the shuffle database from the files in ``shuffle_tables/`` and switch to it,
+    keeping the aliases and reminders."""
+    try:
+        counts = await data_reload.reload_tables()
+    except DataReloadError as e:
+        return await context.send_message(
+            content=settings.message_reload_tables_failure.format(e)
+        )
+    return await context.send_message(
+        content=settings.message_reload_tables_success.format(sum(counts.values()))
+    )
@@ -5,6 +5,7 @@ from typing import Iterable
 
 import discord
 
+import async_db
 import db
 import settings
 from koduck import KoduckContext
@@ -21,7 +22,7 @@ DISCORD_ACTIVITIES = {
 
 # When someone says a trigger message, respond with a custom response!
 async def custom_response(context: KoduckContext) -> discord.Message | None:
-    response = db.query_custom_response(context.command)
+    response = await async_db.query_custom_response(context.command)
     if response:
         return await context.send_message(content=response[0])
 
@@ -35,11 +36,15 @@ async def oops(context: KoduckContext) -> str:
     assert context.koduck
     assert context.message
     try:
-        the_message = context.koduck.output_history[context.message.author.id].pop()
+        output = context.koduck.output_history[context.message.author.id].pop()
     except (KeyError, IndexError):
         return settings.message_oops_failed
     try:
-        await the_message.delete()
+        await (
+            context.koduck.client.get_partial_messageable(output.channel_id)
+            .get_partial_message(output.message_id)
+            .delete()
+        )
         return settings.message_oops_success
     except discord.errors.NotFound:
         return await oops(context)
@@ -184,7 +189,7 @@ async def request_roles(context: KoduckContext) -> discord.Message | None:
             content=settings.message_request_roles_no_guild,
         )
 
-    role_ids = set(db.query_requestable_roles(context.message.guild.id))
+    role_ids = set(await async_db.query_requestable_roles(context.message.guild.id))
 
     if not role_ids:
         return await context.send_message(
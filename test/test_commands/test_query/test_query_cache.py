@@ -0,0 +1,35 @@
+from typing import Iterator
+
+import pytest
+
+import db
+from shuffle_commands.query import pokemon_filter, query_cache
+
+
+@pytest.fixture(autouse=True)
+def empty_cache() -> Iterator[None]:
+    query_cache.clear()
+    query_cache.hits = query_cache.misses = 0
+    yield
+    query_cache.clear()
+
+
+def test_equivalent_queries_share_plan() -> None:
+    first = pokemon_filter([("bp", ">=", "70"), ("sk", "=", "Mega Boost+")])
+    second = pokemon_filter([("skill", "=", "mega boost+"), ("bp", "=>", "070")])
+    assert first is second
+    assert (query_cache.hits, query_cache.misses) == (1, 1)
+
+
+def test_flags_are_part_of_plan() -> None:
+    pokemon_filter([("bp", ">=", "70")])
+    pokemon_filter([("bp", ">=", "70")], mega=True)
+    assert (query_cache.hits, query_cache.misses) == (0, 2)
+
+
+def test_reload_invalidates_cache() -> None:
+    pokemon_filter([("bp", ">=", "70")])
+    db.reload_game_data()
+    pokemon_filter([("bp", ">=", "70")])
+    assert (query_cache.hits, query_cache.misses) == (0, 2)
+    assert len(query_cache) == 1
@@ -1,7 +1,6 @@
 import shutil
-import sqlite3
 from pathlib import Path
-from typing import Iterator
+from typing import Callable, Iterator
 
 import pytest
 
@@ -21,11 +20,50 @@ def _db_copy(tmp_path_factory: pytest.TempPathFactory) -> Iterator[Path]:
 def patch_shuffle_db_wipe_reminders(
     monkeypatch: pytest.MonkeyPatch, db_copy: Path
 ) -> Iterator[None]:
-    _db = sqlite3.Connection(db_copy)
-    _db.row_factory = db.dict_factory
-    _db.execute("DELETE FROM reminders")
-    _db.execute("UPDATE `sqlite_sequence` SET `seq` = 0 WHERE `name` = 'reminders'")
+    _db = db.connect(db_copy)
+    _db.execute("DELETE FROM reminder_weeks")
+    _db.execute("DELETE FROM reminder_pokemon")
     _db.commit()
     monkeypatch.setattr(db, "shuffle_connection", _db)
     yield
     _db.close()
+
+
+@pytest.fixture(name="insert_reminder")
+def _insert_reminder() -> Iterator[Callable[[int, list[int], list[str]], None]]:
+    def insert(user_id: int, weeks: list[int], pokemon: list[str]) -> None:
+        db.shuffle_connection.executemany(
+            "INSERT INTO reminder_weeks (user_id, week) VALUES (?, ?)",
+            ((user_id, week) for week in weeks),
+        )
+        db.shuffle_connection.executemany(
+            "INSERT INTO reminder_pokemon (user_id, pokemon) VALUES (?, ?)",
+            ((user_id, p) for p in pokemon),
+        )
+        db.shuffle_connection.commit()
+
+    yield insert
+
+
+@pytest.fixture(name="reminder_rows")
+def _reminder_rows() -> Iterator[Callable[[], list[tuple[int, str, str]]]]:
+    """Read back the reminders from the tables, as (user_id, weeks, pokemon)."""
+
+    def rows() -> list[tuple[int, str, str]]:
+        weeks = db.shuffle_connection.execute(
+            "SELECT user_id, week FROM reminder_weeks ORDER BY id"
+        ).fetchall()
+        pokemon = db.shuffle_connection.execute(
+            "SELECT user_id, pokemon FROM reminder_pokemon ORDER BY id"
+        ).fetchall()
+        user_ids = sorted({row["user_id"] for row in weeks + pokemon})
+        return [
+            (
+                user_id,
+                ", ".join(str(r["week"]) for r in weeks if r["user_id"] == user_id),
+                ", ".join(r["pokemon"] for r in pokemon if r["user_id"] == user_id),
+            )
+            for user_id in user_ids
+        ]
+
+    yield rows
@@ -1,4 +1,4 @@
-from typing import Awaitable
+from typing import Awaitable, Callable
 
 import pytest
 from helper.helper_functions import check_payload_equal
@@ -12,14 +12,13 @@ from shuffle_commands.remind import remind_me
 @pytest.mark.asyncio
 async def test_remind_no_arg_no_db_entry(
     context_with_fake_message: KoduckContext,
+    reminder_rows: Callable[[], list[tuple[int, str, str]]],
 ) -> None:
     real = await remind_me(context_with_fake_message)
     expected_message = Payload(
         content="You are signed up to be reminded for:\nWeeks: \nPokémon: "
     )
-    table_rows = db.shuffle_connection.execute("SELECT id FROM reminders").fetchall()
-
-    assert len(table_rows) == 0
+    assert reminder_rows() == []
     assert isinstance(real, dict)
     check_payload_equal(real, expected_message)
 
@@ -27,19 +26,15 @@ async def test_remind_no_arg_no_db_entry(
 @pytest.mark.asyncio
 async def test_remind_no_arg_with_db_entry(
     context_with_fake_message: KoduckContext,
+    insert_reminder: Callable[[int, list[int], list[str]], None],
+    reminder_rows: Callable[[], list[tuple[int, str, str]]],
 ) -> None:
-    db.shuffle_connection.execute(
-        """INSERT INTO reminders (user_id, weeks, pokemon)
-        VALUES (1, "2, 14, 3", "Dugtrio")
-        """
-    )
+    insert_reminder(1, [2, 14, 3], ["Dugtrio"])
     real = await remind_me(context_with_fake_message)
     expected_message = Payload(
         content="You are signed up to be reminded for:\nWeeks: 2, 14, 3\nPokémon: Dugtrio"
     )
-    table_rows = db.shuffle_connection.execute("SELECT id FROM reminders").fetchall()
-
-    assert len(table_rows) == 1
+    assert len(reminder_rows()) == 1
     assert isinstance(real, dict)
     check_payload_equal(real, expected_message)
 
@@ -49,6 +44,7 @@ async def test_remind_no_arg_with_db_entry(
 async def test_remind_invalid_week_num(
     context_with_fake_message: KoduckContext,
     week_num: int,
+    reminder_rows: Callable[[], list[tuple[int, str, str]]],
 ) -> None:
     real = await remind_me(context_with_fake_message, str(week_num))
     expected = Payload(
@@ -57,39 +53,36 @@ async def test_remind_invalid_week_num(
             "so I need a number from 1 to 24"
         )
     )
-    table_rows = db.shuffle_connection.execute("SELECT id FROM reminders").fetchall()
-
-    assert len(table_rows) == 0
+    assert reminder_rows() == []
     assert isinstance(real, dict)
     check_payload_equal(real, expected)
 
 
 @pytest.mark.asyncio
-async def test_remind_week_num_in_db(context_with_fake_message: KoduckContext) -> None:
+async def test_remind_week_num_in_db(
+    context_with_fake_message: KoduckContext,
+    reminder_rows: Callable[[], list[tuple[int, str, str]]],
+) -> None:
     db.add_reminder_week(1, 2)
     db.shuffle_connection.commit()
 
     real = await remind_me(context_with_fake_message, "2")
     expected = Payload(content="You already signed up for this rotation week")
-    table_rows = db.shuffle_connection.execute("SELECT id FROM reminders").fetchall()
-
-    assert len(table_rows) == 1
+    assert len(reminder_rows()) == 1
     assert isinstance(real, dict)
     check_payload_equal(real, expected)
 
 
 @pytest.mark.asyncio
-async def test_remind_week_new_record(context_with_fake_message: KoduckContext) -> None:
+async def test_remind_week_new_record(
+    context_with_fake_message: KoduckContext,
+    reminder_rows: Callable[[], list[tuple[int, str, str]]],
+) -> None:
     real = await remind_me(context_with_fake_message, "2")
     expected = Payload(
         content="Okay, you’re signed up to be reminded when rotation week 2 starts"
     )
-    table_rows = db.shuffle_connection.execute(
-        "SELECT id, user_id, weeks, pokemon FROM reminders"
-    ).fetchall()
-
-    assert len(table_rows) == 1
-    assert table_rows[0] == {"id": 1, "user_id": 1, "weeks": "2", "pokemon": None}
+    assert reminder_rows() == [(1, "2", "")]
     assert isinstance(real, dict)
     check_payload_equal(real, expected)
 
@@ -97,6 +90,7 @@ async def test_remind_week_new_record(context_with_fake_message: KoduckContext)
 @pytest.mark.asyncio
 async def test_remind_week_append_to_record(
     context_with_fake_message: KoduckContext,
+    reminder_rows: Callable[[], list[tuple[int, str, str]]],
 ) -> None:
     db.add_reminder_week(1, 2)
     db.shuffle_connection.commit()
@@ -104,12 +98,7 @@ async def test_remind_week_append_to_record(
     expected = Payload(
         content="Okay, you’re signed up to be reminded when rotation week 12 starts"
     )
-    table_rows = db.shuffle_connection.execute(
-        "SELECT id, user_id, weeks, pokemon FROM reminders"
-    ).fetchall()
-
-    assert len(table_rows) == 1
-    assert table_rows[0] == {"id": 1, "user_id": 1, "weeks": "2, 12", "pokemon": None}
+    assert reminder_rows() == [(1, "2, 12", "")]
     assert isinstance(real, dict)
     check_payload_equal(real, expected)
 
@@ -119,33 +108,25 @@ async def test_remind_invalid_pokemon(
     context_with_fake_message: KoduckContext,
     monkeypatch: pytest.MonkeyPatch,
     do_nothing: Awaitable[None],
+    reminder_rows: Callable[[], list[tuple[int, str, str]]],
 ) -> None:
     monkeypatch.setattr(context_with_fake_message, "send_message", do_nothing)
     real = await remind_me(context_with_fake_message, "test")
     expected_message = Payload()
-    table_rows = db.shuffle_connection.execute("SELECT id FROM reminders").fetchall()
-
-    assert len(table_rows) == 0
+    assert reminder_rows() == []
     assert isinstance(real, dict)
     check_payload_equal(real, expected_message)
 
 
 @pytest.mark.asyncio
-async def test_remind_pokemon_in_db(context_with_fake_message: KoduckContext) -> None:
+async def test_remind_pokemon_in_db(
+    context_with_fake_message: KoduckContext,
+    reminder_rows: Callable[[], list[tuple[int, str, str]]],
+) -> None:
     await remind_me(context_with_fake_message, "Giratina-O")
     real = await remind_me(context_with_fake_message, "giratinao")
     expected = Payload(content="You already signed up for this Pokémon")
-    table_rows = db.shuffle_connection.execute(
-        """SELECT id, user_id, weeks, pokemon FROM reminders"""
-    ).fetchall()
-
-    assert len(table_rows) == 1
-    assert table_rows[0] == {
-        "id": 1,
-        "user_id": 1,
-        "weeks": None,
-        "pokemon": "Giratina (Origin Forme)",
-    }
+    assert reminder_rows() == [(1, "", "Giratina (Origin Forme)")]
     assert isinstance(real, dict)
     check_payload_equal(real, expected)
 
@@ -153,6 +134,7 @@ async def test_remind_pokemon_in_db(context_with_fake_message: KoduckContext) ->
 @pytest.mark.asyncio
 async def test_remind_pokemon_new_record(
     context_with_fake_message: KoduckContext,
+    reminder_rows: Callable[[], list[tuple[int, str, str]]],
 ) -> None:
     real = await remind_me(context_with_fake_message, "giratinao")
     expected = Payload(
@@ -161,17 +143,7 @@ async def test_remind_pokemon_new_record(
             "appears in an event"
         )
     )
-    table_rows = db.shuffle_connection.execute(
-        """SELECT id, user_id, weeks, pokemon FROM reminders"""
-    ).fetchall()
-
-    assert len(table_rows) == 1
-    assert table_rows[0] == {
-        "id": 1,
-        "user_id": 1,
-        "weeks": None,
-        "pokemon": "Giratina (Origin Forme)",
-    }
+    assert reminder_rows() == [(1, "", "Giratina (Origin Forme)")]
     assert isinstance(real, dict)
     check_payload_equal(real, expected)
 
@@ -179,6 +151,7 @@ async def test_remind_pokemon_new_record(
 @pytest.mark.asyncio
 async def test_remind_pokemon_append_to_record(
     context_with_fake_message: KoduckContext,
+    reminder_rows: Callable[[], list[tuple[int, str, str]]],
 ) -> None:
     await remind_me(context_with_fake_message, "meloetta")
     real = await remind_me(context_with_fake_message, "giratinao")
@@ -188,16 +161,8 @@ async def test_remind_pokemon_append_to_record(
             "appears in an event"
         )
     )
-    table_rows = db.shuffle_connection.execute(
-        """SELECT id, user_id, weeks, pokemon FROM reminders"""
-    ).fetchall()
-
-    assert len(table_rows) == 1
-    assert table_rows[0] == {
-        "id": 1,
-        "user_id": 1,
-        "weeks": None,
-        "pokemon": "Meloetta (Aria Forme), Giratina (Origin Forme)",
-    }
+    assert reminder_rows() == [
+        (1, "", "Meloetta (Aria Forme), Giratina (Origin Forme)")
+    ]
     assert isinstance(real, dict)
     check_payload_equal(real, expected)
@@ -0,0 +1,129 @@
+from dataclasses import dataclass, field
+from typing import Any, Iterator
+
+import discord
+import pytest
+
+import db
+import main
+import migrations
+import settings
+import utils
+from models import ReminderRun
+
+
+@dataclass
+class MockUser:
+    id: int
+    received: list[str] = field(default_factory=list)
+
+    async def send(self, content: str) -> None:
+        self.received.append(content)
+
+
+@dataclass
+class MockResponse:
+    status: int = 503
+    reason: str = "Service Unavailable"
+
+
+@dataclass
+class FailingUser(MockUser):
+    attempts: int = 0
+
+    async def send(self, content: str) -> None:
+        self.attempts += 1
+        raise discord.HTTPException(MockResponse(), "unavailable")  # type: ignore
+
+
+@dataclass
+class MockClient:
+    users: dict[int, MockUser]
+    cached: set[int] = field(default_factory=set)
+    fetched: list[int] = field(default_factory=list)
+
+    def get_user(self, user_id: int) -> MockUser | None:
+        return self.users[user_id] if user_id in self.cached else None
+
+    async def fetch_user(self, user_id: int) -> MockUser:
+        self.fetched.append(user_id)
+        return self.users[user_id]
+
+
+@dataclass
+class MockKoduck:
+    client: MockClient
+
+    def log(self, *args: Any, **kwargs: Any) -> None:
+        return
+
+
+@pytest.fixture(autouse=True)
+def patch_bot_db(monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+    _db = db.connect(":memory:")
+    with open("queries/create_bot_tables.sql", encoding="utf-8") as f:
+        _db.executescript(f.read())
+    migrations.migrate(_db, "bot", baseline=0)
+    monkeypatch.setattr(db, "bot_connection", _db)
+    monkeypatch.setattr(utils, "get_current_week", lambda: 5)
+    monkeypatch.setattr(utils, "get_current_event_pokemon", lambda: ["Mew"])
+    yield
+    _db.close()
+
+
+@pytest.fixture
+def koduck() -> MockKoduck:
+    for user_id in (1, 2, 3):
+        db.add_reminder_pokemon(user_id, "Mew")
+    return MockKoduck(MockClient({i: MockUser(i) for i in (1, 2, 3)}, cached={1}))
+
+
+@pytest.mark.asyncio
+async def test_first_run_sends_nothing(koduck: MockKoduck) -> None:
+    await main.send_reminders(koduck)  # type: ignore
+    assert not any(user.received for user in koduck.client.users.values())
+    last_run = db.get_last_reminder_run()
+    assert last_run and last_run.completed
+
+
+@pytest.mark.asyncio
+async def test_new_day_sends_once(koduck: MockKoduck) -> None:
+    db.start_reminder_run(ReminderRun("2000-01-01", 4, False, True))
+    await main.send_reminders(koduck)  # type: ignore
+    await main.send_reminders(koduck)  # type: ignore
+    for user in koduck.client.users.values():
+        assert len(user.received) == 1
+    # cached users are not fetched
+    assert sorted(koduck.client.fetched) == [2, 3]
+    last_run = db.get_last_reminder_run()
+    assert last_run and last_run.week_changed and last_run.completed
+
+
+@pytest.mark.asyncio
+async def test_resume_interrupted_run(koduck: MockKoduck) -> None:
+    await main.send_reminders(koduck)  # type: ignore
+    last_run = db.get_last_reminder_run()
+    assert last_run
+    db.bot_connection.execute("DELETE FROM reminder_runs")
+    db.start_reminder_run(ReminderRun(last_run.day, 5, False, False))
+    db.add_reminder_delivery(last_run.day, 2)
+    await main.send_reminders(koduck)  # type: ignore
+    assert [len(koduck.client.users[i].received) for i in (1, 2, 3)] == [1, 0, 1]
+
+
+@pytest.mark.asyncio
+async def test_failed_delivery_is_given_up(
+    koduck: MockKoduck, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "reminder_max_attempts", 3)
+    koduck.client.users[2] = FailingUser(2)
+    db.start_reminder_run(ReminderRun("2000-01-01", 4, False, True))
+    for _ in range(5):
+        await main.send_reminders(koduck)  # type: ignore
+    failing = koduck.client.users[2]
+    assert isinstance(failing, FailingUser) and failing.attempts == 3
+    assert [len(koduck.client.users[i].received) for i in (1, 3)] == [1, 1]
+    last_run = db.get_last_reminder_run()
+    assert last_run and last_run.completed
+    assert db.get_reminder_deliveries(last_run.day, 3) == {1, 2, 3}
+    assert db.get_reminder_deliveries(last_run.day, 4) == {1, 3}
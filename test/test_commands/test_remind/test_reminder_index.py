@@ -0,0 +1,35 @@
+from typing import Callable
+
+import db
+
+
+def test_subscribers_by_week_and_pokemon() -> None:
+    db.add_reminder_week(1, 3)
+    db.add_reminder_pokemon(2, "Mew")
+    db.add_reminder_pokemon(3, "Dugtrio")
+    db.add_reminder_week(3, 4)
+
+    assert [r.user_id for r in db.get_reminder_subscribers(3, ["Mew"])] == [1, 2]
+    assert [r.user_id for r in db.get_reminder_subscribers(None, ["Mew"])] == [2]
+    (reminder,) = db.get_reminder_subscribers(None, ["Dugtrio"])
+    assert (reminder.weeks, reminder.pokemon) == ([4], ["Dugtrio"])
+
+
+def test_index_follows_removals() -> None:
+    db.add_reminder_pokemon(1, "Mew")
+    db.add_reminder_pokemon(1, "Mew")
+    db.remove_reminder_pokemon(1, "Mew")
+    assert db.get_reminder_subscribers(None, ["Mew"]) == []
+    assert db.query_reminder(1) is None
+
+
+def test_index_loaded_from_tables(
+    insert_reminder: Callable[[int, list[int], list[str]], None]
+) -> None:
+    insert_reminder(5, [1, 2], ["Mew"])
+    db.reminder_index.load()
+    reminder = db.query_reminder(5)
+    assert reminder and (reminder.weeks, reminder.pokemon) == ([1, 2], ["Mew"])
+    # copies are returned, the index is not affected
+    reminder.remove_week(1)
+    assert db.query_reminder(5).weeks == [1, 2]  # type: ignore
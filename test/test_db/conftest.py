@@ -0,0 +1,37 @@
+import shutil
+import sqlite3
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+import db
+
+
+def _shuffle_db_copy(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, wal: bool
+) -> Iterator[sqlite3.Connection]:
+    path = tmp_path / "shuffle.sqlite"
+    shutil.copy(db.DB_SHUFFLE_PATH, path)
+    _db = db.connect(path)
+    if wal:
+        _db.execute("PRAGMA journal_mode=WAL")
+    monkeypatch.setattr(db, "shuffle_connection", _db)
+    yield _db
+    _db.close()
+
+
+@pytest.fixture(scope="function")
+def shuffle_db_copy(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> Iterator[sqlite3.Connection]:
+    """A copy of the shuffle database, used as ``db.shuffle_connection``."""
+    yield from _shuffle_db_copy(tmp_path, monkeypatch, wal=False)
+
+
+@pytest.fixture(scope="function")
+def shuffle_db_copy_wal(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> Iterator[sqlite3.Connection]:
+    """Like ``shuffle_db_copy``, in write-ahead logging mode as in the bot."""
+    yield from _shuffle_db_copy(tmp_path, monkeypatch, wal=True)
@@ -0,0 +1,50 @@
+import sqlite3
+from typing import Iterator
+
+import pytest
+
+import db
+
+
+@pytest.fixture(scope="function", autouse=True)
+def patch_shuffle_db(monkeypatch: pytest.MonkeyPatch) -> Iterator[sqlite3.Connection]:
+    _db = sqlite3.Connection(":memory:")
+    _db.row_factory = db.dict_factory
+    with open("queries/create_shuffle_tables.sql", encoding="utf-8") as f:
+        query = f.read()
+    _db.executescript(query)
+    _db.execute(
+        "INSERT INTO aliases (alias, original_name) VALUES ('Zard', 'Charizard')"
+    )
+    _db.commit()
+    monkeypatch.setattr(db, "shuffle_connection", _db)
+    yield _db
+    _db.close()
+
+
+def test_get_aliases_lowercase_keys() -> None:
+    assert dict(db.get_aliases()) == {"zard": "Charizard"}
+
+
+def test_add_aliases_updates_index(patch_shuffle_db: sqlite3.Connection) -> None:
+    db.get_aliases()
+    db.add_aliases("Blastoise", "Toise")
+    # the index is updated in place, without re-reading the table
+    patch_shuffle_db.execute("DELETE FROM aliases")
+    assert db.get_aliases()["toise"] == "Blastoise"
+
+
+def test_remove_aliases_updates_index() -> None:
+    db.get_aliases()
+    db.remove_aliases("ZARD")
+    assert "zard" not in db.get_aliases()
+
+
+def test_reload_on_new_connection(monkeypatch: pytest.MonkeyPatch) -> None:
+    db.get_aliases()
+    _db = sqlite3.Connection(":memory:")
+    _db.row_factory = db.dict_factory
+    _db.execute("CREATE TABLE aliases (alias TEXT, original_name TEXT)")
+    monkeypatch.setattr(db, "shuffle_connection", _db)
+    assert not db.get_aliases()
+    _db.close()
@@ -0,0 +1,26 @@
+import threading
+from typing import Iterator
+
+import pytest
+
+import async_db
+
+
+@pytest.mark.asyncio
+async def test_runs_in_worker_thread() -> None:
+    run_in_worker = async_db.in_worker(
+        async_db.shuffle_worker, lambda: threading.current_thread().name
+    )
+    assert (await run_in_worker()).startswith("shuffle_db")
+
+
+@pytest.mark.asyncio
+async def test_generators_consumed_in_worker() -> None:
+    def names() -> Iterator[str]:
+        yield threading.current_thread().name
+        yield threading.current_thread().name
+
+    run_in_worker = async_db.in_worker(async_db.bot_worker, async_db.listed(names))
+    result = await run_in_worker()
+    assert len(result) == 2
+    assert all(name.startswith("bot_db") for name in result)
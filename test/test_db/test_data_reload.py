@@ -0,0 +1,121 @@
+import asyncio
+import shutil
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+import data_reload
+import db
+import settings
+from exceptions import DataReloadError
+from models import StageType
+
+
+@pytest.fixture(scope="function")
+def tables_path(tmp_path: Path) -> Path:
+    path = tmp_path / "shuffle_tables"
+    shutil.copytree(data_reload.SHUFFLE_TABLES_PATH, path)
+    return path
+
+
+def _replace_line(file: Path, old: str, new: str) -> None:
+    lines = file.read_text(encoding="utf-8").splitlines(keepends=True)
+    (i,) = [i for i, line in enumerate(lines) if line.startswith(old)]
+    lines[i] = new + lines[i].removeprefix(old)
+    file.write_text("".join(lines), encoding="utf-8")
+
+
+@pytest.mark.asyncio
+async def test_reload_tables(
+    shuffle_db_copy_wal: sqlite3.Connection, tables_path: Path
+) -> None:
+    shuffle_db_copy_wal.execute(
+        "INSERT INTO aliases (alias, original_name) VALUES ('newalias', 'Mew')"
+    )
+    shuffle_db_copy_wal.execute(
+        "INSERT INTO reminder_pokemon (user_id, pokemon) VALUES (12345, 'Mew')"
+    )
+    shuffle_db_copy_wal.commit()
+    _replace_line(tables_path / "main_stages.txt", "1\tEspurr", "1\tMew")
+    old = db.get_game_data()
+
+    counts = await data_reload.reload_tables(tables_path)
+    assert counts["pokemon"] == len(old.pokemon)
+    assert "aliases" not in counts
+
+    assert db.shuffle_connection is shuffle_db_copy_wal
+    assert db.get_game_data() is not old
+    assert db.query_stage_by_index(1, StageType.MAIN).pokemon == "Mew"
+    # commands already running keep the previous data
+    assert old.stages[(StageType.MAIN, 1)].pokemon == "Espurr"
+    # the user tables are kept
+    assert db.alias_index.aliases["newalias"] == "Mew"
+    assert 12345 in db.reminder_index.current().pokemon["Mew"]
+    assert shuffle_db_copy_wal.execute("PRAGMA journal_mode").fetchone() == {
+        "journal_mode": "wal"
+    }
+    assert shuffle_db_copy_wal.execute(
+        "SELECT pokemon FROM main_stages WHERE id = 1"
+    ).fetchone() == {"pokemon": "Mew"}
+
+
+@pytest.mark.asyncio
+async def test_reload_invalid_tables(
+    shuffle_db_copy: sqlite3.Connection, tables_path: Path
+) -> None:
+    _replace_line(tables_path / "main_stages.txt", "1\tEspurr", "1\tMissingno")
+    old = db.get_game_data()
+    with pytest.raises(DataReloadError, match="unknown stage pokemon: Missingno"):
+        await data_reload.reload_tables(tables_path)
+    assert db.get_game_data() is old
+    assert shuffle_db_copy.execute(
+        "SELECT pokemon FROM main_stages WHERE id = 1"
+    ).fetchone() == {"pokemon": "Espurr"}
+
+    (tables_path / "types.txt").write_text("", encoding="utf-8")
+    with pytest.raises(DataReloadError):
+        await data_reload.reload_tables(tables_path)
+
+
+async def _watch_until_reload(
+    tables_path: Path, monkeypatch: pytest.MonkeyPatch, turn_on: bool
+) -> list[Path]:
+    reloads: list[Path] = []
+    reloaded = asyncio.Event()
+
+    async def reload_tables(path: Path) -> dict[str, int]:
+        reloads.append(path)
+        reloaded.set()
+        return {}
+
+    monkeypatch.setattr(data_reload, "reload_tables", reload_tables)
+    monkeypatch.setattr(data_reload, "WATCH_OFF_INTERVAL", 0.01)
+    task = asyncio.create_task(data_reload.watch_tables(tables_path))
+    # let the task read the files before they change
+    await asyncio.sleep(0)
+    with open(tables_path / "stage_notes.txt", "a", encoding="utf-8") as f:
+        f.write("\n")
+    if turn_on:
+        monkeypatch.setattr(settings, "shuffle_tables_watch_interval", 0.01)
+    await asyncio.wait_for(reloaded.wait(), timeout=5)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    return reloads
+
+
+@pytest.mark.asyncio
+async def test_watch_tables(tables_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "shuffle_tables_watch_interval", 0.01)
+    reloads = await _watch_until_reload(tables_path, monkeypatch, turn_on=False)
+    assert reloads == [tables_path]
+
+
+@pytest.mark.asyncio
+async def test_watch_tables_turned_on(
+    tables_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "shuffle_tables_watch_interval", 0)
+    reloads = await _watch_until_reload(tables_path, monkeypatch, turn_on=True)
+    assert reloads == [tables_path]
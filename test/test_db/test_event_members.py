@@ -0,0 +1,60 @@
+import sqlite3
+
+import pytest
+
+import async_db
+import db
+
+
+def _members(conn: sqlite3.Connection) -> tuple[list[str], list[int]]:
+    pokemon = conn.execute(
+        "SELECT pokemon FROM event_pokemon ORDER BY event_id, position"
+    ).fetchall()
+    stage_ids = conn.execute(
+        "SELECT stage_id FROM event_stage_ids ORDER BY event_id, position"
+    ).fetchall()
+    return [r["pokemon"] for r in pokemon], [r["stage_id"] for r in stage_ids]
+
+
+def test_tables_match_events() -> None:
+    events = sorted(db.get_game_data().events, key=lambda e: e.id)
+    pokemon, stage_ids = _members(db.shuffle_connection)
+    assert pokemon == [p for e in events for p in e.pokemon]
+    assert stage_ids == [s for e in events for s in e.stage_ids]
+
+
+def test_refresh_event_members(shuffle_db_copy: sqlite3.Connection) -> None:
+    before = _members(shuffle_db_copy)
+    size = len(
+        shuffle_db_copy.execute(
+            "SELECT * FROM event_pokemon WHERE event_id = 0"
+        ).fetchall()
+    )
+    shuffle_db_copy.execute("UPDATE events SET pokemon = 'Mew/Celebi' WHERE id = 0")
+    shuffle_db_copy.commit()
+    db.refresh_event_members()
+    pokemon, stage_ids = _members(shuffle_db_copy)
+    assert pokemon[:2] == ["Mew", "Celebi"]
+    assert pokemon[2:] == before[0][size:]
+    assert stage_ids == before[1]
+
+    db.reload_game_data()
+    assert 0 in [e.id for e in db.query_event_by_pokemon("Celebi")]
+
+
+@pytest.mark.asyncio
+async def test_refresh_event_members_in_worker(
+    shuffle_db_copy: sqlite3.Connection,
+) -> None:
+    shuffle_db_copy.execute("UPDATE events SET pokemon = 'Mew/Celebi' WHERE id = 0")
+    shuffle_db_copy.commit()
+    await async_db.refresh_event_members()
+    await async_db.reload_game_data()
+    assert 0 in [e.id for e in db.query_event_by_pokemon("Celebi")]
+
+
+def test_lookup_uses_index() -> None:
+    plan = db.shuffle_connection.execute(
+        "EXPLAIN QUERY PLAN SELECT event_id FROM event_pokemon WHERE pokemon = 'Mew'"
+    ).fetchall()
+    assert "idx_event_pokemon_pokemon" in plan[0]["detail"]
@@ -0,0 +1,125 @@
+import pickle
+import sqlite3
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import command_loader
+import db
+import game_data
+from models import Pokemon, Stage, StageType
+
+
+def test_import_game_data_first() -> None:
+    # game_data is imported by db, so it cannot import anything importing db
+    subprocess.run([sys.executable, "-c", "import game_data"], cwd="src", check=True)
+
+
+def test_game_data_is_shared() -> None:
+    assert db.get_game_data() is db.get_game_data()
+
+
+def test_game_data_follows_connection(shuffle_db_copy: sqlite3.Connection) -> None:
+    data = db.get_game_data()
+    assert data.version == db.get_game_data().version
+    assert db.query_stage_by_index(1, StageType.MAIN).pokemon == "Espurr"
+
+
+def test_reload_game_data(shuffle_db_copy: sqlite3.Connection) -> None:
+    old = db.get_game_data()
+    shuffle_db_copy.execute("UPDATE main_stages SET pokemon = 'Mew' WHERE id = 1")
+    shuffle_db_copy.commit()
+    # the snapshot is not affected until it is reloaded
+    assert db.query_stage_by_index(1, StageType.MAIN).pokemon == "Espurr"
+    db.reload_game_data()
+    assert db.get_game_data().version > old.version
+    assert db.query_stage_by_index(1, StageType.MAIN).pokemon == "Mew"
+
+
+def _attributes(stage: Stage) -> dict[str, object]:
+    attributes = {name: getattr(stage, name) for name in Stage.__slots__}
+    attributes["drops"] = [(d.item, d.amount, d.rate) for d in stage.drops]
+    return attributes
+
+
+def test_hydrate_matches_rows() -> None:
+    conn = db.shuffle_connection
+    query = "SELECT * FROM event_stages ORDER BY id"
+    stages = game_data._hydrate(conn, Stage, query, stage_type=StageType.EVENT)
+    rows = conn.execute(query).fetchall()
+    assert len(stages) == len(rows)
+    for stage, row in zip(stages, rows):
+        assert _attributes(stage) == _attributes(
+            Stage(stage_type=StageType.EVENT, **row)
+        )
+    assert not hasattr(stages[0], "__dict__")
+
+
+def test_hydrate_columns() -> None:
+    conn = db.shuffle_connection
+    # columns in any order, extra columns ignored, missing defaults filled in
+    (pokemon,) = game_data._hydrate(
+        conn,
+        Pokemon,
+        """
+        SELECT ss, skill, max_ap, rml, bp, type, dex, pokemon, id, 'extra' AS extra
+        FROM pokemon WHERE pokemon = 'Bulbasaur'
+        """,
+    )
+    assert pokemon == Pokemon(
+        **conn.execute(
+            "SELECT id, pokemon, dex, type, bp, rml, max_ap, skill, ss"
+            " FROM pokemon WHERE pokemon = 'Bulbasaur'"
+        ).fetchone()
+    )
+    with pytest.raises(TypeError):
+        game_data._hydrate(conn, Pokemon, "SELECT id, pokemon FROM pokemon")
+    with pytest.raises(TypeError, match="Stage"):
+        game_data._hydrate(conn, Stage, "SELECT * FROM main_stages")
+
+
+def test_game_data_snapshot(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    shuffle_db_copy: sqlite3.Connection,
+) -> None:
+    monkeypatch.setattr(command_loader, "load_times", {})
+    snapshot = tmp_path / "game_data.snapshot"
+    built = db.load_game_data(snapshot)
+    assert list(command_loader.load_times) == ["game data (rebuild)"]
+    assert snapshot.exists()
+
+    command_loader.load_times.clear()
+    loaded = db.load_game_data(snapshot)
+    assert list(command_loader.load_times) == [
+        "game data (snapshot)",
+        "game data (last rebuild)",
+    ]
+    assert loaded is not built and loaded.version != built.version
+    assert loaded.pokemon == built.pokemon
+    assert _attributes(loaded.stages[(StageType.MAIN, 1)]) == _attributes(
+        built.stages[(StageType.MAIN, 1)]
+    )
+
+    # a different database invalidates the snapshot
+    shuffle_db_copy.execute("UPDATE main_stages SET pokemon = 'Mew' WHERE id = 1")
+    shuffle_db_copy.commit()
+    command_loader.load_times.clear()
+    assert db.load_game_data(snapshot).stages[(StageType.MAIN, 1)].pokemon == "Mew"
+    assert list(command_loader.load_times) == ["game data (rebuild)"]
+
+
+def test_game_data_snapshot_unreadable(tmp_path: Path) -> None:
+    snapshot = tmp_path / "game_data.snapshot"
+    key = game_data.snapshot_key(db.DB_SHUFFLE_PATH)
+    assert game_data.load_snapshot(snapshot, key) is None
+    snapshot.write_bytes(f"{key} 1.0\n".encode() + b"not a pickle")
+    assert game_data.load_snapshot(snapshot, key) is None
+    for header in (b"\xff\xfe 1.0\n", f"{key} fast\n".encode(), f"{key}\n".encode()):
+        snapshot.write_bytes(header + pickle.dumps(db.get_game_data()))
+        assert game_data.load_snapshot(snapshot, key) is None
+    game_data.save_snapshot(db.get_game_data(), snapshot, key, 1.0)
+    assert game_data.load_snapshot(snapshot, "other") is None
+    assert game_data.load_snapshot(snapshot, key) is not None
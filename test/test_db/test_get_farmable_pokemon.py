@@ -1,5 +1,8 @@
 import json
 
+import pytest
+
+import db
 from db import get_farmable_pokemon
 
 
@@ -7,3 +10,30 @@ def test_get_farmable_pokemon() -> None:
     with open("test/test_db/farmable_pokemon.txt", encoding="utf-8") as f:
         expected = json.load(f)
     assert set(expected) == get_farmable_pokemon()
+
+
+def test_farming_stages() -> None:
+    stages = db.farming_stages("Arceus")
+    assert [s.string_id for s in stages] == ["s693"]
+    assert db.farming_stages("Flygon") == []
+    assert set(db.get_game_data().farming_stages) == db.get_farmable_pokemon()
+
+
+@pytest.mark.parametrize(
+    "pokemon, skill_name, expected",
+    [
+        # rates 50, 25, 6.25; 100 SP
+        ("Arceus", "Double Normal", (123, 76)),
+        # rates 25, 1.5625, 0.78125; 120 SP
+        ("Eevee", "Eject+", (439, 248)),
+        # rates 25, 12.5, 0.78125; 70 SP
+        ("Pikachu", "Paralyze", (183, 102)),
+        # rates 50, 3.125, 1.5625; 100 SP
+        ("Meowth", "Mega Boost", (183, 119)),
+    ],
+)
+def test_runs_to_farm(pokemon: str, skill_name: str, expected: tuple[int, int]) -> None:
+    (stage,) = db.farming_stages(pokemon)
+    skill = db.query_skill(skill_name)
+    assert skill
+    assert db.get_runs_to_farm(stage, skill) == expected
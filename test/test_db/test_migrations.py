@@ -0,0 +1,161 @@
+import shutil
+import sqlite3
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+import db
+import migrations
+import populate_tables
+from exceptions import MigrationError, QueryPlanError
+from migrations import Migration
+
+
+@pytest.fixture(scope="function")
+def connections(tmp_path: Path) -> Iterator[dict[str, sqlite3.Connection]]:
+    copies: dict[str, sqlite3.Connection] = {}
+    for name, path in (("bot", db.DB_BOT_PATH), ("shuffle", db.DB_SHUFFLE_PATH)):
+        shutil.copy(path, tmp_path / path.name)
+        copies[name] = db.connect(tmp_path / path.name)
+    yield copies
+    for connection in copies.values():
+        connection.close()
+
+
+def _table(name: str) -> Migration:
+    return Migration(
+        100, f"100_create_{name}", "shuffle", f'CREATE TABLE "{name}" ("id" INTEGER);'
+    )
+
+
+def test_read_migrations() -> None:
+    found = migrations.read_migrations()
+    assert [m.version for m in found] == sorted(m.version for m in found)
+    by_version = {m.version: m for m in found}
+    assert by_version[9].database == "shuffle"
+    assert by_version[10].database == "bot"
+
+
+def test_databases_are_up_to_date(connections: dict[str, sqlite3.Connection]) -> None:
+    for name, connection in connections.items():
+        assert migrations.migrate(connection, name) == []
+        baseline = connection.execute(
+            "SELECT MAX(version) AS version FROM schema_version"
+            " WHERE applied_at = 'baseline'"
+        ).fetchone()
+        assert (baseline["version"] or 0) <= migrations.BASELINE_VERSION
+
+
+def test_baseline(tmp_path: Path) -> None:
+    connection = db.connect(tmp_path / "new.sqlite")
+    scripts = [
+        Migration(1, "1_old", "bot", "SELECT missing FROM nowhere;"),
+        Migration(12, "12_new", "bot", 'CREATE TABLE "new" ("id" INTEGER);'),
+        Migration(13, "13_shuffle", "shuffle", "SELECT missing FROM nowhere;"),
+    ]
+    applied = migrations.migrate(connection, "bot", scripts)
+    assert [m.version for m in applied] == [12]
+    assert migrations.applied_versions(connection) == {1, 12}
+    assert migrations.migrate(connection, "bot", scripts) == []
+
+
+def test_pending_migrations(connections: dict[str, sqlite3.Connection]) -> None:
+    shuffle = connections["shuffle"]
+    applied = migrations.migrate(shuffle, "shuffle", [_table("new")])
+    assert [m.version for m in applied] == [100]
+    assert shuffle.execute("SELECT * FROM new").fetchall() == []
+    assert 100 in (migrations.applied_versions(shuffle) or set())
+
+
+def test_failed_migration_is_rolled_back(
+    connections: dict[str, sqlite3.Connection]
+) -> None:
+    shuffle = connections["shuffle"]
+    broken = [
+        _table("new"),
+        Migration(101, "101_broken", "shuffle", "SELECT missing FROM nowhere;"),
+    ]
+    with pytest.raises(MigrationError):
+        migrations.migrate(shuffle, "shuffle", broken)
+    assert not shuffle.execute(
+        "SELECT name FROM sqlite_master WHERE name = 'new'"
+    ).fetchall()
+    assert 100 not in (migrations.applied_versions(shuffle) or set())
+
+
+def test_query_plans(
+    tmp_path: Path, connections: dict[str, sqlite3.Connection]
+) -> None:
+    migrations.check_query_plans(connections)
+    connections["shuffle"].execute('DROP INDEX "idx_aliases_alias_nocase"')
+    # a new connection, since the plans of the cached statements are not updated
+    connections["shuffle"].close()
+    connections["shuffle"] = db.connect(tmp_path / db.DB_SHUFFLE_PATH.name)
+    with pytest.raises(QueryPlanError, match="alias removal"):
+        migrations.check_query_plans(connections)
+
+
+def test_migrate_baseline_schema(tmp_path: Path) -> None:
+    # a database created before the versions were recorded
+    connections: dict[str, sqlite3.Connection] = {}
+    for name in ("bot", "shuffle"):
+        connection = db.connect(tmp_path / f"{name}.sqlite")
+        connection.executescript(
+            (migrations.QUERIES_PATH / f"create_{name}_tables.sql").read_text(
+                encoding="utf-8"
+            )
+        )
+        connections[name] = connection
+    connections["shuffle"].execute(
+        "INSERT INTO reminders (user_id, weeks, pokemon) VALUES (1, '3, 5', 'Mew')"
+    )
+    connections["shuffle"].commit()
+
+    found = migrations.read_migrations()
+    for name, connection in connections.items():
+        applied = migrations.migrate(connection, name)
+        assert [m.version for m in applied] == [
+            m.version
+            for m in found
+            if m.database == name and m.version > migrations.BASELINE_VERSION
+        ]
+        assert migrations.applied_versions(connection) == {
+            m.version for m in found if m.database == name
+        }
+    migrations.check_query_plans(connections)
+    assert connections["shuffle"].execute(
+        "SELECT user_id, week FROM reminder_weeks ORDER BY week"
+    ).fetchall() == [{"user_id": 1, "week": 3}, {"user_id": 1, "week": 5}]
+    assert (
+        connections["bot"]
+        .execute("SELECT command_name FROM commands WHERE command_name = 'stats'")
+        .fetchall()
+    )
+
+
+def test_migrate_new_bot_database(tmp_path: Path) -> None:
+    # the files of tables/ are older than all the scripts
+    path = tmp_path / "bot.sqlite"
+    connection = sqlite3.connect(path)
+    connection.executescript(
+        (migrations.QUERIES_PATH / "create_bot_tables.sql").read_text(encoding="utf-8")
+    )
+    for table in populate_tables.BOT_TABLES:
+        populate_tables.make_table(table, populate_tables.BOT_TABLES_PATH, connection)
+    connection.commit()
+    connection.close()
+
+    populate_tables.migrate(path, "bot")
+    connection = db.connect(path)
+    assert migrations.applied_versions(connection) == {
+        m.version for m in migrations.read_migrations() if m.database == "bot"
+    }
+    commands = {
+        row["command_name"]
+        for row in connection.execute("SELECT command_name FROM commands")
+    }
+    assert {"next", "nextx", "farm", "stats"} <= commands
+    settings = {row["key"] for row in connection.execute("SELECT key FROM settings")}
+    assert {"message_no_previous_stage", "message_add_alias_failed_4"} <= settings
+    connection.close()
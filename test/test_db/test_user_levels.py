@@ -0,0 +1,46 @@
+import sqlite3
+from typing import Iterator
+
+import pytest
+
+import db
+import settings
+from koduck import Koduck
+
+
+@pytest.fixture(scope="function")
+def patch_bot_db(monkeypatch: pytest.MonkeyPatch) -> Iterator[sqlite3.Connection]:
+    _db = db.connect(":memory:")
+    with open("queries/create_bot_tables.sql", encoding="utf-8") as f:
+        _db.executescript(f.read())
+    _db.execute("CREATE TABLE user_levels (user_id INTEGER PRIMARY KEY, level INTEGER)")
+    _db.execute("INSERT INTO user_levels (user_id, level) VALUES (1, 3)")
+    _db.commit()
+    monkeypatch.setattr(db, "bot_connection", _db)
+    yield _db
+    _db.close()
+
+
+def test_levels_loaded_on_startup(patch_bot_db: sqlite3.Connection) -> None:
+    koduck = Koduck()
+    patch_bot_db.execute("DELETE FROM user_levels")
+    assert koduck.get_user_level(1) == 3
+    assert koduck.get_user_level(2) == settings.default_user_level
+
+
+@pytest.mark.asyncio
+async def test_update_user_level(patch_bot_db: sqlite3.Connection) -> None:
+    koduck = Koduck()
+    assert await koduck.update_user_level(2, 0)
+    assert koduck.get_user_level(2) == 0
+    assert db.get_user_levels() == {1: 3, 2: 0}
+
+
+def test_missing_table_uses_default(monkeypatch: pytest.MonkeyPatch) -> None:
+    _db = db.connect(":memory:")
+    with open("queries/create_bot_tables.sql", encoding="utf-8") as f:
+        _db.executescript(f.read())
+    monkeypatch.setattr(db, "bot_connection", _db)
+    koduck = Koduck()
+    assert koduck.get_user_level(1) == settings.default_user_level
+    _db.close()
@@ -0,0 +1,58 @@
+from typing import Iterator
+
+import pytest
+
+import db
+import utils
+from embed_formatters import (
+    embed_cache,
+    format_pokemon_embed,
+    format_stage_embed,
+    format_type_embed,
+)
+from models import PokemonType, StageType
+
+
+@pytest.fixture(autouse=True)
+def empty_cache() -> Iterator[None]:
+    embed_cache.clear()
+    embed_cache.hits = embed_cache.misses = 0
+    yield
+    embed_cache.clear()
+
+
+def test_cached_embed_is_a_copy() -> None:
+    pokemon = db.query_pokemon("Bulbasaur")
+    assert pokemon
+    first = format_pokemon_embed(pokemon)
+    first.title = utils.emojify(f"[{first.title}]", {"bulbasaur": "<:Bulbasaur:1>"})
+    second = format_pokemon_embed(pokemon)
+    assert second.title == "Bulbasaur"
+    assert (embed_cache.hits, embed_cache.misses) == (1, 1)
+
+
+def test_fields_are_copied() -> None:
+    type_info = db.query_type(PokemonType.FIRE)
+    first = format_type_embed(type_info)
+    field = first.fields[0]
+    first.set_field_at(0, name=field.name, value="changed", inline=field.inline)
+    second = format_type_embed(type_info)
+    assert second.fields[0].value == field.value
+
+
+def test_arguments_are_part_of_key() -> None:
+    stage = db.query_stage_by_index(1, StageType.MAIN)
+    assert format_stage_embed(stage) != format_stage_embed(stage, shorthand=True)
+    assert format_stage_embed(stage, shorthand=True) == format_stage_embed(
+        stage, shorthand=True
+    )
+    assert (embed_cache.hits, embed_cache.misses) == (2, 2)
+
+
+def test_reload_invalidates_cache() -> None:
+    pokemon = db.query_pokemon("Bulbasaur")
+    assert pokemon
+    format_pokemon_embed(pokemon)
+    db.reload_game_data()
+    format_pokemon_embed(pokemon)
+    assert (embed_cache.hits, embed_cache.misses) == (0, 2)
@@ -1,6 +1,5 @@
 import functools
 import shutil
-import sqlite3
 from typing import Any, AsyncIterator, Iterator
 
 import discord
@@ -77,8 +76,7 @@ def db_copy(
     original = db.DB_SHUFFLE_PATH
     new_path = tmp_dir / "shuffle_copy.sqlite"
     shutil.copy(original, new_path)
-    _db = sqlite3.Connection(new_path)
-    _db.row_factory = db.dict_factory
+    _db = db.connect(new_path)
     monkeypatch_module.setattr(db, "shuffle_connection", _db)
     yield
     _db.close()
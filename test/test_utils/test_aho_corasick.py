@@ -0,0 +1,32 @@
+import random
+
+import pytest
+
+from aho_corasick import AhoCorasick
+
+
+@pytest.mark.parametrize(
+    "patterns, text, expected",
+    [
+        (["he", "she", "his", "hers"], "ushers", "he"),
+        (["hers", "she"], "ushers", "hers"),
+        (["<@!42>", "<@42>"], "hi <@42> and <@!42>", "<@!42>"),
+        (["abc"], "ababd", None),
+        ([], "anything", None),
+        (["", "a"], "b", ""),
+    ],
+)
+def test_find_first(patterns: list[str], text: str, expected: str | None) -> None:
+    assert AhoCorasick(patterns).find_first(text) == expected
+
+
+def test_same_as_linear_search() -> None:
+    rng = random.Random(0)
+    for _ in range(500):
+        patterns = [
+            "".join(rng.choices("abc", k=rng.randint(1, 4)))
+            for _ in range(rng.randint(1, 6))
+        ]
+        text = "".join(rng.choices("abcd", k=rng.randint(0, 12)))
+        expected = next((p for p in patterns if p in text), None)
+        assert AhoCorasick(patterns).find_first(text) == expected
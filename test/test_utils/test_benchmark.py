@@ -0,0 +1,61 @@
+import datetime
+from pathlib import Path
+from typing import Any
+
+import pytest
+from helper_models import MockAuthor, MockChannel, MockGuild, MockMessage
+
+from benchmark import compare, percentiles, read_corpus
+from koduck import Koduck
+
+
+def test_read_log(tmp_path: Path) -> None:
+    now = datetime.datetime(2024, 1, 1)
+    message = MockMessage(
+        content="?pokemon\nbulbasaur",
+        author=MockAuthor(42),
+        guild=MockGuild(),
+        channel=MockChannel(),
+    )
+    lines = [
+        Koduck.format_log(now, "prefix_command", message),  # type: ignore
+        Koduck.format_log(now, "message_send", message),  # type: ignore
+        Koduck.format_log(now, "prefix_command", message, extra="Unknown"),  # type: ignore
+    ]
+    path = tmp_path / "log.txt"
+    path.write_text("".join(lines), encoding="utf8")
+    requests = read_corpus(path)
+    assert len(requests) == 1
+    assert requests[0].content == "?pokemon\nbulbasaur"
+    assert requests[0].user_id == 42
+    assert requests[0].command == "pokemon"
+
+
+def test_read_lines(tmp_path: Path) -> None:
+    path = tmp_path / "corpus.txt"
+    path.write_text("# comment\n?skill Power of 4\n\nhello\n", encoding="utf8")
+    requests = read_corpus(path)
+    assert [r.content for r in requests] == ["?skill Power of 4", "hello"]
+    assert [r.command for r in requests] == ["skill", "(no command)"]
+
+
+def test_percentiles() -> None:
+    assert percentiles([2.0]) == {"p50": 2.0, "p95": 2.0, "p99": 2.0}
+    result = percentiles([float(x) for x in range(101)])
+    assert result == pytest.approx({"p50": 50, "p95": 95, "p99": 99})
+
+
+def _run(**latencies: tuple[float, float]) -> dict[str, Any]:
+    return {
+        "throughput": 100.0,
+        "commands": {
+            command: {"p50": p50, "p95": p95}
+            for command, (p50, p95) in latencies.items()
+        },
+    }
+
+
+def test_compare() -> None:
+    old = _run(pokemon=(1.0, 2.0), skill=(1.0, 2.0), stage=(0.01, 0.02))
+    new = _run(pokemon=(1.05, 2.1), skill=(1.0, 3.0), stage=(0.02, 0.04), eb=(1, 1))
+    assert compare(old, new, threshold=0.1, min_delta=0.05) == ["skill"]
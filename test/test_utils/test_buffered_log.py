@@ -0,0 +1,71 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+
+import settings
+from buffered_log import BufferedLog
+
+
+@pytest.fixture(autouse=True)
+def log_file(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    path = tmp_path / "logs" / "log.txt"
+    monkeypatch.setattr(settings, "log_file", str(path))
+    monkeypatch.setattr(settings, "log_flush_size", 3)
+    monkeypatch.setattr(settings, "log_flush_interval", 60)
+    return path
+
+
+def test_entries_formatted_on_flush(log_file: Path) -> None:
+    log = BufferedLog()
+    formatted: list[str] = []
+
+    def entry() -> str:
+        formatted.append("a")
+        return "a\n"
+
+    log.write(entry)
+    assert not formatted
+    assert not log_file.exists()
+    log.flush()
+    assert formatted == ["a"]
+    assert log_file.read_text(encoding="utf8") == "a\n"
+
+
+def test_flush_without_writer_task_when_full(log_file: Path) -> None:
+    log = BufferedLog()
+    for line in "abc":
+        log.write(lambda line=line: f"{line}\n")
+    assert log_file.read_text(encoding="utf8") == "a\nb\nc\n"
+
+
+@pytest.mark.asyncio
+async def test_writer_task_flushes_when_full(log_file: Path) -> None:
+    log = BufferedLog()
+    task = asyncio.create_task(log.run())
+    await asyncio.sleep(0)
+    for line in "abc":
+        log.write(lambda line=line: f"{line}\n")
+    for _ in range(100):
+        if log_file.exists():
+            break
+        await asyncio.sleep(0.01)
+    assert log_file.read_text(encoding="utf8") == "a\nb\nc\n"
+    log.write(lambda: "d\n")
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    # remaining entries are written on shutdown
+    assert log_file.read_text(encoding="utf8") == "a\nb\nc\nd\n"
+
+
+def test_rotate_by_size(log_file: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "log_max_bytes", 4)
+    log = BufferedLog()
+    log.write(lambda: "abcd\n")
+    log.flush()
+    log.write(lambda: "efgh\n")
+    log.flush()
+    assert log_file.read_text(encoding="utf8") == "efgh\n"
+    (rotated,) = [p for p in log_file.parent.iterdir() if p != log_file]
+    assert rotated.read_text(encoding="utf8") == "abcd\n"
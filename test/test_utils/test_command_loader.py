@@ -0,0 +1,44 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+import command_loader
+
+MODULE = """
+async def hello(context, name):
+    return f"hello {name}"
+"""
+
+
+@pytest.fixture
+def module_path(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    (tmp_path / "lazy_test_module.py").write_text(MODULE, encoding="utf8")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, "lazy_test_module", raising=False)
+    return tmp_path
+
+
+@pytest.mark.asyncio
+async def test_lazy_command(module_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(command_loader, "load_times", {})
+    command = command_loader.lazy_command("lazy_test_module", "hello")
+    assert command.__name__ == "hello"
+    assert "lazy_test_module" not in sys.modules
+
+    assert await command(None, "there") == "hello there"
+    assert "lazy_test_module" in sys.modules
+    assert list(command_loader.load_times) == ["lazy_test_module"]
+    assert "lazy_test_module: " in command_loader.report()
+
+    # already imported: not timed again
+    assert await command(None, name="again") == "hello again"
+    command_loader.import_module("lazy_test_module")
+    assert len(command_loader.load_times) == 1
+
+
+@pytest.mark.asyncio
+async def test_lazy_command_missing(module_path: Path) -> None:
+    command = command_loader.lazy_command("lazy_test_module", "goodbye")
+    with pytest.raises(AttributeError):
+        await command(None)
@@ -0,0 +1,47 @@
+import pytest
+from pytest import MonkeyPatch
+
+import db
+import utils
+
+EMOJIS = {
+    "charizard": "<:Charizard:1>",
+    "megacharizardx": "<:MegaCharizardX:2>",
+    "flabebe": "<:Flabebe:3>",
+}
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("", ""),
+        ("no emoji here", "no emoji here"),
+        ("[Charizard]", "<:Charizard:1>"),
+        (
+            "[Mega Charizard X] and [charizard]",
+            "<:MegaCharizardX:2> and <:Charizard:1>",
+        ),
+        ("[Flabébé]", "<:Flabebe:3>"),
+        ("[Unknown] [Charizard]", "Unknown <:Charizard:1>"),
+        (
+            "[Charizard][Charizard] [Charizard]",
+            "<:Charizard:1><:Charizard:1> <:Charizard:1>",
+        ),
+        ("[[Charizard]]", "[<:Charizard:1>]"),
+        ("[]", ""),
+    ],
+)
+def test_emojify(text: str, expected: str) -> None:
+    assert utils.emojify(text, EMOJIS) == expected
+
+
+def test_emojify_aliases(monkeypatch: MonkeyPatch) -> None:
+    monkeypatch.setattr(db, "get_aliases", lambda: {"zard": "Charizard"})
+    assert utils.emojify("[Zard] [Unknown]", EMOJIS, check_aliases=True) == (
+        "<:Charizard:1> Unknown"
+    )
+    assert utils.emojify("[Zard]", EMOJIS) == "Zard"
+
+
+def test_remove_duplicates() -> None:
+    assert utils.remove_duplicates(["b", "a", "b", "c", "a"]) == ["b", "a", "c"]
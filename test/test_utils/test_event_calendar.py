@@ -0,0 +1,69 @@
+import datetime
+
+import pytest
+import pytz
+
+import db
+from event_calendar import ROTATION_PERIOD
+from models import RepeatType
+
+
+def utc(*args: int) -> datetime.datetime:
+    return datetime.datetime(*args, tzinfo=pytz.utc)
+
+
+def test_live_at() -> None:
+    calendar = db.get_game_data().calendar
+    # week 20 started on 2024/01/02 06:00, the week 19 safari lasts two weeks
+    live = calendar.live_at(utc(2024, 1, 2, 12))
+    assert {e.repeat_param_1 for e in live} == {18, 19}
+    assert "Giratina (Origin Forme)" in {e.pokemon[0] for e in live}
+    assert {e.repeat_param_1 for e in calendar.live_at(utc(2024, 1, 2, 5))} == {
+        17,
+        18,
+    }
+
+
+def test_event_pokemon_on() -> None:
+    calendar = db.get_game_data().calendar
+    assert calendar.event_pokemon_on(utc(2024, 1, 2, 12)) == [
+        "Torchic (Winking)",
+        "Porygon-Z",
+        "Thundurus (Incarnate Forme)",
+        "Thundurus (Therian Forme)",
+        "Stufful",
+        "Hitmonlee",
+        "Greninja (Ash-Greninja)",
+        "Bewear",
+        "Giratina (Origin Forme)",
+        "Tapu Lele",
+    ]
+    # yearly event
+    assert "Shaymin (Land Forme)" in calendar.event_pokemon_on(utc(2024, 2, 18, 7))
+    assert "Shaymin (Land Forme)" not in calendar.event_pokemon_on(utc(2024, 2, 21, 7))
+
+
+@pytest.mark.parametrize(
+    "week, expected", [(1, 2), (2, 2), (3, 10), (10, 10), (11, 18), (18, 18), (19, 2)]
+)
+def test_next_week(week: int, expected: int) -> None:
+    calendar = db.get_game_data().calendar
+    assert calendar.next_week("Tornadus (Incarnate Forme)", week) == expected
+
+
+def test_next_week_not_in_rotation() -> None:
+    assert db.get_game_data().calendar.next_week("Aerodactyl", 1) is None
+
+
+@pytest.mark.parametrize("hours", [0, 5, 6, 7, 100, 1000, 4000])
+def test_next_appearance(hours: int) -> None:
+    now = utc(2023, 12, 24) + datetime.timedelta(hours=hours)
+    for event in db.get_game_data().events:
+        if event.repeat_type != RepeatType.ROTATION:
+            continue
+        start, end = db.get_next_appearance(event, now)
+        assert end > now >= end - ROTATION_PERIOD
+        assert (start - event.date_start_datetime) % ROTATION_PERIOD == (
+            datetime.timedelta()
+        )
+        assert end - start == event.date_end_datetime - event.date_start_datetime
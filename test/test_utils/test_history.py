@@ -0,0 +1,78 @@
+import pytest
+
+import db
+import settings
+from history import HistoryStore
+from koduck import Koduck
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> list[float]:
+    now = [0.0]
+    monkeypatch.setattr("history.time.monotonic", lambda: now[0])
+    return now
+
+
+def test_ring_buffer() -> None:
+    store = HistoryStore[int]("test", size=3, max_users=10, ttl=60)
+    for i in range(5):
+        store[1].append(i)
+    assert list(store[1]) == [2, 3, 4]
+    store[1][-1] = 10
+    assert list(reversed(store[1])) == [10, 3, 2]
+    assert store[1].pop() == 10
+
+
+def test_lru_eviction(clock: list[float]) -> None:
+    store = HistoryStore[int]("test", size=3, max_users=2, ttl=60)
+    store[1].append(1)
+    store[2].append(2)
+    store[1].append(1)
+    store[3].append(3)
+    assert list(store) == [1, 3]
+    assert store.evictions == 1
+    assert not store[2]
+
+
+def test_ttl(clock: list[float]) -> None:
+    store = HistoryStore[int]("test", size=3, max_users=10, ttl=60)
+    store[1].append(1)
+    store[2].append(2)
+    clock[0] = 30
+    store[2].append(2)
+    clock[0] = 61
+    # user 1 expired when user 3 is added
+    store[3].append(3)
+    assert 1 not in store
+    assert list(store[2]) == [2, 2]
+    clock[0] = 200
+    assert not store[2]
+    assert store.evictions == 3
+
+
+def test_resize() -> None:
+    store = HistoryStore[int]("test", size=3, max_users=10, ttl=60)
+    for user_id in range(3):
+        store[user_id].extend(range(3))
+    store.resize(size=2, max_users=2, ttl=60)
+    assert list(store) == [1, 2]
+    assert list(store[2]) == [1, 2]
+    store[2].append(3)
+    assert list(store[2]) == [2, 3]
+    assert store.evictions == 1
+    assert store.stats() == "2/2 users, 2 items each, 1 evictions"
+
+
+def test_history_settings(monkeypatch: pytest.MonkeyPatch) -> None:
+    _db = db.connect(":memory:")
+    with open("queries/create_bot_tables.sql", encoding="utf-8") as f:
+        _db.executescript(f.read())
+    _db.execute("INSERT INTO settings (key, value) VALUES ('output_history_size', '2')")
+    monkeypatch.setattr(db, "bot_connection", _db)
+    # restored after the test, refresh_settings sets them
+    monkeypatch.setattr(settings, "output_history_size", settings.output_history_size)
+    monkeypatch.setattr(settings, "history_max_users", 5)
+    koduck = Koduck()
+    assert koduck.query_history.size == koduck.output_history.size == 2
+    assert koduck.output_history.max_users == 5
+    _db.close()
@@ -0,0 +1,80 @@
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+
+from metrics import Histogram, Metrics, current_command
+
+
+def test_histogram_percentiles() -> None:
+    histogram = Histogram()
+    for value in range(1, 101):
+        histogram.add(value)
+    assert histogram.count == 100
+    assert histogram.max == 100
+    # upper bound of the bucket, at most twice the actual value
+    assert 50 <= histogram.percentile(0.5) <= 100
+    assert 99 <= histogram.percentile(0.99) <= 100
+    assert Histogram().percentile(0.5) == 0
+
+
+def test_histogram_overflow() -> None:
+    histogram = Histogram()
+    histogram.add(10**6)
+    assert histogram.percentile(0.5) == 10**6
+
+
+def test_timer_uses_current_command() -> None:
+    metrics = Metrics()
+    with metrics.timer("db"):
+        pass
+    assert not metrics.timings
+
+    token = current_command.set("pokemon")
+    try:
+        with metrics.timer("db"):
+            pass
+        with metrics.timer("send", command="skill"):
+            pass
+    finally:
+        current_command.reset(token)
+    assert metrics.timings[("pokemon", "db")].count == 1
+    assert metrics.timings[("skill", "send")].count == 1
+
+
+def test_report() -> None:
+    metrics = Metrics()
+    for _ in range(3):
+        metrics.count("pokemon", "invocations")
+        metrics.observe("pokemon", "total", 12.0)
+    metrics.count("skill", "invocations")
+    metrics.count("skill", "errors")
+    metrics.count("query", "cooldown")
+    lines = metrics.report(max_commands=2).splitlines()
+    assert lines[0].startswith("4 commands")
+    assert lines[1] == "pokemon: 3 invocations"
+    assert lines[2].startswith("  total x3: p50/p95/p99 12.0/12.0/12.0ms")
+    assert lines[3] == "skill: 1 invocations, 1 errors"
+    assert len(lines) == 4
+
+
+def test_dump(tmp_path: Path) -> None:
+    metrics = Metrics()
+    metrics.count("pokemon", "invocations")
+    metrics.observe("pokemon", "parse", 0.5)
+    metrics.dump(tmp_path / "metrics" / "metrics.json")
+    with open(tmp_path / "metrics" / "metrics.json", encoding="utf8") as f:
+        data = json.load(f)
+    assert data["commands"]["pokemon"]["invocations"] == 1
+    assert data["commands"]["pokemon"]["parse"]["count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_monitor_loop(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr("settings.metrics_lag_interval", 0.001)
+    metrics = Metrics()
+    task = asyncio.create_task(metrics.monitor_loop())
+    await asyncio.sleep(0.05)
+    task.cancel()
+    assert metrics.loop_lag.count > 0
@@ -0,0 +1,60 @@
+import pytest
+
+from rate_limit import Limit, RateLimiter, parse_costs
+
+
+def limits(user: int = 1, channel: int = 3) -> list[Limit]:
+    return [Limit("user", user, 1.0, 3), Limit("channel", channel, 0.5, 4)]
+
+
+def test_burst_then_refill() -> None:
+    limiter = RateLimiter()
+    assert [limiter.acquire(1, limits(), now=0) for _ in range(4)] == [
+        None,
+        None,
+        None,
+        "user",
+    ]
+    assert limiter.acquire(1, limits(), now=0.5) == "user"
+    assert limiter.acquire(1, limits(), now=1) is None
+    assert limiter.allowed == 4
+    assert limiter.throttled == {"user": 2}
+
+
+def test_no_tokens_taken_when_throttled() -> None:
+    limiter = RateLimiter()
+    for user in range(4):
+        assert limiter.acquire(1, limits(user=user), now=0) is None
+    # the channel bucket is empty, user 4 keeps all of its tokens
+    assert limiter.acquire(1, limits(user=4), now=0) == "channel"
+    assert limiter.buckets[("user", 4)].tokens == 3
+
+
+def test_cost() -> None:
+    limiter = RateLimiter()
+    assert limiter.acquire(3, limits(), now=0) is None
+    assert limiter.acquire(1, limits(), now=0) == "user"
+    assert limiter.acquire(2, limits(), now=2) is None
+    # costs above the capacity take the whole bucket
+    assert limiter.acquire(10, limits(user=2), now=10) is None
+    assert limiter.acquire(1, limits(user=2), now=10) == "user"
+
+
+def test_prune() -> None:
+    limiter = RateLimiter(max_buckets=2)
+    limiter.acquire(1, limits(user=1), now=0)
+    limiter.acquire(1, limits(user=2), now=5000)
+    assert ("user", 1) not in limiter.buckets
+    assert set(limiter.buckets) == {("user", 2), ("channel", 3)}
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("", {}),
+        ("query:3 Q:2.5", {"query": 3, "q": 2.5}),
+        ("query:3, skill:x,farm:2", {"query": 3, "farm": 2}),
+    ],
+)
+def test_parse_costs(text: str, expected: dict[str, float]) -> None:
+    assert parse_costs(text) == expected
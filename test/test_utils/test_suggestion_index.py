@@ -0,0 +1,34 @@
+import difflib
+
+import pytest
+
+from suggestion_index import SuggestionIndex
+
+CANDIDATES = [
+    "Charizard",
+    "Charmander",
+    "Charmeleon",
+    "Mega Charizard X",
+    "zard",
+    "szard",
+    "Mewtwo",
+    "Mew",
+    "Meowth",
+    "",
+]
+
+
+@pytest.mark.parametrize(
+    "word", ["Charizrd", "charizard", "Mewto", "mew", "zrad", "Meow", "", "xyz"]
+)
+@pytest.mark.parametrize("cutoff", [0.0, 0.6, 0.7, 1.0])
+def test_same_as_difflib(word: str, cutoff: float) -> None:
+    index = SuggestionIndex(CANDIDATES)
+    expected = difflib.get_close_matches(word, CANDIDATES, n=5, cutoff=cutoff)
+    assert index.close_matches(word, n=5, cutoff=cutoff) == expected
+
+
+@pytest.mark.parametrize("n, cutoff", [(0, 0.5), (1, 1.5)])
+def test_invalid_parameters(n: int, cutoff: float) -> None:
+    with pytest.raises(ValueError):
+        SuggestionIndex(CANDIDATES).close_matches("Mew", n=n, cutoff=cutoff)